@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Benchmark tag key matching as the number of configured keys grows."""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import scanner
+from src.scanner import TagScanner
+
+LINES = 200_000
+KEY_COUNTS = [1, 8, 64, 256, 1024]
+
+
+def build_content() -> bytes:
+    """Values file whose keys share prefixes with the configured keys."""
+    rng = random.Random(42)
+    lines = [
+        f"  svc{rng.randrange(2000):04d}{rng.choice(['Tag', 'Image', 'Repo'])}: v{i}"
+        for i in range(LINES)
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def time_find(keys: list[str], content: bytes) -> tuple[float, int]:
+    tag_scanner = TagScanner(keys)
+    start = time.perf_counter()
+    matches = tag_scanner.find(content)
+    return time.perf_counter() - start, len(matches)
+
+
+def main() -> None:
+    content = build_content()
+    print(f"Scanning {len(content) / 1e6:.1f} MB, {LINES} lines\n")
+    print(f"{'keys':>6} {'alternation':>12} {'trie':>10} {'matches':>9}")
+
+    for count in KEY_COUNTS:
+        keys = [f"svc{i:04d}Tag" for i in range(count)]
+
+        scanner.KEY_TRIE_THRESHOLD = sys.maxsize  # force flat alternation
+        flat, _ = time_find(keys, content)
+        scanner.KEY_TRIE_THRESHOLD = 0  # force trie
+        trie, matched = time_find(keys, content)
+
+        print(f"{count:>6} {flat:>11.3f}s {trie:>9.3f}s {matched:>9}")
+
+
+if __name__ == "__main__":
+    main()
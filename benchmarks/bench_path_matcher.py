@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Benchmark include/exclude path matching as the number of patterns grows."""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.discovery import PathMatcher, translate_pattern
+
+PATHS = 20_000
+PATTERN_COUNTS = [1, 16, 256, 1024, 4096]
+
+
+def build_paths() -> list[str]:
+    """Chart paths resembling a monorepo checkout."""
+    rng = random.Random(42)
+    envs = ["dev", "stg", "prod", "qa"]
+    return [
+        f"apps/svc{rng.randrange(5000):04d}/{rng.choice(envs)}.values.yaml"
+        for _ in range(PATHS)
+    ]
+
+
+def build_patterns(count: int) -> tuple[list[str], list[str]]:
+    include = [f"apps/svc{i:04d}/*.values.yaml" for i in range(count)]
+    exclude = [f"apps/svc{i:04d}/qa.values.yaml" for i in range(0, count, 4)]
+    return include, exclude
+
+
+def time_per_pattern(include, exclude, paths) -> tuple[float, int]:
+    """Baseline: test every path against every pattern in turn."""
+    includes = [re.compile(translate_pattern(p)[0]) for p in include]
+    excludes = [re.compile(translate_pattern(p)[0]) for p in exclude]
+    start = time.perf_counter()
+    matched = sum(
+        1
+        for path in paths
+        if any(r.fullmatch(path) for r in includes)
+        and not any(r.fullmatch(path) for r in excludes)
+    )
+    return time.perf_counter() - start, matched
+
+
+def time_combined(include, exclude, paths) -> tuple[float, int]:
+    matcher = PathMatcher(include, exclude)
+    start = time.perf_counter()
+    matched = sum(1 for path in paths if matcher.match(path))
+    return time.perf_counter() - start, matched
+
+
+def main() -> None:
+    paths = build_paths()
+    print(f"Matching {len(paths)} paths\n")
+    print(f"{'patterns':>9} {'per-pattern':>12} {'combined':>10} {'matches':>9}")
+
+    for count in PATTERN_COUNTS:
+        include, exclude = build_patterns(count)
+        loop, expected = time_per_pattern(include, exclude, paths)
+        combined, matched = time_combined(include, exclude, paths)
+        assert matched == expected
+
+        print(f"{count:>9} {loop:>11.3f}s {combined:>9.3f}s {matched:>9}")
+
+
+if __name__ == "__main__":
+    main()
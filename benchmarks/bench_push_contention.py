@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Benchmark concurrent runs pushing to one branch, on the in-memory backend.
+
+Each run goes through `GitOperations` (branch setup, commit, push with its
+retry loop), so rejected pushes are retried exactly as the action retries
+them. The retry delay is scaled down to keep the benchmark short.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.git_operations as git_operations
+from src.config import Config
+from src.git_backend import InMemoryBackend, InMemoryRemote
+from src.git_operations import GitOperations
+from src.logger import ActionError, Logger
+
+RUNNER_COUNTS = [1, 4, 16, 64]
+LATENCY = 0.002  # seconds per network round trip
+RETRY_DELAY = 0.05  # stands in for PUSH_RETRY_DELAY
+MAX_RETRIES = 3
+
+
+class QuietLogger(Logger):
+    """A logger that keeps the benchmark output to its table."""
+
+    def info(self, message: str) -> None:
+        pass
+
+    def success(self, message: str) -> None:
+        pass
+
+    def warning(self, message: str) -> None:
+        pass
+
+
+def make_config(i: int) -> Config:
+    return Config(
+        target_path=f"apps/svc{i:03d}",
+        new_tag="v2",
+        tag_string="tag",
+        git_user_name="bot",
+        git_user_email="bot@ci.com",
+        github_token="token",
+        repo="org/repo",
+        branch="main",
+        target_values_file="values.yaml",
+        max_retries=MAX_RETRIES,
+    )
+
+
+def run(remote: InMemoryRemote, i: int, failures: list[int]) -> None:
+    """One run: set up the branch, change its own file, commit and push."""
+    backend = InMemoryBackend(remote)
+    git_ops = GitOperations(make_config(i), QuietLogger(), backend)
+    try:
+        git_ops.setup_branch()
+        backend.worktree[f"apps/svc{i:03d}/values.yaml"] = b"tag: v2\n"
+        git_ops.commit_and_push("values.yaml")
+    except ActionError:
+        failures.append(i)
+    finally:
+        git_ops.close()
+
+
+def main() -> None:
+    git_operations.PUSH_RETRY_DELAY = RETRY_DELAY
+    print(
+        f"Concurrent runs against one branch, {LATENCY * 1000:.0f}ms latency, "
+        f"{MAX_RETRIES} attempts {RETRY_DELAY * 1000:.0f}ms apart\n"
+    )
+    print(f"{'runners':>8} {'time':>8} {'pushes':>7} {'rejected':>9} {'failed':>7}")
+
+    for count in RUNNER_COUNTS:
+        remote = InMemoryRemote({"main": {"README.md": b"readme\n"}}, latency=LATENCY)
+        failures: list[int] = []
+        threads = [
+            threading.Thread(target=run, args=(remote, i, failures))
+            for i in range(count)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        landed = len(remote.commits[remote.refs["main"]].tree) - 1
+        assert landed == count - len(failures)
+
+        print(
+            f"{count:>8} {elapsed:>7.3f}s {remote.pushes:>7} "
+            f"{remote.rejections:>9} {len(failures):>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
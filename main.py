@@ -7,6 +7,7 @@ import sys
 from src.config import Config
 from src.file_processor import FileProcessor
 from src.git_operations import GitOperations
+from src.inventory import format_inventory, save_inventory
 from src.logger import ActionError, Logger
 from src.summary import ChangeSummary
 
@@ -22,6 +23,23 @@ def write_output(name: str, value: str) -> None:
             f.write("EOF\n")
 
 
+def run_scan(config: Config, logger: Logger) -> None:
+    """Report the current tags of all matched files without touching git."""
+    records = FileProcessor(config, logger).scan_files()
+    files = {record["file"] for record in records}
+    logger.info(f"\nFound {len(records)} tag(s) in {len(files)} file(s)")
+    for record in records:
+        logger.debug(
+            f"   {record['file']}:{record['line']} {record['key']}: {record['value']}"
+        )
+
+    write_output("inventory_count", str(len(records)))
+    if config.inventory_file:
+        save_inventory(records, config.inventory_file, logger)
+    else:
+        write_output("inventory", format_inventory(records))
+
+
 def main() -> None:
     """Main function."""
     # Initialize logger
@@ -46,6 +64,12 @@ def main() -> None:
             for item in os.listdir("."):
                 logger.debug(f"  {item}")
 
+        # Scan mode only reads files: no git setup, no network
+        if config.mode == "scan":
+            run_scan(config, logger)
+            logger.print_header("Process Completed Successfully")
+            return
+
         # Initialize Git operations
         git_ops = GitOperations(config, logger)
 
@@ -64,6 +88,14 @@ def main() -> None:
 
         # Prepare outputs
         final_tag = config.get_final_tag()
+        if config.manifest or config.mode == "promote":
+            # Every distinct tag applied across the manifest, in order
+            applied = {
+                tag: None
+                for new_tags in file_processor.new_tags_by_key.values()
+                for tag in new_tags.values()
+            }
+            final_tag = ",".join(applied)
         updated_files_list = ",".join(file_processor.updated_files)
         old_tags_list = ",".join(file_processor.old_tags.values())
         files_count = str(len(file_processor.updated_files))
@@ -77,7 +109,12 @@ def main() -> None:
 
         # Print summary
         if changes_made:
-            summary.print_summary(file_processor.updated_files, file_processor.old_tags)
+            summary.print_summary(
+                file_processor.updated_files,
+                file_processor.old_tags,
+                old_tags_by_key=file_processor.old_tags_by_key,
+                new_tags_by_key=file_processor.new_tags_by_key,
+            )
 
         # Handle dry run mode
         if config.dry_run:
@@ -85,7 +122,10 @@ def main() -> None:
             # Save summary even in dry run mode
             if config.summary_file:
                 summary.save_summary(
-                    file_processor.updated_files, file_processor.old_tags
+                    file_processor.updated_files,
+                    file_processor.old_tags,
+                    old_tags_by_key=file_processor.old_tags_by_key,
+                    new_tags_by_key=file_processor.new_tags_by_key,
                 )
             logger.info("\n[O] Dry run completed. No changes were made.")
             logger.print_header("Process Completed Successfully")
@@ -99,8 +139,16 @@ def main() -> None:
             return
 
         # Commit and push changes
-        file_info = config.file_pattern or config.target_values_file
-        commit_sha = git_ops.commit_and_push(file_info)
+        file_info = (
+            config.manifest
+            or config.file_pattern
+            or config.target_values_file
+            or ", ".join(dest for _, dest in config.get_promotions())
+        )
+        commit_sha = git_ops.commit_and_push(
+            file_info, files=file_processor.updated_files
+        )
+        git_ops.close()
 
         # Write commit SHA outputs
         write_output("commit_sha", commit_sha or "")
@@ -114,7 +162,11 @@ def main() -> None:
         # Save summary with commit SHA
         if config.summary_file:
             summary.save_summary(
-                file_processor.updated_files, file_processor.old_tags, commit_sha
+                file_processor.updated_files,
+                file_processor.old_tags,
+                commit_sha,
+                old_tags_by_key=file_processor.old_tags_by_key,
+                new_tags_by_key=file_processor.new_tags_by_key,
             )
 
         logger.print_header("Process Completed Successfully")
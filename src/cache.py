@@ -0,0 +1,198 @@
+"""Persistent tag-location caches for image tag updater."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from .scanner import TagMatch
+
+INDEX_VERSION = 1
+INDEX_FILE = "tag-index.json"
+BLOB_CACHE_FILE = "blob-cache.json"
+
+# Files modified this recently may change again within the same mtime tick
+# without the signature noticing, so they are not indexed ("racily clean")
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def find_git_dir(start: str = ".") -> str | None:
+    """Find the `.git` directory of the repository containing `start`."""
+    path = os.path.realpath(start)
+    while True:
+        candidate = os.path.join(path, ".git")
+        if os.path.isdir(candidate):
+            return candidate
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def stat_signature(st: os.stat_result) -> list[int]:
+    """The parts of a stat result that change whenever file content does."""
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def encode_matches(matches: list[TagMatch]) -> list[list]:
+    """Matches as compact JSON rows."""
+    return [[m.key, m.value, m.start, m.end, m.line] for m in matches]
+
+
+def decode_matches(entry: dict, keys: list[str]) -> list[TagMatch] | None:
+    """Matches of a cache entry scanned for exactly `keys`, or None."""
+    if entry.get("keys") != sorted(keys):
+        return None
+    try:
+        return [TagMatch(*match) for match in entry["matches"]]
+    except (KeyError, TypeError):
+        return None
+
+
+class JsonCache:
+    """A JSON-backed mapping persisted atomically, shared by worker threads."""
+
+    section = "entries"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str):
+        """Load a cache, starting empty if it is missing, stale or unreadable."""
+        cache = cls(path)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cache
+        if isinstance(data, dict) and data.get("version") == INDEX_VERSION:
+            entries = data.get(cls.section)
+            if isinstance(entries, dict):
+                cache.entries = entries
+        return cache
+
+    def _get(self, key: str) -> dict | None:
+        with self._lock:
+            return self.entries.get(key)
+
+    def _set(self, key: str, entry: dict) -> None:
+        with self._lock:
+            self.entries[key] = entry
+            self.dirty = True
+
+    def _snapshot(self) -> dict[str, dict]:
+        """The entries to persist."""
+        return self.entries
+
+    def save(self) -> None:
+        """Write the cache atomically if anything changed.
+
+        Raises:
+            OSError: If the cache cannot be written
+        """
+        if not self.dirty:
+            return
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".cache.")
+        try:
+            with open(fd, "w") as f:
+                json.dump({"version": INDEX_VERSION, self.section: self._snapshot()}, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.dirty = False
+
+
+class TagIndex(JsonCache):
+    """On-disk index of where each tag key sits in each file.
+
+    Entries are keyed by real path and validated against the file's stat
+    signature (size, mtime, inode) and the key set they were scanned for, so
+    an unchanged file costs one `stat` instead of a read and a scan.
+    """
+
+    section = "files"
+
+    def lookup(
+        self, file_path: str, st: os.stat_result, keys: list[str]
+    ) -> list[TagMatch] | None:
+        """Get the indexed matches of a file, or None if it must be rescanned."""
+        entry = self._get(os.path.realpath(file_path))
+        if entry is None or entry.get("stat") != stat_signature(st):
+            return None
+        return decode_matches(entry, keys)
+
+    def store(
+        self,
+        file_path: str,
+        st: os.stat_result,
+        keys: list[str],
+        matches: list[TagMatch],
+    ) -> None:
+        """Index the matches found in a file read with stat result `st`."""
+        if time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS:
+            return
+        entry = {
+            "stat": stat_signature(st),
+            "keys": sorted(keys),
+            "matches": encode_matches(matches),
+        }
+        self._set(os.path.realpath(file_path), entry)
+
+    def discard(self, file_path: str) -> None:
+        """Forget a file, e.g. after rewriting it."""
+        with self._lock:
+            if self.entries.pop(os.path.realpath(file_path), None) is not None:
+                self.dirty = True
+
+
+class BlobCache(JsonCache):
+    """Tag matches memoized by git blob ID and scanned key set.
+
+    A blob's content never changes, so its entries need no invalidation and
+    survive fresh clones; restore the cache file between runs (for example
+    with actions/cache). Only blobs used in a run are saved, which keeps the
+    file as small as the set of files the workflow touches.
+    """
+
+    section = "blobs"
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._used: set[str] = set()
+
+    def lookup(self, blob_id: str, keys: list[str]) -> list[TagMatch] | None:
+        """Get the matches of a blob scanned for `keys`, or None."""
+        entry = self._get(blob_id)
+        if entry is None:
+            return None
+        matches = decode_matches(entry, keys)
+        if matches is not None:
+            with self._lock:
+                if blob_id not in self._used:
+                    self._used.add(blob_id)
+                    self.dirty = True
+        return matches
+
+    def store(self, blob_id: str, keys: list[str], matches: list[TagMatch]) -> None:
+        """Memoize the matches found in a blob."""
+        entry = {"keys": sorted(keys), "matches": encode_matches(matches)}
+        with self._lock:
+            self.entries[blob_id] = entry
+            self._used.add(blob_id)
+            self.dirty = True
+
+    def _snapshot(self) -> dict[str, dict]:
+        return {blob_id: self.entries[blob_id] for blob_id in sorted(self._used)}
@@ -4,11 +4,17 @@ from __future__ import annotations
 
 import os
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from .discovery import DEFAULT_EXCLUDE_DIRS, split_list
+from .image_ref import is_digest
+from .manifest import load_manifest
+from .yaml_path import DocumentSelector, is_path_key, parse_path
 
 # Constants
 TAG_PATTERN = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9._-]*$")
 REPO_PATTERN = re.compile(r"^[a-zA-Z0-9._-]+/[a-zA-Z0-9._-]+$")
+IMAGE_NAME_PATTERN = re.compile(r"^[\w.-]+(?::\d+(?=/))?(?:/[\w.-]+)*$")
 REQUIRED_FIELDS = [
     "target_path",
     "new_tag",
@@ -19,6 +25,140 @@ REQUIRED_FIELDS = [
     "repo",
     "branch",
 ]
+# Fields that a manifest supplies per entry instead
+MANIFEST_OPTIONAL_FIELDS = {"new_tag", "tag_string"}
+# What a run does: rewrite tags, copy them between files, or only report them
+MODES = ("update", "promote", "scan")
+# Fields a promotion reads from its source files instead
+PROMOTE_OPTIONAL_FIELDS = {"new_tag"}
+PROMOTION_ARROW = re.compile(r"\s*->\s*")
+# A scan reads files only, so it needs neither a tag nor git settings
+SCAN_REQUIRED_FIELDS = ["target_path", "tag_string"]
+# Where file_pattern candidates come from
+DISCOVERY_MODES = ("filesystem", "git")
+# How unchanged files are recognized between runs
+CACHE_MODES = ("off", "stat", "blob")
+# How updated files are committed: `git add .` + `git commit`, git plumbing,
+# or objects written in-process
+COMMIT_MODES = ("worktree", "plumbing", "python")
+
+
+@dataclass
+class TagTarget:
+    """A tag key to update, the final tag it should receive and its conditions."""
+
+    key: str
+    final_tag: str
+    update_if_contains: str = ""
+    skip_if_contains: str = ""
+
+
+def parse_tag_strings(tag_string: str) -> list[tuple[str, str | None]]:
+    """Split a `tag_string` input into (key, tag) pairs.
+
+    Keys are separated by commas or newlines; each key may carry its own tag
+    as `key=tag`, otherwise the tag is None and `new_tag` applies.
+    """
+    entries = []
+    for item in re.split(r"[,\n]", tag_string):
+        item = item.strip()
+        if not item:
+            continue
+        key, sep, tag = item.partition("=")
+        entries.append((key.strip(), tag.strip() if sep else None))
+    return entries
+
+
+def build_tag_targets(
+    tag_string: str,
+    new_tag: str,
+    tag_prefix: str = "",
+    tag_suffix: str = "",
+    update_if_contains: str = "",
+    skip_if_contains: str = "",
+) -> list[TagTarget]:
+    """Build the tag targets for a `tag_string` (prefix/suffix applied)."""
+    return [
+        TagTarget(
+            key=key,
+            final_tag=f"{tag_prefix}{tag or new_tag}{tag_suffix}",
+            update_if_contains=update_if_contains,
+            skip_if_contains=skip_if_contains,
+        )
+        for key, tag in parse_tag_strings(tag_string)
+    ]
+
+
+def validate_tag_keys(tag_string: str) -> None:
+    """Validate the keys of a `tag_string`, ignoring their tags.
+
+    Raises:
+        ValueError: If there are no keys, or a key is missing, duplicated or
+            an invalid path
+    """
+    entries = parse_tag_strings(tag_string)
+    if not entries:
+        raise ValueError(f"No tag keys found in tag_string: '{tag_string}'")
+    keys = set()
+    for key, tag in entries:
+        if not key:
+            raise ValueError(f"Invalid tag_string entry: missing key in '{tag}'")
+        if key in keys:
+            raise ValueError(f"Duplicate key in tag_string: {key}")
+        keys.add(key)
+        if is_path_key(key):
+            parse_path(key)
+
+
+def validate_tag_string(
+    tag_string: str, new_tag: str, tag_prefix: str, tag_suffix: str
+) -> None:
+    """Validate the keys and per-key tags of a `tag_string`.
+
+    Raises:
+        ValueError: If a key is missing, duplicated or an invalid path, or a
+            tag is invalid
+    """
+    validate_tag_keys(tag_string)
+    for key, tag in parse_tag_strings(tag_string):
+        if tag is not None and not TAG_PATTERN.match(tag):
+            raise ValueError(
+                f"Invalid tag format for key '{key}': {tag}. "
+                "Tags should only contain alphanumeric characters, dots, underscores, and hyphens."
+            )
+        if not (tag or new_tag):
+            raise ValueError(f"No tag given for key '{key}' and new_tag is not set")
+    for target in build_tag_targets(tag_string, new_tag, tag_prefix, tag_suffix):
+        if not TAG_PATTERN.match(target.final_tag):
+            raise ValueError(
+                f"Invalid final tag format for key '{target.key}': {target.final_tag}."
+            )
+
+
+@dataclass
+class UpdateSpec:
+    """One entry of a batch update manifest."""
+
+    tag_string: str
+    new_tag: str
+    target_values_file: str | None = None
+    file_pattern: str | None = None
+    exclude_pattern: str = ""
+    tag_prefix: str = ""
+    tag_suffix: str = ""
+    update_if_contains: str = ""
+    skip_if_contains: str = ""
+
+    def get_tag_targets(self) -> list[TagTarget]:
+        """Get every key of this entry with its final tag and conditions."""
+        return build_tag_targets(
+            self.tag_string,
+            self.new_tag,
+            self.tag_prefix,
+            self.tag_suffix,
+            self.update_if_contains,
+            self.skip_if_contains,
+        )
 
 
 @dataclass
@@ -45,6 +185,24 @@ class Config:
     update_if_contains: str = ""
     skip_if_contains: str = ""
     summary_file: str = ""
+    max_workers: int = 1
+    large_file_threshold: int = 0
+    manifest: str = ""
+    exclude_dirs: str = DEFAULT_EXCLUDE_DIRS
+    exclude_pattern: str = ""
+    discovery: str = "filesystem"
+    cache_mode: str = "off"
+    cache_dir: str = ""
+    skip_missing: bool = False
+    documents: str = ""
+    image_name: str = ""
+    mode: str = "update"
+    inventory_file: str = ""
+    promotions: str = ""
+    commit_mode: str = "worktree"
+    _updates: list[UpdateSpec] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @classmethod
     def from_env(cls) -> "Config":
@@ -70,19 +228,199 @@ class Config:
             update_if_contains=os.getenv("UPDATE_IF_CONTAINS", ""),
             skip_if_contains=os.getenv("SKIP_IF_CONTAINS", ""),
             summary_file=os.getenv("SUMMARY_FILE", ""),
+            max_workers=int(os.getenv("MAX_WORKERS") or "1"),
+            large_file_threshold=int(os.getenv("LARGE_FILE_THRESHOLD") or "0"),
+            manifest=os.getenv("MANIFEST", ""),
+            exclude_dirs=os.getenv("EXCLUDE_DIRS", DEFAULT_EXCLUDE_DIRS),
+            exclude_pattern=os.getenv("EXCLUDE_PATTERN", ""),
+            discovery=os.getenv("DISCOVERY") or "filesystem",
+            cache_mode=os.getenv("CACHE_MODE") or "off",
+            cache_dir=os.getenv("CACHE_DIR", ""),
+            skip_missing=os.getenv("SKIP_MISSING", "false").lower() == "true",
+            documents=os.getenv("DOCUMENTS", ""),
+            image_name=os.getenv("IMAGE_NAME", ""),
+            mode=os.getenv("MODE") or "update",
+            inventory_file=os.getenv("INVENTORY_FILE", ""),
+            promotions=os.getenv("PROMOTIONS", ""),
+            commit_mode=os.getenv("COMMIT_MODE") or "worktree",
         )
 
     def get_final_tag(self) -> str:
         """Get the final tag with prefix and suffix applied."""
         return f"{self.tag_prefix}{self.new_tag}{self.tag_suffix}"
 
+    def get_tag_targets(self) -> list[TagTarget]:
+        """Get every configured tag key with its final tag (prefix/suffix applied).
+
+        With `image_name` set, the keys are image names instead.
+        """
+        return build_tag_targets(
+            self.image_name or self.tag_string,
+            self.new_tag,
+            self.tag_prefix,
+            self.tag_suffix,
+            self.update_if_contains,
+            self.skip_if_contains,
+        )
+
+    def get_exclude_dirs(self) -> list[str]:
+        """Get the directory patterns pruned during file discovery."""
+        return split_list(self.exclude_dirs)
+
+    def get_document_selector(self) -> DocumentSelector | None:
+        """Get the selector limiting updates to some documents, if configured.
+
+        Raises:
+            ValueError: If a selector is malformed
+        """
+        return DocumentSelector(self.documents) if self.documents.strip() else None
+
+    def get_promotions(self) -> list[tuple[str, str]]:
+        """Get the (source, destination) file pairs of a promotion.
+
+        Pairs are written `source -> destination` and separated by commas
+        or newlines.
+
+        Raises:
+            ValueError: If a pair is malformed
+        """
+        pairs = []
+        for item in split_list(self.promotions):
+            parts = PROMOTION_ARROW.split(item)
+            if len(parts) != 2 or not all(parts):
+                raise ValueError(
+                    f"Invalid promotion: '{item}'. Expected 'source -> destination'."
+                )
+            if parts[0] == parts[1]:
+                raise ValueError(
+                    f"Promotion source and destination are the same: {item}"
+                )
+            pairs.append((parts[0], parts[1]))
+        return pairs
+
+    def get_updates(self) -> list[UpdateSpec]:
+        """Load the manifest's updates once; missing fields fall back to this config.
+
+        Raises:
+            ValueError: If the manifest cannot be loaded
+        """
+        if self._updates is None:
+            self._updates = [
+                UpdateSpec(
+                    target_values_file=entry.get("file")
+                    or entry.get("target_values_file"),
+                    file_pattern=entry.get("file_pattern"),
+                    exclude_pattern=entry.get("exclude_pattern", self.exclude_pattern),
+                    tag_string=entry.get("tag_string", self.tag_string or "tag"),
+                    new_tag=entry.get("new_tag", self.new_tag),
+                    tag_prefix=entry.get("tag_prefix", self.tag_prefix),
+                    tag_suffix=entry.get("tag_suffix", self.tag_suffix),
+                    update_if_contains=entry.get(
+                        "update_if_contains", self.update_if_contains
+                    ),
+                    skip_if_contains=entry.get(
+                        "skip_if_contains", self.skip_if_contains
+                    ),
+                )
+                for entry in load_manifest(self.manifest)
+            ]
+        return self._updates
+
     def validate(self) -> None:
         """Validate configuration values."""
+        if self.mode not in MODES:
+            raise ValueError(
+                f"Invalid mode: {self.mode}. Must be one of: {', '.join(MODES)}."
+            )
+        scan = self.mode == "scan"
+        promote = self.mode == "promote"
+
         # Check required fields
-        missing = [field for field in REQUIRED_FIELDS if not getattr(self, field)]
+        required = [
+            name
+            for name in (SCAN_REQUIRED_FIELDS if scan else REQUIRED_FIELDS)
+            if not (self.manifest and name in MANIFEST_OPTIONAL_FIELDS)
+            and not (promote and name in PROMOTE_OPTIONAL_FIELDS)
+        ]
+        missing = [name for name in required if not getattr(self, name)]
         if missing:
             raise ValueError(f"Required fields are not set: {', '.join(missing)}")
 
+        if self.manifest and self.image_name:
+            raise ValueError("Cannot combine manifest with image_name.")
+        if scan:
+            self._validate_scan()
+        elif promote:
+            self._validate_promotions()
+        elif self.manifest:
+            self._validate_manifest()
+        elif self.image_name:
+            self._validate_images()
+        else:
+            self._validate_tags()
+
+        # Validate repo format (owner/name)
+        if not scan and not REPO_PATTERN.match(self.repo):
+            raise ValueError(
+                f"Invalid repo format: {self.repo}. Expected 'owner/name' format."
+            )
+
+        if self.max_workers < 1:
+            raise ValueError(
+                f"Invalid max_workers: {self.max_workers}. Must be at least 1."
+            )
+
+        if self.large_file_threshold < 0:
+            raise ValueError(
+                f"Invalid large_file_threshold: {self.large_file_threshold}. "
+                "Must be 0 (disabled) or a size in bytes."
+            )
+
+        if self.discovery not in DISCOVERY_MODES:
+            raise ValueError(
+                f"Invalid discovery: {self.discovery}. "
+                f"Must be one of: {', '.join(DISCOVERY_MODES)}."
+            )
+
+        if self.cache_mode not in CACHE_MODES:
+            raise ValueError(
+                f"Invalid cache_mode: {self.cache_mode}. "
+                f"Must be one of: {', '.join(CACHE_MODES)}."
+            )
+
+        if self.commit_mode not in COMMIT_MODES:
+            raise ValueError(
+                f"Invalid commit_mode: {self.commit_mode}. "
+                f"Must be one of: {', '.join(COMMIT_MODES)}."
+            )
+
+        self.get_document_selector()
+
+        if promote:
+            return
+
+        if self.manifest:
+            if self.target_values_file or self.file_pattern:
+                raise ValueError(
+                    "Cannot combine manifest with target_values_file or file_pattern."
+                )
+            return
+
+        # Check if at least one of target_values_file or file_pattern is set
+        if not self.target_values_file and not self.file_pattern:
+            raise ValueError("Either target_values_file or file_pattern must be set")
+
+        # Check if both are set (not allowed)
+        if self.target_values_file and self.file_pattern:
+            raise ValueError(
+                "Cannot set both target_values_file and file_pattern. Choose one."
+            )
+
+        if self.exclude_pattern and not self.file_pattern:
+            raise ValueError("exclude_pattern can only be used with file_pattern")
+
+    def _validate_tags(self) -> None:
+        """Validate new_tag, prefix/suffix and tag_string keys."""
         # Validate tag format (without prefix/suffix)
         if not TAG_PATTERN.match(self.new_tag):
             raise ValueError(
@@ -98,34 +436,113 @@ class Config:
                 "Tags should only contain alphanumeric characters, dots, underscores, and hyphens."
             )
 
-        # Validate repo format (owner/name)
-        if not REPO_PATTERN.match(self.repo):
-            raise ValueError(
-                f"Invalid repo format: {self.repo}. Expected 'owner/name' format."
-            )
+        # Validate per-key tags in a multi-key tag_string
+        validate_tag_string(
+            self.tag_string, self.new_tag, self.tag_prefix, self.tag_suffix
+        )
 
-        # Check if at least one of target_values_file or file_pattern is set
-        if not self.target_values_file and not self.file_pattern:
-            raise ValueError("Either target_values_file or file_pattern must be set")
+    def _validate_scan(self) -> None:
+        """Validate the keys a scan reports; tags are never written."""
+        if self.image_name:
+            self._validate_image_names()
+        elif not self.manifest:
+            validate_tag_keys(self.tag_string)
+        for index, spec in enumerate(self.get_updates() if self.manifest else [], 1):
+            try:
+                validate_tag_keys(spec.tag_string)
+            except ValueError as e:
+                raise ValueError(f"Manifest entry {index}: {e}") from e
 
-        # Check if both are set (not allowed)
-        if self.target_values_file and self.file_pattern:
+    def _validate_promotions(self) -> None:
+        """Validate promotion pairs and the keys whose tags they copy."""
+        if not self.get_promotions():
+            raise ValueError("promotions must be set when mode is promote")
+        if self.manifest or self.target_values_file or self.file_pattern:
             raise ValueError(
-                "Cannot set both target_values_file and file_pattern. Choose one."
+                "Cannot combine promotions with manifest, target_values_file "
+                "or file_pattern."
             )
+        if self.image_name:
+            self._validate_image_names()
+        else:
+            validate_tag_keys(self.tag_string)
+
+    def _validate_image_names(self) -> None:
+        """Validate the image names of `image_name`."""
+        targets = self.get_tag_targets()
+        if not targets:
+            raise ValueError(f"No image names found in image_name: '{self.image_name}'")
+        names = set()
+        for target in targets:
+            if not IMAGE_NAME_PATTERN.match(target.key):
+                raise ValueError(f"Invalid image name: '{target.key}'")
+            if target.key in names:
+                raise ValueError(f"Duplicate image in image_name: {target.key}")
+            names.add(target.key)
+
+    def _validate_images(self) -> None:
+        """Validate image names and their final tags or digests."""
+        self._validate_image_names()
+        for target in self.get_tag_targets():
+            final_tag = target.final_tag
+            if not (TAG_PATTERN.match(final_tag) or is_digest(final_tag)):
+                raise ValueError(
+                    f"Invalid final tag format for image '{target.key}': {final_tag}. "
+                    "Expected a tag or a digest such as sha256:<hex>."
+                )
+
+    def _validate_manifest(self) -> None:
+        """Validate every manifest entry once, before any file is touched."""
+        for index, spec in enumerate(self.get_updates(), 1):
+            if not spec.target_values_file and not spec.file_pattern:
+                raise ValueError(
+                    f"Manifest entry {index}: either file or file_pattern must be set"
+                )
+            if spec.target_values_file and spec.file_pattern:
+                raise ValueError(
+                    f"Manifest entry {index}: cannot set both file and file_pattern"
+                )
+            try:
+                validate_tag_string(
+                    spec.tag_string, spec.new_tag, spec.tag_prefix, spec.tag_suffix
+                )
+            except ValueError as e:
+                raise ValueError(f"Manifest entry {index}: {e}") from e
 
     def print_config(self) -> None:
         """Print current configuration."""
         print("Configuration:")
         print(f"• Path: {self.target_path}")
-        print(f"• Tag: {self.new_tag}")
-        final_tag = self.get_final_tag()
-        if final_tag != self.new_tag:
-            print(f"• Final Tag (with prefix/suffix): {final_tag}")
-        print(f"• Branch: {self.branch}")
+        if self.mode == "update":
+            print(f"• Tag: {self.new_tag}")
+            final_tag = self.get_final_tag()
+            if final_tag != self.new_tag:
+                print(f"• Final Tag (with prefix/suffix): {final_tag}")
+        if self.mode != "scan":
+            print(f"• Branch: {self.branch}")
         if self.dry_run:
             print("• Mode: Dry Run")
+        if self.max_workers > 1:
+            print(f"• Workers: {self.max_workers}")
         if self.target_values_file:
             print(f"• File: {self.target_values_file}")
         if self.file_pattern:
             print(f"• Pattern: {self.file_pattern}")
+        if self.exclude_pattern:
+            print(f"• Exclude: {self.exclude_pattern}")
+        if self.discovery != "filesystem":
+            print(f"• Discovery: {self.discovery}")
+        if self.cache_mode != "off":
+            print(f"• Cache: {self.cache_mode}")
+        if self.commit_mode != "worktree":
+            print(f"• Commit: {self.commit_mode}")
+        if self.manifest:
+            print(f"• Manifest: {self.manifest}")
+        if self.documents:
+            print(f"• Documents: {self.documents}")
+        if self.image_name:
+            print(f"• Images: {self.image_name}")
+        if self.mode != "update":
+            print(f"• Mode: {self.mode}")
+        for source, destination in self.get_promotions():
+            print(f"• Promote: {source} -> {destination}")
@@ -0,0 +1,398 @@
+"""File discovery utilities for image tag updater."""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+from collections.abc import Iterator
+
+# Directories never descended into by wildcard patterns unless configured otherwise
+DEFAULT_EXCLUDE_DIRS = ".git,node_modules,charts/*/charts"
+
+GLOB_MAGIC = re.compile(r"[*?[]")
+
+# Read size for streaming `git ls-files -z` output
+LS_FILES_CHUNK = 1 << 16
+
+
+def has_magic(part: str) -> bool:
+    """Whether a pattern component contains glob wildcards."""
+    return GLOB_MAGIC.search(part) is not None
+
+
+def translate_component(part: str) -> str:
+    """Translate one glob path component to a regex (no `/` is ever matched).
+
+    Like `glob`, wildcards do not match a leading dot unless the component
+    itself starts with one.
+    """
+    out = [] if part.startswith(".") else ["(?!\\.)"]
+    i = 0
+    while i < len(part):
+        char = part[i]
+        i += 1
+        if char == "*":
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[":
+            end = part.find("]", i + 1 if part[i : i + 1] in ("!", "]") else i)
+            if end == -1:
+                out.append("\\[")
+                continue
+            body = part[i:end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+            i = end + 1
+        else:
+            out.append(re.escape(char))
+    return "".join(out)
+
+
+def split_list(value: str) -> list[str]:
+    """Split a comma- or newline-separated list, dropping empty items."""
+    return [item.strip() for item in re.split(r"[,\n]", value) if item.strip()]
+
+
+class DirectoryPruner:
+    """Decide which directories a walk must not descend into.
+
+    Patterns without a `/` match a directory name anywhere; patterns with one
+    match the trailing components of a directory path (`charts/*/charts`
+    prunes every vendored subchart directory, however deep). Only directories
+    reached through a wildcard are pruned; see `PathMatcher.names_dir`.
+    """
+
+    def __init__(self, patterns: list[str]):
+        names = []
+        paths = []
+        for pattern in patterns:
+            parts = [part for part in pattern.strip("/").split("/") if part]
+            if not parts:
+                continue
+            regex = "/".join(translate_component(part) for part in parts)
+            (paths if len(parts) > 1 else names).append(regex)
+        self.names = re.compile("|".join(names)) if names else None
+        self.paths = (
+            re.compile("(?:^|/)(?:" + "|".join(paths) + ")$") if paths else None
+        )
+        # Any pruned directory among the parents of a file path
+        self.parents = (
+            re.compile("(?:^|/)(?:" + "|".join(names + paths) + ")/")
+            if names or paths
+            else None
+        )
+
+    def excluded(self, name: str, path: str) -> bool:
+        """Whether the directory `name` at `path` should be pruned."""
+        if self.names is not None and self.names.fullmatch(name):
+            return True
+        return self.paths is not None and self.paths.search(path) is not None
+
+    def excludes_file(self, path: str) -> bool:
+        """Whether any parent directory of a file path is pruned."""
+        return self.parents is not None and self.parents.search(path) is not None
+
+
+# Any non-hidden path component
+ANY_COMPONENT = r"(?!\.)[^/]+"
+
+
+def pattern_components(pattern: str) -> list[str]:
+    """Split a glob into components, dropping `.`/empty ones and repeated `**`."""
+    parts: list[str] = []
+    for part in pattern.split("/"):
+        if part in ("", ".") or (part == "**" and parts[-1:] == ["**"]):
+            continue
+        parts.append(part)
+    return parts
+
+
+def _component_regex(part: str) -> str:
+    return translate_component(part) if has_magic(part) else re.escape(part)
+
+
+def translate_pattern(pattern: str) -> tuple[str, str]:
+    """Translate a path glob into a file regex and a directory-prefix regex.
+
+    The file regex matches paths the glob names (`**` spans zero or more
+    directories). The directory regex matches every directory a walk must
+    enter to reach them, so all other directories can be skipped.
+    """
+    parts = pattern_components(pattern)
+    root = "/" if pattern.startswith("/") else ""
+
+    file_regex = re.escape(root)
+    for index, part in enumerate(parts):
+        last = index == len(parts) - 1
+        if part == "**":
+            file_regex += f"(?:{ANY_COMPONENT}/)*" + (ANY_COMPONENT if last else "")
+        else:
+            file_regex += _component_regex(part) + ("" if last else "/")
+
+    # Directories: c1, c1/c2, ... up to the parent of the last component;
+    # any (non-hidden) directory below a `**` is a candidate
+    dir_parts = parts if parts[-1:] == ["**"] else parts[:-1]
+    dir_regex = ""
+    optional = 0
+    for index, part in enumerate(dir_parts):
+        if part == "**":
+            if index:
+                dir_regex += f"(?:/{ANY_COMPONENT})*"
+            else:
+                dir_regex += f"{re.escape(root)}{ANY_COMPONENT}(?:/{ANY_COMPONENT})*"
+            break
+        if index:
+            dir_regex += f"(?:/{_component_regex(part)}"
+            optional += 1
+        else:
+            dir_regex += re.escape(root) + _component_regex(part)
+    return file_regex, dir_regex + ")?" * optional
+
+
+def literal_dirs(pattern: str) -> list[str]:
+    """Regexes of the directories a glob names literally.
+
+    In `charts/*/charts/*/values.yaml` both `charts` components are literal,
+    so `charts` and `charts/<any>/charts` are named by the pattern itself.
+    """
+    parts = pattern_components(pattern)
+    prefix = re.escape("/" if pattern.startswith("/") else "")
+    regexes = []
+    for part in parts[:-1]:
+        if part == "**":
+            prefix += f"(?:{ANY_COMPONENT}/)*"
+        elif has_magic(part):
+            prefix += translate_component(part) + "/"
+        else:
+            regexes.append(prefix + re.escape(part))
+            prefix += re.escape(part) + "/"
+    return regexes
+
+
+def literal_base(pattern: str) -> str:
+    """The leading literal directories of a glob, where a walk can start."""
+    parts = pattern_components(pattern)
+    base = []
+    for part in parts[:-1]:
+        if part == "**" or has_magic(part):
+            break
+        base.append(part)
+    root = "/" if pattern.startswith("/") else ""
+    return root + "/".join(base) if base else root
+
+
+class PathMatcher:
+    """Include/exclude globs compiled into one regex for a single test per path.
+
+    Directories are checked against a second combined regex of every
+    directory an include can reach, so a walk only enters those.
+
+    Like `glob`, matches of an include written as `./pattern` keep the `./`
+    prefix (see `output`).
+    """
+
+    def __init__(self, include: list[str], exclude: list[str] | None = None):
+        self.include = list(include)
+        self.exclude = list(exclude or [])
+        includes = [translate_pattern(pattern) for pattern in self.include]
+        excludes = [translate_pattern(pattern)[0] for pattern in self.exclude]
+
+        file_regex = "(?:" + "|".join(regex for regex, _ in includes) + ")"
+        if excludes:
+            file_regex = "(?!(?:" + "|".join(excludes) + r")\Z)" + file_regex
+        self.regex = re.compile(file_regex)
+
+        dirs = [regex for _, regex in includes if regex]
+        self.dir_regex = re.compile("|".join(dirs)) if dirs else None
+        literals = [regex for p in self.include for regex in literal_dirs(p)]
+        self.literal_regex = re.compile("|".join(literals)) if literals else None
+        dotted = [
+            regex for p, (regex, _) in zip(self.include, includes) if p.startswith("./")
+        ]
+        self.dotted = re.compile("|".join(dotted)) if dotted else None
+        self.bases = self._bases([literal_base(p) for p in self.include])
+        self.absolute = any(pattern.startswith("/") for pattern in self.include)
+
+    @staticmethod
+    def _bases(bases: list[str]) -> list[str]:
+        """Drop bases nested inside another base so no directory is walked twice."""
+
+        def within(base: str, parent: str) -> bool:
+            if parent in ("", "/"):
+                return base.startswith("/") == (parent == "/")
+            return base.startswith(parent + "/")
+
+        kept: list[str] = []
+        for base in sorted(set(bases), key=len):
+            if not any(within(base, parent) for parent in kept):
+                kept.append(base)
+        return sorted(kept)
+
+    def match(self, path: str) -> bool:
+        """Whether a file path is included and not excluded."""
+        return self.regex.fullmatch(path) is not None
+
+    def output(self, path: str) -> str:
+        """A matched path as reported, with `./` if a `./` include matches it."""
+        if self.dotted is not None and self.dotted.fullmatch(path):
+            return "./" + path
+        return path
+
+    def enters(self, path: str) -> bool:
+        """Whether a directory may contain included files."""
+        return self.dir_regex is not None and self.dir_regex.fullmatch(path) is not None
+
+    def names_dir(self, path: str) -> bool:
+        """Whether some include names this directory literally, not by wildcard."""
+        return (
+            self.literal_regex is not None
+            and self.literal_regex.fullmatch(path) is not None
+        )
+
+
+def pruned(path: str, matcher: PathMatcher, pruner: DirectoryPruner) -> bool:
+    """Whether a walk must skip a directory: excluded, and not named literally."""
+    if not pruner.excluded(os.path.basename(path), path):
+        return False
+    return not matcher.names_dir(path)
+
+
+def in_pruned_dir(path: str, matcher: PathMatcher, pruner: DirectoryPruner) -> bool:
+    """Whether any parent directory of a file path is pruned."""
+    if not pruner.excludes_file(path):
+        return False
+    parent = os.path.dirname(path)
+    while parent not in ("", "/"):
+        if pruned(parent, matcher, pruner):
+            return True
+        parent = os.path.dirname(parent)
+    return False
+
+
+def walk_files(
+    include: str | list[str],
+    exclude: list[str] | None = None,
+    exclude_dirs: list[str] | None = None,
+) -> Iterator[str]:
+    """Yield files matching the include globs and no exclude glob, lazily.
+
+    Directories are listed with `os.scandir`, whose cached entry types avoid a
+    `stat` per file. Each walk starts at an include's literal base directory
+    and only enters directories some include can still match; directories
+    matching `exclude_dirs` are pruned unless an include names them
+    literally. Paths are yielded in sorted order within each directory.
+    """
+    matcher = PathMatcher([include] if isinstance(include, str) else include, exclude)
+    pruner = DirectoryPruner(
+        split_list(DEFAULT_EXCLUDE_DIRS) if exclude_dirs is None else exclude_dirs
+    )
+    return find_files(matcher, pruner)
+
+
+def find_files(matcher: PathMatcher, pruner: DirectoryPruner) -> Iterator[str]:
+    """Walk every base of `matcher`, yielding each matching file once."""
+    for base in matcher.bases:
+        if base and not os.path.isdir(base):
+            continue
+        for path in _walk(base, matcher, pruner):
+            yield matcher.output(path)
+
+
+def git_files(matcher: PathMatcher, pruner: DirectoryPruner) -> Iterator[str]:
+    """Yield tracked files matching `matcher`, read from the git index.
+
+    One `git ls-files -z` call, limited by pathspecs to each include's
+    literal base directory, is streamed through the matcher; untracked and
+    ignored files are never seen. Like a walk, directories matching
+    `exclude_dirs` are pruned unless an include names them literally.
+
+    Raises:
+        OSError: If git cannot be run or `git ls-files` fails
+    """
+    cwd = os.getcwd()
+    pathspecs = [base or "." for base in matcher.bases]
+    cmd = ["git", "ls-files", "-z", "--", *pathspecs]
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+        try:
+            for path in _split_nul(proc.stdout):
+                # ls-files prints paths relative to the working directory
+                if matcher.absolute and not matcher.match(path):
+                    path = os.path.join(cwd, path)
+                if not matcher.match(path) or in_pruned_dir(path, matcher, pruner):
+                    continue
+                # Index entries may be deleted in the worktree or be submodules
+                if os.path.isfile(path):
+                    yield matcher.output(path)
+        except GeneratorExit:
+            proc.kill()
+            raise
+        stderr = proc.stderr.read().decode("utf-8", errors="replace")
+    if proc.returncode:
+        raise OSError(f"git ls-files failed: {stderr.strip()}")
+
+
+def git_blob_ids() -> dict[str, str]:
+    """Map tracked files under the working directory to their blob IDs.
+
+    One `git ls-files -s -z` lists the staged blob of every file; files whose
+    worktree content differs from the index (per `git ls-files -m -z`) and
+    unmerged entries are left out, since their blob ID says nothing about
+    what is on disk. Paths are relative to the working directory.
+
+    Raises:
+        OSError: If git cannot be run or fails
+    """
+    modified = set(_git_z(["git", "ls-files", "-m", "-z"]))
+    blob_ids = {}
+    for record in _git_z(["git", "ls-files", "-s", "-z"]):
+        # "<mode> <blob id> <stage>\t<path>"
+        info, _, path = record.partition("\t")
+        _mode, blob_id, stage = info.split(" ")
+        if stage == "0" and path not in modified:
+            blob_ids[path] = blob_id
+    return blob_ids
+
+
+def _git_z(cmd: list[str]) -> list[str]:
+    """Run a git command with NUL-separated output and collect its records."""
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+        records = list(_split_nul(proc.stdout))
+        stderr = proc.stderr.read().decode("utf-8", errors="replace")
+    if proc.returncode:
+        raise OSError(f"{' '.join(cmd[:2])} failed: {stderr.strip()}")
+    return records
+
+
+def _split_nul(stream) -> Iterator[str]:
+    """Split a NUL-separated byte stream into paths as it is read."""
+    pending = b""
+    while chunk := stream.read(LS_FILES_CHUNK):
+        *paths, pending = (pending + chunk).split(b"\0")
+        for path in paths:
+            yield os.fsdecode(path)
+    if pending:
+        yield os.fsdecode(pending)
+
+
+def _scan(directory: str) -> list[os.DirEntry]:
+    """List a directory sorted by name; unreadable directories are empty."""
+    try:
+        with os.scandir(directory or ".") as it:
+            return sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return []
+
+
+def _walk(
+    directory: str, matcher: PathMatcher, pruner: DirectoryPruner
+) -> Iterator[str]:
+    for entry in _scan(directory):
+        path = os.path.join(directory, entry.name) if directory else entry.name
+        if entry.is_dir():
+            if matcher.enters(path) and not pruned(path, matcher, pruner):
+                yield from _walk(path, matcher, pruner)
+        elif entry.is_file() and matcher.match(path):
+            yield path
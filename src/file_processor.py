@@ -2,13 +2,39 @@
 
 from __future__ import annotations
 
+import hashlib
+import mmap
 import os
-import re
 import shutil
-from glob import glob
-
-from .config import Config
+import tempfile
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import BinaryIO
+
+from .cache import BLOB_CACHE_FILE, INDEX_FILE, BlobCache, TagIndex, find_git_dir
+from .config import TAG_PATTERN, Config, TagTarget
+from .discovery import (
+    DirectoryPruner,
+    PathMatcher,
+    find_files,
+    git_blob_ids,
+    git_files,
+    split_list,
+)
+from .image_ref import ImageScanner, is_digest
+from .kustomize import KustomizeScanner, is_kustomization
 from .logger import Logger
+from .scanner import ScanResult, TagScanner
+from .yaml_path import scalar_value
+
+# Chunk size for streaming the tail of memory-mapped files
+COPY_CHUNK = 1 << 20
+
+# Upper bound on rewritten content held for reuse by identical files
+MEMO_MAX_BYTES = 64 << 20
 
 
 class FileProcessor:
@@ -19,41 +45,235 @@ class FileProcessor:
         self.logger = logger
         self.updated_files: list[str] = []
         self.old_tags: dict[str, str] = {}  # file_path -> old_tag
+        # file_path -> {tag key -> old_tag} for every key that was updated
+        self.old_tags_by_key: dict[str, dict[str, str]] = {}
+        # file_path -> {tag key -> final tag} for every key that was updated
+        self.new_tags_by_key: dict[str, dict[str, str]] = {}
+        self.targets = [] if config.manifest else config.get_tag_targets()
+        self.final_tags = {t.key: t.final_tag for t in self.targets}
+        self.documents = config.get_document_selector()
+        # Image names are matched inside image references instead of as keys
+        self._scanner_class = ImageScanner if config.image_name else TagScanner
+        self.scanner = self._scanner_class(
+            [t.key for t in self.targets] or ["tag"], self.documents
+        )
+        # file_path -> targets, for manifest runs where each file has its own
+        self.plan: dict[str, list[TagTarget]] = {}
+        self._scanners = {tuple(self.scanner.keys): self.scanner}
+        self._dirty_dirs: set[str] = set()  # directories to fsync after writes
+        self.pruner = DirectoryPruner(config.get_exclude_dirs())
+        # Persistent caches (cache_mode "stat" or "blob"); see _open_caches
+        self.index: TagIndex | None = None
+        self.blob_cache: BlobCache | None = None
+        self.blob_ids: dict[str, str] = {}  # relative path -> git blob ID
+        # (content hash, scanner signature, final tags) -> (matches, new content)
+        self._memo: dict[tuple, tuple[list, bytes | None]] = {}
+        self._memo_bytes = 0
+        self._memo_lock = threading.Lock()
+        self.memo_hits = 0
+        self._open_caches()
+
+    def _open_caches(self) -> None:
+        """Load the persistent cache selected by `cache_mode`."""
+        if self.config.cache_mode == "off":
+            return
+        cache_dir = self.config.cache_dir
+        if not cache_dir:
+            git_dir = find_git_dir()
+            if git_dir is None:
+                self.logger.warning("No .git directory found; tag cache disabled")
+                return
+            cache_dir = os.path.join(git_dir, "image-tag-updater")
+        if self.config.cache_mode == "blob":
+            self.blob_cache = BlobCache.load(os.path.join(cache_dir, BLOB_CACHE_FILE))
+            self.logger.debug(f"\nUsing blob cache: {self.blob_cache.path}")
+        else:
+            self.index = TagIndex.load(os.path.join(cache_dir, INDEX_FILE))
+            self.logger.debug(f"\nUsing tag index: {self.index.path}")
 
-    def validate_file_content(self, file_path: str) -> None:
-        """Validate that tag string exists in file."""
+    def _load_blob_ids(self) -> None:
+        """Fetch blob IDs of all tracked files in bulk for the blob cache."""
+        if self.blob_cache is None:
+            return
         try:
-            with open(file_path, "r") as f:
-                content = f.read()
-
-            # Check if tag_string exists in the file
-            pattern = rf"^\s*{re.escape(self.config.tag_string)}:"
-            if not re.search(pattern, content, re.MULTILINE):
-                self.logger.error(
-                    f"Tag string '{self.config.tag_string}' not found in file: {file_path}"
+            self.blob_ids = git_blob_ids()
+        except OSError as e:
+            self.logger.warning(f"Failed to read blob IDs from git: {e}")
+            self.blob_ids = {}
+
+    def _blob_id(self, file_path: str) -> str | None:
+        """Blob ID of a file whose content matches the git index, if known."""
+        if not self.blob_ids:
+            return None
+        return self.blob_ids.get(os.path.relpath(file_path))
+
+    def _save_caches(self) -> None:
+        """Persist the caches; a failure only costs the next run a rescan."""
+        for cache in (self.index, self.blob_cache):
+            if cache is None:
+                continue
+            try:
+                cache.save()
+            except OSError as e:
+                self.logger.warning(f"Failed to save tag cache {cache.path}: {e}")
+
+    def _targets_for(self, file_path: str) -> list[TagTarget]:
+        """Get the tag targets that apply to a file."""
+        return self.plan.get(file_path, self.targets)
+
+    def _scanner_for(self, file_path: str) -> TagScanner:
+        """Get the scanner for a file's keys; one compiled scanner per key set.
+
+        In image mode, kustomization files get a scanner for their `images:`
+        entries instead of one for image references.
+        """
+        targets = self._targets_for(file_path)
+        keys = tuple(t.key for t in targets)
+        if not keys:
+            return self.scanner
+        if self.config.image_name and is_kustomization(file_path):
+            final_tags = tuple(t.final_tag for t in targets)
+            scanner = self._scanners.get(("kustomize", keys, final_tags))
+            if scanner is None:
+                scanner = KustomizeScanner.for_targets(targets, self.documents)
+                self._scanners[("kustomize", keys, final_tags)] = scanner
+            return scanner
+        scanner = self._scanners.get(keys)
+        if scanner is None:
+            scanner = self._scanners[keys] = self._scanner_class(
+                list(keys), self.documents
+            )
+        return scanner
+
+    def scan_file(
+        self,
+        file_path: str,
+        final_tags: str | dict[str, str] | None = None,
+        use_index: bool = True,
+    ) -> ScanResult:
+        """Read a file once and scan it for every configured tag key.
+
+        Files at or above `large_file_threshold` bytes are scanned through a
+        read-only memory map instead of being loaded into memory. With a cache
+        enabled, a file whose stat signature (cache_mode "stat") or git blob
+        (cache_mode "blob") is already known is not read.
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        scanner = self._scanner_for(file_path)
+        if final_tags is None:
+            final_tags = {t.key: t.final_tag for t in self._targets_for(file_path)}
+        final_tags = scanner.tag_map(final_tags)
+
+        blob_id = self._blob_id(file_path) if self.blob_cache is not None else None
+        if use_index:
+            matches = None
+            if self.index is not None:
+                matches = self.index.lookup(
+                    file_path, os.stat(file_path), scanner.signature
                 )
+            elif blob_id is not None:
+                matches = self.blob_cache.lookup(blob_id, scanner.signature)
+            if matches is not None:
+                return ScanResult(
+                    content=b"", matches=matches, cached=True, final_tags=final_tags
+                )
+
+        threshold = self.config.large_file_threshold
+        with open(file_path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if threshold and st.st_size >= threshold:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    scan = scanner.scan_mapped(mm, final_tags)
+            else:
+                scan = self._scan_content(scanner, f.read(), final_tags)
+        if self.index is not None:
+            self.index.store(file_path, st, scanner.signature, scan.matches)
+        elif blob_id is not None:
+            self.blob_cache.store(blob_id, scanner.signature, scan.matches)
+        return scan
+
+    def _scan_content(
+        self, scanner: TagScanner, content: bytes, final_tags: dict[str, str]
+    ) -> ScanResult:
+        """Scan file content, reusing the result for byte-identical content.
+
+        Templated environments often hold many identical files; the scan and
+        rewrite is done once per distinct (content, keys, final tags) and
+        shared, bounded by `MEMO_MAX_BYTES` of rewritten content.
+        """
+        memo_key = (
+            hashlib.blake2b(content, digest_size=16).digest(),
+            tuple(scanner.signature),
+            tuple(sorted(final_tags.items())),
+        )
+        hit = self._memo.get(memo_key)
+        if hit is not None:
+            matches, new_content = hit
+            with self._memo_lock:
+                self.memo_hits += 1
+            return ScanResult(
+                content=content,
+                matches=list(matches),
+                new_content=content if new_content is None else new_content,
+                changed=new_content is not None,
+                final_tags=final_tags,
+            )
+
+        scan = scanner.scan(content, final_tags)
+        # Unchanged content is not stored again; the next file brings its own
+        new_content = scan.new_content if scan.changed else None
+        size = len(new_content) if new_content is not None else 0
+        with self._memo_lock:
+            if self._memo_bytes + size <= MEMO_MAX_BYTES:
+                self._memo[memo_key] = (scan.matches, new_content)
+                self._memo_bytes += size
+        return scan
+
+    def _load_scan(
+        self, file_path: str, final_tags: dict[str, str] | None = None
+    ) -> ScanResult:
+        """Scan a file, reporting read failures through the logger."""
+        try:
+            return self.scan_file(file_path, final_tags)
         except FileNotFoundError:
             self.logger.error(f"File not found: {file_path}")
         except OSError as e:
             self.logger.error(f"Failed to read file {file_path}: {e}")
 
-    def get_current_tag(self, file_path: str) -> str:
-        """Extract current tag value from file."""
+    def _check_tag_found(self, file_path: str, scan: ScanResult) -> None:
+        """Fail if the scan found no occurrence of the tag string."""
+        if not scan.found:
+            keys = ", ".join(self._scanner_for(file_path).keys)
+            what = "Image" if self.config.image_name else "Tag string"
+            self.logger.error(f"{what} '{keys}' not found in file: {file_path}")
+
+    def validate_file_content(self, file_path: str) -> None:
+        """Validate that tag string exists in file."""
+        self._check_tag_found(file_path, self._load_scan(file_path))
+
+    def get_current_tag(self, file_path: str, key: str | None = None) -> str:
+        """Extract current tag value from file (first key found, or `key`)."""
+        tags = self.get_current_tags(file_path)
+        if key is None:
+            return next(iter(tags.values()), "")
+        return tags.get(key, "")
+
+    def get_current_tags(self, file_path: str) -> dict[str, str]:
+        """Extract the current tag value of every configured key found in file."""
         try:
-            with open(file_path, "r") as f:
-                content = f.read()
-
-            pattern = rf'^\s*{re.escape(self.config.tag_string)}:\s*"?([^"\n]+)"?'
-            match = re.search(pattern, content, re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-            return ""
+            return self.scan_file(file_path).current_tags
         except OSError as e:
             self.logger.error(f"Failed to get current tag from {file_path}: {e}")
             raise  # unreachable: logger.error() raises ActionError; kept for type-checker honesty
 
     def should_skip_update(
-        self, file_path: str, current_tag: str, final_tag: str
+        self,
+        file_path: str,
+        current_tag: str,
+        final_tag: str,
+        target: TagTarget | None = None,
     ) -> tuple[bool, str | None]:
         """Check if update should be skipped.
 
@@ -61,23 +281,25 @@ class FileProcessor:
             file_path: Path to the file being checked
             current_tag: Current tag value in the file
             final_tag: Target tag value
+            target: Target whose conditions apply (defaults to the config's)
 
         Returns:
             Tuple[bool, Optional[str]]: (should_skip, reason)
         """
-        if (
-            self.config.update_if_contains
-            and self.config.update_if_contains not in current_tag
-        ):
+        conditions = target or self.config
+        update_if_contains = conditions.update_if_contains
+        skip_if_contains = conditions.skip_if_contains
+
+        if update_if_contains and update_if_contains not in current_tag:
             return (
                 True,
-                f"current tag '{current_tag}' does not contain '{self.config.update_if_contains}'",
+                f"current tag '{current_tag}' does not contain '{update_if_contains}'",
             )
 
-        if self.config.skip_if_contains and self.config.skip_if_contains in current_tag:
+        if skip_if_contains and skip_if_contains in current_tag:
             return (
                 True,
-                f"current tag '{current_tag}' contains '{self.config.skip_if_contains}'",
+                f"current tag '{current_tag}' contains '{skip_if_contains}'",
             )
 
         if current_tag == final_tag:
@@ -85,28 +307,46 @@ class FileProcessor:
 
         return False, None
 
-    def _perform_update(self, file_path: str, final_tag: str) -> bool:
+    def _perform_update(
+        self,
+        file_path: str,
+        final_tag: str | dict[str, str],
+        scan: ScanResult | None = None,
+    ) -> bool:
         """Perform actual file update.
 
         Args:
             file_path: Path to the file to update
-            final_tag: New tag value to set
+            final_tag: New tag value for every key, or a mapping of key -> tag;
+                keys missing from the mapping are left unchanged
+            scan: Result of an earlier read of the file, if already available
 
         Returns:
-            bool: True if update succeeded, False otherwise
+            bool: True if the file was rewritten, False if it was already up to date
         """
         try:
             self.logger.debug("\nUpdating image tag...")
-            with open(file_path, "r") as f:
-                content = f.read()
-
-            # Replace the tag value with final tag (including prefix/suffix)
-            pattern = rf"(^\s*{re.escape(self.config.tag_string)}:)\s*.*$"
-            replacement = rf'\1 "{final_tag}"'
-            updated_content = re.sub(pattern, replacement, content, flags=re.MULTILINE)
-
-            with open(file_path, "w") as f:
-                f.write(updated_content)
+            scanner = self._scanner_for(file_path)
+            final_tags = scanner.tag_map(final_tag)
+            if scan is None or scan.cached:
+                # Index hits carry no content; read the file to rewrite it
+                scan = self.scan_file(file_path, final_tags, use_index=False)
+            elif scan.final_tags != final_tags:
+                scan = self._rerender(scanner, scan, final_tags)
+
+            # Nothing to write when the rendered content is byte-identical
+            if not scan.changed:
+                self.logger.debug(f"No byte changes for {file_path}, skipping write")
+                return False
+
+            if scan.mapped:
+                self._patch_mapped(file_path, scan)
+            else:
+                with self._atomic_writer(file_path) as f:
+                    f.write(scan.new_content)
+            if self.index is not None:
+                self.index.discard(file_path)
+            self.blob_ids.pop(os.path.relpath(file_path), None)
 
             self.logger.success(f"Updated {file_path}")
             return True
@@ -114,37 +354,176 @@ class FileProcessor:
             self.logger.error(f"Failed to update file {file_path}: {e}")
             return False
 
-    def update_file(self, file_path: str) -> bool:
-        """Update tag in file. Returns True if changes were made."""
-        self.logger.debug(f"\nProcessing file: {file_path}")
+    @contextmanager
+    def _atomic_writer(self, file_path: str) -> Iterator[BinaryIO]:
+        """Write a file crash-safely via a temp file renamed into place.
 
-        # Get current tag value
-        current_tag = self.get_current_tag(file_path)
+        The temp file lives in the target's directory so the rename is atomic;
+        the directory is fsynced once per run by `_sync_directories`. It takes
+        over the target's mode and, where permitted, its owner and group.
+        """
+        target = os.path.realpath(file_path)
+        directory = os.path.dirname(target)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(target)}.", suffix=".tmp"
+        )
+        try:
+            with open(fd, "wb") as f:
+                yield f
+            st = os.stat(target)
+            try:
+                os.chown(tmp_path, st.st_uid, st.st_gid)
+            except PermissionError:
+                pass  # only a privileged runner may give a file away
+            shutil.copymode(target, tmp_path)
+            os.replace(tmp_path, target)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._dirty_dirs.add(directory)
+
+    def _sync_directories(self) -> None:
+        """Fsync every directory that received a renamed file, once each."""
+        for directory in sorted(self._dirty_dirs):
+            try:
+                fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                self.logger.warning(f"Failed to sync directory {directory}: {e}")
+        self._dirty_dirs.clear()
+
+    @staticmethod
+    def _rerender(
+        scanner: TagScanner, scan: ScanResult, final_tags: dict[str, str]
+    ) -> ScanResult:
+        """Re-render a scan for a different set of keys without re-reading."""
+        if scan.mapped:
+            # Only keys whose value differs from the target are ever selected
+            changed = any(m.key in final_tags for m in scan.matches)
+            return replace(scan, changed=changed, final_tags=final_tags)
+        new_content = scanner.render(scan.content, scan.matches, final_tags)
+        return replace(
+            scan,
+            new_content=new_content,
+            changed=new_content != scan.content,
+            final_tags=final_tags,
+        )
 
-        # Get final tag with prefix/suffix
-        final_tag = self.config.get_final_tag()
+    def _patch_mapped(self, file_path: str, scan: ScanResult) -> None:
+        """Patch a large file by byte range with roughly constant memory.
 
-        # Check if update should be skipped
-        should_skip, skip_reason = self.should_skip_update(
-            file_path, current_tag, final_tag
+        Same-length replacements are written in place through a writable
+        memory map, which can never truncate the file. Otherwise the new
+        content is streamed in bounded chunks into an atomically renamed
+        temp file.
+        """
+        scanner = self._scanner_for(file_path)
+        replacements = {
+            key: scanner.replacement(tag) for key, tag in scan.final_tags.items()
+        }
+        matches = [m for m in scan.matches if m.key in replacements]
+
+        if all(m.end - m.start == len(replacements[m.key]) for m in matches):
+            self.logger.debug(f"Patching {len(matches)} value(s) in place")
+            with (
+                open(file_path, "r+b") as f,
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE) as mm,
+            ):
+                for match in matches:
+                    mm[match.start : match.end] = replacements[match.key]
+                mm.flush()
+            return
+
+        self.logger.debug(
+            f"Copying {file_path} to a temp file with {len(matches)} value(s) "
+            "patched, then renaming it into place"
         )
-        if should_skip:
-            self.logger.info(f"Skipping {file_path}: {skip_reason}")
+        with (
+            open(file_path, "rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+            self._atomic_writer(file_path) as out,
+        ):
+            pos = 0
+            for match in matches:
+                self._copy_range(mm, pos, match.start, out)
+                out.write(replacements[match.key])
+                pos = match.end
+            self._copy_range(mm, pos, len(mm), out)
+
+    @staticmethod
+    def _copy_range(mm: mmap.mmap, start: int, end: int, dest) -> None:
+        """Copy mm[start:end] to `dest` in bounded chunks."""
+        for pos in range(start, end, COPY_CHUNK):
+            dest.write(mm[pos : min(pos + COPY_CHUNK, end)])
+
+    def update_file(self, file_path: str, scan: ScanResult | None = None) -> bool:
+        """Update tag in file. Returns True if changes were made."""
+        # Read and scan the file once; reuse the caller's scan if provided
+        if scan is None:
+            scan = self._load_scan(file_path)
+        old_tags = self._update_scanned(file_path, scan)
+        if not old_tags:
             return False
+        self._record_update(file_path, old_tags)
+        return True
+
+    def _record_update(self, file_path: str, old_tags: dict[str, str]) -> None:
+        """Record an updated file and its previous and new tag(s) for outputs."""
+        final_tags = {t.key: t.final_tag for t in self._targets_for(file_path)}
+        self.updated_files.append(file_path)
+        self.old_tags[file_path] = next(iter(old_tags.values()))
+        self.old_tags_by_key[file_path] = old_tags
+        self.new_tags_by_key[file_path] = {key: final_tags[key] for key in old_tags}
+
+    def _update_scanned(self, file_path: str, scan: ScanResult) -> dict[str, str]:
+        """Apply the update to an already scanned file.
+
+        Does not touch `updated_files`/`old_tags`, so it is safe to call
+        from worker threads; callers record the outcome.
+
+        Returns:
+            dict[str, str]: Old tag per key that was (or, in dry run, would be)
+            updated; empty if the file was left unchanged
+        """
+        self.logger.debug(f"\nProcessing file: {file_path}")
+        current_tags = scan.current_tags
+        targets = self._targets_for(file_path)
+        multi_key = len(targets) > 1
+
+        # Decide per key whether it should be updated
+        final_tags: dict[str, str] = {}
+        old_tags: dict[str, str] = {}
+        for target in targets:
+            current_tag = current_tags.get(target.key)
+            if current_tag is None:
+                # Nothing to rewrite, so a dry run reports no change either
+                self.logger.debug(f"Key '{target.key}' not found in {file_path}")
+                continue
+            should_skip, skip_reason = self.should_skip_update(
+                file_path, current_tag, target.final_tag, target
+            )
+            if should_skip:
+                label = f"{file_path} ({target.key})" if multi_key else file_path
+                self.logger.info(f"Skipping {label}: {skip_reason}")
+                continue
+            final_tags[target.key] = target.final_tag
+            old_tags[target.key] = current_tag
 
-        # Store old tag for output
-        self.old_tags[file_path] = current_tag
+        if not final_tags:
+            return {}
 
         # Dry run mode - show what would change
         if self.config.dry_run:
-            self.logger.info(
-                f"Current tag in {file_path}: {self.config.tag_string}: {current_tag}"
-            )
-            self.logger.info(
-                f'Would change to: {self.config.tag_string}: "{final_tag}"'
-            )
-            self.updated_files.append(file_path)
-            return True
+            for key, final_tag in final_tags.items():
+                self.logger.info(f"Current tag in {file_path}: {key}: {old_tags[key]}")
+                self.logger.info(f'Would change to: {key}: "{final_tag}"')
+            return old_tags
 
         # Create backup if requested
         if self.config.backup:
@@ -157,40 +536,231 @@ class FileProcessor:
                 self.logger.error(f"Failed to create backup: {e}")
 
         # Perform the update
-        if self._perform_update(file_path, final_tag):
-            self.updated_files.append(file_path)
-            return True
-        return False
+        if not self._perform_update(file_path, final_tags, scan):
+            return {}
+        return old_tags
 
     def get_files_to_process(self) -> list[str]:
         """Get list of files to process based on configuration."""
+        if self.config.manifest:
+            return self._plan_manifest()
+        if self.config.mode == "promote":
+            return self._plan_promotions()
+        return self._resolve_files(
+            self.config.file_pattern,
+            self.config.target_values_file,
+            self.config.exclude_pattern,
+        )
+
+    def _resolve_files(
+        self,
+        file_pattern: str | None,
+        target_values_file: str | None,
+        exclude_pattern: str = "",
+    ) -> list[str]:
+        """Resolve file patterns or a single values file to existing files.
+
+        `file_pattern` and `exclude_pattern` may each hold several globs,
+        separated by commas or newlines.
+        """
         files = []
 
-        if self.config.file_pattern:
-            self.logger.debug(f"\nProcessing files: {self.config.file_pattern}")
-            # Use glob pattern
-            matched_files = glob(self.config.file_pattern)
-            if not matched_files:
-                self.logger.error(
-                    f"No files found matching pattern: {self.config.file_pattern}"
-                )
-            files = [f for f in matched_files if os.path.isfile(f)]
+        if file_pattern:
+            self.logger.debug(f"\nProcessing files: {file_pattern}")
+            # One combined regex test per candidate path
+            matcher = PathMatcher(split_list(file_pattern), split_list(exclude_pattern))
+            if self.config.discovery == "git":
+                try:
+                    files = list(git_files(matcher, self.pruner))
+                except OSError as e:
+                    self.logger.error(f"Failed to list files from git: {e}")
+            else:
+                files = list(find_files(matcher, self.pruner))
+            if not files:
+                self.logger.error(f"No files found matching pattern: {file_pattern}")
         else:
-            values_file = self.config.target_values_file
+            values_file = target_values_file
             if not os.path.isfile(values_file):
                 self.logger.error(f"File not found: {values_file}")
             files = [values_file]
 
         return files
 
+    def _plan_manifest(self) -> list[str]:
+        """Resolve every manifest entry and merge their targets per file.
+
+        A file named by several entries is still read and written once, with
+        all of its keys. Conflicting tags for the same key fail the run.
+        """
+        self.plan = {}
+        for spec in self.config.get_updates():
+            files = self._resolve_files(
+                spec.file_pattern, spec.target_values_file, spec.exclude_pattern
+            )
+            for file_path in files:
+                targets = self.plan.setdefault(file_path, [])
+                planned = {t.key: t for t in targets}
+                for target in spec.get_tag_targets():
+                    existing = planned.get(target.key)
+                    if existing is None:
+                        targets.append(target)
+                    elif existing.final_tag != target.final_tag:
+                        self.logger.error(
+                            f"Conflicting tags for '{target.key}' in {file_path}: "
+                            f"{existing.final_tag} and {target.final_tag}"
+                        )
+
+        # Compile each key set's scanner up front, before any worker runs
+        for file_path in self.plan:
+            self._scanner_for(file_path)
+        self.logger.debug(f"\nManifest planned {len(self.plan)} file(s)")
+        return list(self.plan)
+
+    def _plan_promotions(self) -> list[str]:
+        """Read every source's tags and plan them as each destination's targets.
+
+        All sources are read before any destination is written, so in a chain
+        like `dev -> stage, stage -> prod` prod receives stage's tag from
+        before this run. A destination fed different tags for the same key by
+        several sources fails the run, as does a source value that is not a
+        tag or digest once quotes and any trailing comment are stripped.
+        """
+        pairs = self.config.get_promotions()
+        source_tags: dict[str, dict[str, str]] = {}
+        for source, _ in pairs:
+            if source in source_tags:
+                continue
+            if not os.path.isfile(source):
+                self.logger.error(f"File not found: {source}")
+            # Read with the same scanner get_current_tag uses; nothing is rendered
+            scan = self._load_scan(source, final_tags={})
+            self._check_tag_found(source, scan)
+            source_tags[source] = scan.current_tags
+
+        self.plan = {}
+        for source, destination in pairs:
+            if not os.path.isfile(destination):
+                self.logger.error(f"File not found: {destination}")
+            targets = self.plan.setdefault(destination, [])
+            planned = {t.key: t for t in targets}
+            for template in self.targets:
+                tag = source_tags[source].get(template.key)
+                if tag is None:
+                    self.logger.debug(f"Key '{template.key}' not found in {source}")
+                    continue
+                tag = scalar_value(tag)
+                if not (TAG_PATTERN.match(tag) or is_digest(tag)):
+                    self.logger.error(
+                        f"Invalid tag for '{template.key}' in {source}: {tag!r}"
+                    )
+                existing = planned.get(template.key)
+                if existing is None:
+                    targets.append(replace(template, final_tag=tag))
+                elif existing.final_tag != tag:
+                    self.logger.error(
+                        f"Conflicting tags for '{template.key}' in {destination}: "
+                        f"{existing.final_tag} and {tag}"
+                    )
+            self.logger.debug(f"Promoting {source} -> {destination}: {targets}")
+
+        for file_path in self.plan:
+            self._scanner_for(file_path)
+        return [file_path for file_path, targets in self.plan.items() if targets]
+
+    def _process_file(self, file_path: str) -> dict[str, str]:
+        """Validate and update a single file.
+
+        Returns:
+            dict[str, str]: Old tag per updated key; empty if unchanged
+        """
+        # One read per file: validation, tag extraction and rewrite share it
+        scan = self._load_scan(file_path)
+        if not scan.found and self.config.skip_missing:
+            self.logger.debug(f"Tag string not found, skipping: {file_path}")
+            return {}
+        self._check_tag_found(file_path, scan)
+        return self._update_scanned(file_path, scan)
+
+    def _process_parallel(
+        self, files: list[str], workers: int, worker: Callable | None = None
+    ) -> list:
+        """Process files on a bounded thread pool, failing fast on the first error.
+
+        Each file is handled by `worker` (`_process_file` by default). Results
+        are returned in the order of `files`, regardless of completion order.
+        """
+        worker = worker or self._process_file
+        self.logger.debug(f"\nProcessing {len(files)} files with {workers} workers")
+        results: list = [None for _ in files]
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="tag-updater"
+        ) as executor:
+            futures = {
+                executor.submit(worker, file_path): index
+                for index, file_path in enumerate(files)
+            }
+            try:
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+            except BaseException:
+                # Drop queued work; files already in flight are left to finish
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+        return results
+
     def process_files(self) -> bool:
         """Process all files. Returns True if any changes were made."""
         files = self.get_files_to_process()
-        changes_made = False
+        self._load_blob_ids()
+        workers = min(self.config.max_workers, len(files))
 
-        for file_path in files:
-            self.validate_file_content(file_path)
-            if self.update_file(file_path):
-                changes_made = True
+        if workers > 1:
+            outcomes = self._process_parallel(files, workers)
+        else:
+            outcomes = (self._process_file(file_path) for file_path in files)
 
+        changes_made = False
+        try:
+            for file_path, old_tags in zip(files, outcomes):
+                if old_tags:
+                    self._record_update(file_path, old_tags)
+                    changes_made = True
+        finally:
+            # One batched directory fsync instead of an fsync per file
+            self._sync_directories()
+            self._save_caches()
+
+        if self.memo_hits:
+            self.logger.debug(f"Reused {self.memo_hits} scan(s) of identical files")
         return changes_made
+
+    def _inventory_file(self, file_path: str) -> list[dict]:
+        """Inventory records of one file: every match of its keys."""
+        # No final tags, so nothing is rendered
+        scan = self._load_scan(file_path, final_tags={})
+        return [
+            {"file": file_path, "key": m.key, "value": m.value, "line": m.line}
+            for m in scan.matches
+        ]
+
+    def scan_files(self) -> list[dict]:
+        """Report every configured key in every matched file, read-only.
+
+        Uses the same discovery, thread pool and caches as `process_files`,
+        but never writes a file. Files without any key are simply absent.
+
+        Returns:
+            list[dict]: One record (file, key, value, line) per occurrence,
+            in file order
+        """
+        files = self.get_files_to_process()
+        self._load_blob_ids()
+        workers = min(self.config.max_workers, len(files))
+        try:
+            if workers > 1:
+                outcomes = self._process_parallel(files, workers, self._inventory_file)
+            else:
+                outcomes = [self._inventory_file(file_path) for file_path in files]
+        finally:
+            self._save_caches()
+        return [record for records in outcomes for record in records]
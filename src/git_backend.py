@@ -0,0 +1,395 @@
+"""Git backends for image tag updater.
+
+`GitOperations` builds its branch setup and commit/push workflow from the
+primitives of a `GitBackend`. `SubprocessBackend` runs the git CLI;
+`InMemoryBackend` simulates a repository and a shared `InMemoryRemote`
+entirely in memory, for fast deterministic tests and push benchmarks.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Protocol
+
+from .logger import ActionError
+
+if TYPE_CHECKING:
+    from .git_operations import GitOperations
+
+
+class GitBackend(Protocol):
+    """The git primitives the update workflow is built from."""
+
+    def fetch(self) -> None:
+        """Fetch every branch of the remote."""
+
+    def current_branch(self) -> str | None:
+        """The checked-out branch, or None when detached."""
+
+    def branch_exists_locally(self, branch: str) -> bool:
+        """Whether a local branch exists."""
+
+    def local_ref(self, branch: str) -> str | None:
+        """The commit SHA of a local branch, or None if it does not exist."""
+
+    def remote_refs(self) -> dict[str, str]:
+        """Every branch ref of the remote -> SHA, in one round trip."""
+
+    def checkout(
+        self, branch: str, create: bool = False, start_point: str | None = None
+    ) -> None:
+        """Switch to `branch`, creating it at `start_point` (or HEAD)."""
+
+    def pull(self, branch: str) -> None:
+        """Merge the remote `branch` into the current branch."""
+
+    def stage(self, files: list[str] | None = None) -> None:
+        """Stage `files`, or every change of the worktree."""
+
+    def has_staged_changes(self) -> bool:
+        """Whether the index differs from HEAD."""
+
+    def commit(self, message: str) -> str | None:
+        """Commit the index and return the new commit SHA."""
+
+    def push(self, remote_url: str, branch: str) -> None:
+        """Push `branch`; raises ActionError when the remote rejects it."""
+
+
+def parse_ls_remote(output: str) -> dict[str, str]:
+    """Parse `git ls-remote` output (`<sha>\t<ref>` lines) into ref -> SHA."""
+    refs = {}
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) == 2:
+            refs[fields[1]] = fields[0]
+    return refs
+
+
+class SubprocessBackend:
+    """Run the git CLI, through the command runner of `GitOperations`."""
+
+    def __init__(self, ops: GitOperations):
+        self.ops = ops
+
+    def fetch(self) -> None:
+        self.ops.run_command(["git", "fetch", "origin"])
+
+    def current_branch(self) -> str | None:
+        return self.ops.run_command(["git", "branch", "--show-current"], capture=True)
+
+    def branch_exists_locally(self, branch: str) -> bool:
+        try:
+            result = subprocess.run(
+                ["git", "show-ref", "--verify", "--quiet", f"refs/heads/{branch}"],
+                capture_output=True,
+                check=False,
+            )
+            return result.returncode == 0
+        except Exception:
+            return False
+
+    def local_ref(self, branch: str) -> str | None:
+        output = self.ops.run_command(
+            ["git", "rev-parse", "--verify", "--quiet", f"refs/heads/{branch}"],
+            check=False,
+            capture=True,
+        )
+        return output or None
+
+    def remote_refs(self) -> dict[str, str]:
+        output = self.ops.run_command(
+            ["git", "ls-remote", "--heads", "origin"], capture=True
+        )
+        return parse_ls_remote(output or "")
+
+    def checkout(
+        self, branch: str, create: bool = False, start_point: str | None = None
+    ) -> None:
+        cmd = ["git", "checkout"] + (["-b"] if create else []) + [branch]
+        self.ops.run_command(cmd + ([start_point] if start_point else []))
+
+    def pull(self, branch: str) -> None:
+        self.ops.run_command(["git", "pull", "origin", branch])
+
+    def stage(self, files: list[str] | None = None) -> None:
+        self.ops.run_command(["git", "add", *(["--", *files] if files else ["."])])
+
+    def has_staged_changes(self) -> bool:
+        # git diff --cached --quiet exits with 1 when changes exist and 0 when clean
+        try:
+            result = subprocess.run(
+                ["git", "diff", "--cached", "--quiet"],
+                capture_output=True,
+                check=False,
+            )
+            return result.returncode != 0
+        except Exception:
+            return False
+
+    def commit(self, message: str) -> str | None:
+        self.ops.run_command(["git", "commit", "-m", message])
+        return self.ops.run_command(["git", "rev-parse", "HEAD"], capture=True)
+
+    def push(self, remote_url: str, branch: str) -> None:
+        # Not through run_command: a rejected push is retried, not fatal
+        result = subprocess.run(
+            ["git", "push", remote_url, branch],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if result.returncode != 0:
+            error_msg = (
+                result.stderr.strip()
+                or f"git push exited with code {result.returncode}"
+            )
+            raise ActionError(error_msg)
+
+
+# Commit IDs of the in-memory backends, unique across all of them
+_commit_counter = itertools.count()
+
+
+@dataclass(frozen=True)
+class Commit:
+    """An in-memory commit: a full snapshot of the tracked files."""
+
+    id: str
+    parents: tuple[str, ...]
+    tree: dict[str, bytes] = field(hash=False)
+    message: str = ""
+
+
+def make_commit(
+    parents: tuple[str, ...], tree: dict[str, bytes], message: str
+) -> Commit:
+    """A commit with a fresh, SHA-1 shaped ID."""
+    seed = f"{next(_commit_counter)}\0{parents}\0{message}".encode()
+    return Commit(hashlib.sha1(seed).hexdigest(), parents, dict(tree), message)
+
+
+def is_ancestor(commits: dict[str, Commit], ancestor: str, commit: str) -> bool:
+    """Whether `ancestor` is reachable from `commit` (or is it)."""
+    pending = [commit]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if current == ancestor:
+            return True
+        if current not in seen:
+            seen.add(current)
+            pending.extend(commits[current].parents)
+    return False
+
+
+def merge_base(commits: dict[str, Commit], a: str, b: str) -> str | None:
+    """A common ancestor of `a` and `b` closest to `b`, or None."""
+    ancestors = set()
+    pending = [a]
+    while pending:
+        current = pending.pop()
+        if current not in ancestors:
+            ancestors.add(current)
+            pending.extend(commits[current].parents)
+    queue = [b]
+    for current in queue:  # breadth first from b
+        if current in ancestors:
+            return current
+        queue.extend(commits[current].parents)
+    return None
+
+
+class InMemoryRemote:
+    """A remote shared by in-memory backends, like a hosted repository.
+
+    Every network operation sleeps `latency` seconds first; pushes are
+    atomic and rejected unless they fast-forward the branch, exactly the
+    contention concurrent runs meet on a real remote.
+    """
+
+    def __init__(
+        self, branches: dict[str, dict[str, bytes]] | None = None, latency: float = 0.0
+    ):
+        self.latency = latency
+        self.commits: dict[str, Commit] = {}
+        self.refs: dict[str, str] = {}
+        self.pushes = 0
+        self.rejections = 0
+        self._lock = threading.Lock()
+        for branch, tree in (branches or {}).items():
+            commit = make_commit((), tree, "Initial commit")
+            self.commits[commit.id] = commit
+            self.refs[branch] = commit.id
+
+    def _round_trip(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def advertise(self) -> dict[str, str]:
+        """Branch -> commit ID of every branch (like `git ls-remote`)."""
+        self._round_trip()
+        with self._lock:
+            return dict(self.refs)
+
+    def fetch(self) -> tuple[dict[str, str], dict[str, Commit]]:
+        """The refs and every commit."""
+        self._round_trip()
+        with self._lock:
+            return dict(self.refs), dict(self.commits)
+
+    def receive(self, branch: str, commit_id: str, commits: dict[str, Commit]) -> None:
+        """Update `branch` to `commit_id` if that is a fast-forward."""
+        self._round_trip()
+        with self._lock:
+            self.pushes += 1
+            current = self.refs.get(branch)
+            if current == commit_id:
+                return
+            if current is not None and not is_ancestor(commits, current, commit_id):
+                self.rejections += 1
+                raise ActionError(
+                    f" ! [rejected]        {branch} -> {branch} (non-fast-forward)"
+                )
+            pending = [commit_id]
+            while pending:
+                current = pending.pop()
+                if current not in self.commits:
+                    self.commits[current] = commits[current]
+                    pending.extend(commits[current].parents)
+            self.refs[branch] = commit_id
+
+
+class InMemoryBackend:
+    """A local clone of an `InMemoryRemote`, with an in-memory worktree.
+
+    The worktree is the `worktree` dict of path -> content; `stage()` without
+    files snapshots all of it, like `git add .`. Pulls merge like git: a
+    fast-forward when possible, otherwise a merge commit, failing with a
+    conflict when both sides changed a file differently.
+    """
+
+    def __init__(self, remote: InMemoryRemote, branch: str | None = None):
+        self.remote = remote
+        refs, self.commits = remote.fetch()
+        # branch -> SHA as of the last fetch, like refs/remotes/origin/*
+        self.tracking_refs = refs
+        self.branch = branch if branch in refs else next(iter(refs), None)
+        self.refs: dict[str, str] = {}
+        tree: dict[str, bytes] = {}
+        if self.branch is not None:
+            self.refs[self.branch] = refs[self.branch]
+            tree = self.commits[refs[self.branch]].tree
+        self.worktree: dict[str, bytes] = dict(tree)
+        self.index: dict[str, bytes] = dict(tree)
+
+    def _head_tree(self) -> dict[str, bytes]:
+        head = self.refs.get(self.branch)
+        return self.commits[head].tree if head else {}
+
+    def _reset(self, commit_id: str | None) -> None:
+        tree = self.commits[commit_id].tree if commit_id else {}
+        self.index = dict(tree)
+        self.worktree = dict(tree)
+
+    def fetch(self) -> None:
+        refs, commits = self.remote.fetch()
+        self.tracking_refs = refs
+        self.commits.update(commits)
+
+    def current_branch(self) -> str | None:
+        return self.branch
+
+    def branch_exists_locally(self, branch: str) -> bool:
+        return branch in self.refs
+
+    def local_ref(self, branch: str) -> str | None:
+        return self.refs.get(branch)
+
+    def remote_refs(self) -> dict[str, str]:
+        return {
+            f"refs/heads/{branch}": sha
+            for branch, sha in self.remote.advertise().items()
+        }
+
+    def checkout(
+        self, branch: str, create: bool = False, start_point: str | None = None
+    ) -> None:
+        if create:
+            if branch in self.refs:
+                raise ActionError(f"A branch named '{branch}' already exists")
+            if start_point is not None:
+                target = self.tracking_refs.get(start_point.removeprefix("origin/"))
+                if target is None:
+                    raise ActionError(f"Invalid start point: {start_point}")
+            else:
+                target = self.refs.get(self.branch)
+            if target is not None:
+                self.refs[branch] = target
+        elif branch not in self.refs:
+            raise ActionError(f"pathspec '{branch}' did not match any branch")
+        self.branch = branch
+        self._reset(self.refs.get(branch))
+
+    def pull(self, branch: str) -> None:
+        self.fetch()
+        theirs = self.tracking_refs.get(branch)
+        if theirs is None:
+            raise ActionError(f"couldn't find remote ref {branch}")
+        ours = self.refs.get(self.branch)
+        if ours is None or is_ancestor(self.commits, ours, theirs):
+            self.refs[self.branch] = theirs
+            self._reset(theirs)
+            return
+        if is_ancestor(self.commits, theirs, ours):
+            return
+
+        base = merge_base(self.commits, ours, theirs)
+        base_tree = self.commits[base].tree if base else {}
+        our_tree = self.commits[ours].tree
+        their_tree = self.commits[theirs].tree
+        merged = {}
+        for path in base_tree.keys() | our_tree.keys() | their_tree.keys():
+            old, mine, other = (t.get(path) for t in (base_tree, our_tree, their_tree))
+            if mine == other or other == old:
+                value = mine
+            elif mine == old:
+                value = other
+            else:
+                raise ActionError(f"CONFLICT (content): Merge conflict in {path}")
+            if value is not None:
+                merged[path] = value
+        commit = make_commit((ours, theirs), merged, f"Merge branch '{branch}'")
+        self.commits[commit.id] = commit
+        self.refs[self.branch] = commit.id
+        self._reset(commit.id)
+
+    def stage(self, files: list[str] | None = None) -> None:
+        if files is None:
+            self.index = dict(self.worktree)
+            return
+        for path in files:
+            if path in self.worktree:
+                self.index[path] = self.worktree[path]
+            else:
+                self.index.pop(path, None)
+
+    def has_staged_changes(self) -> bool:
+        return self.index != self._head_tree()
+
+    def commit(self, message: str) -> str | None:
+        head = self.refs.get(self.branch)
+        commit = make_commit((head,) if head else (), self.index, message)
+        self.commits[commit.id] = commit
+        self.refs[self.branch] = commit.id
+        return commit.id
+
+    def push(self, remote_url: str, branch: str) -> None:
+        if branch not in self.refs:
+            raise ActionError(f"src refspec {branch} does not match any")
+        self.remote.receive(branch, self.refs[branch], self.commits)
@@ -0,0 +1,157 @@
+"""Long-lived git helper processes for image tag updater."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+import threading
+
+
+class GitPipe:
+    """A git command kept running for a whole run, spoken to over pipes.
+
+    The process is started on first use and stopped by `close` (or on leaving
+    a `with` block). Its stderr goes to an unlinked temporary file, closed
+    with the process, so a chatty process can never block on a full pipe.
+    """
+
+    def __init__(self, args: list[str], env: dict[str, str] | None = None):
+        self.cmd = ["git", *args]
+        self.env = env
+        self._proc: subprocess.Popen | None = None
+        self._stderr: int | None = None  # fd of an unlinked temporary file
+        self._lock = threading.Lock()  # one framed request at a time
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(check=exc_type is None)
+
+    def _process(self) -> subprocess.Popen:
+        if self._proc is None:
+            fd, path = tempfile.mkstemp()
+            os.unlink(path)
+            try:
+                self._proc = subprocess.Popen(
+                    self.cmd,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=fd,
+                    env=self.env,
+                )
+            except BaseException:
+                os.close(fd)
+                raise
+            self._stderr = fd
+        return self._proc
+
+    def _request(self, data: bytes) -> subprocess.Popen:
+        proc = self._process()
+        try:
+            proc.stdin.write(data)
+            proc.stdin.flush()
+        except BrokenPipeError:
+            raise self._failed() from None
+        return proc
+
+    def _failed(self) -> OSError:
+        """Stop a process that stopped answering and return its error."""
+        return self._stop() or self._error(b"")
+
+    def _error(self, stderr: bytes) -> OSError:
+        message = stderr.decode("utf-8", errors="replace").strip()
+        return OSError(f"{' '.join(self.cmd[:2])} failed: {message or 'exited early'}")
+
+    def _stop(self) -> OSError | None:
+        """Close stdin, wait for git to exit and release its stderr file.
+
+        Returns the error git exited with, if any.
+        """
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return None
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        proc.stdout.close()
+        fd, self._stderr = self._stderr, None
+        try:
+            if proc.wait() == 0:
+                return None
+            return self._error(os.pread(fd, os.fstat(fd).st_size, 0))
+        finally:
+            os.close(fd)
+
+    def close(self, check: bool = True) -> None:
+        """Close stdin and wait for git to exit.
+
+        Raises:
+            OSError: If `check` is set and git exited with an error
+        """
+        error = self._stop()
+        if error is not None and check:
+            raise error
+
+
+class CatFile(GitPipe):
+    """Read objects through one `git cat-file --batch` process."""
+
+    def __init__(self, env: dict[str, str] | None = None):
+        super().__init__(["cat-file", "--batch"], env)
+
+    def read(self, rev: str) -> tuple[str, str, bytes] | None:
+        """Return (object ID, type, content) of `rev`, or None if missing.
+
+        `rev` may be any revision expression, such as `HEAD^{tree}`.
+        """
+        if "\n" in rev:
+            raise ValueError(f"Invalid revision: {rev!r}")
+        with self._lock:
+            proc = self._request(rev.encode("utf-8") + b"\n")
+            header = proc.stdout.readline()
+            if not header:
+                raise self._failed()
+            fields = header.decode("utf-8").split()
+            if len(fields) != 3:  # "<rev> missing" / "<rev> ambiguous"
+                return None
+            oid, kind, size = fields
+            content = proc.stdout.read(int(size))
+            proc.stdout.read(1)  # the LF ending every object
+        return oid, kind, content
+
+
+class HashObject(GitPipe):
+    """Write files as blobs through one `git hash-object --stdin-paths`."""
+
+    def __init__(self, env: dict[str, str] | None = None):
+        super().__init__(["hash-object", "-w", "--stdin-paths"], env)
+
+    def hash(self, path: str) -> str:
+        """Write the file at `path` (absolute) and return its blob ID."""
+        if "\n" in path:
+            raise ValueError(f"Invalid path for git hash-object: {path!r}")
+        with self._lock:
+            proc = self._request(path.encode("utf-8") + b"\n")
+            line = proc.stdout.readline()
+        if not line:
+            raise self._failed()
+        return line.decode("utf-8").strip()
+
+
+class UpdateIndex(GitPipe):
+    """Stage index entries through one `git update-index -z --index-info`.
+
+    Git applies the entries as they arrive and writes the index when the
+    process is closed, so `close` must succeed for the entries to land.
+    """
+
+    def __init__(self, env: dict[str, str] | None = None):
+        super().__init__(["update-index", "-z", "--index-info"], env)
+
+    def stage(self, mode: str, oid: str, path: str) -> None:
+        """Set the index entry of repository path `path`."""
+        with self._lock:
+            self._request(f"{mode} {oid}\t{path}\0".encode())
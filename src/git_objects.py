@@ -0,0 +1,521 @@
+"""Pure-Python git object database access for image tag updater.
+
+Only the standard library is used: objects are zlib-compressed and named by
+their SHA-1, and pack files are read through their version 2 index.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from bisect import bisect_left
+from glob import glob
+
+TREE_MODE = "40000"
+ZERO_ID = "0" * 40
+
+# Pack entry types; 6 and 7 are deltas against another object
+PACK_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+OFS_DELTA = 6
+REF_DELTA = 7
+PACK_INDEX_MAGIC = b"\377tOc"
+
+# Bytes inflated per step when reading a compressed pack entry
+INFLATE_CHUNK = 1 << 16
+
+# Repository format extensions and the only values this module can handle
+SUPPORTED_FORMATS = {"objectformat": "sha1", "refstorage": "files"}
+
+
+class UnsupportedRepository(OSError):
+    """A repository in a format this module cannot read or write."""
+
+
+def read_extensions(config_path: str) -> dict[str, str]:
+    """The `[extensions]` settings of a git config file, names lowercased."""
+    extensions = {}
+    section = None
+    try:
+        with open(config_path) as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return {}
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line.startswith("["):
+            section = line[1:].split("]", 1)[0].strip().lower()
+            continue
+        if section == "extensions":
+            name, _, value = line.partition("=")
+            extensions[name.strip().lower()] = value.strip().lower()
+    return extensions
+
+
+def object_id(kind: str, content: bytes) -> str:
+    """The ID git gives an object of type `kind`."""
+    return hashlib.sha1(
+        b"%s %d\0%s" % (kind.encode(), len(content), content)
+    ).hexdigest()
+
+
+def parse_tree(content: bytes) -> dict[str, tuple[str, str]]:
+    """Entries of a tree object as {name: (mode, object ID)}."""
+    entries = {}
+    pos = 0
+    while pos < len(content):
+        space = content.index(b" ", pos)
+        nul = content.index(b"\0", space)
+        name = content[space + 1 : nul].decode("utf-8", errors="surrogateescape")
+        entries[name] = (content[pos:space].decode(), content[nul + 1 : nul + 21].hex())
+        pos = nul + 21
+    return entries
+
+
+def format_tree(entries: dict[str, tuple[str, str]]) -> bytes:
+    """Serialize tree entries in git's order (directories sort as `name/`)."""
+
+    def sort_key(name: str) -> bytes:
+        raw = name.encode("utf-8", errors="surrogateescape")
+        return raw + b"/" if entries[name][0] == TREE_MODE else raw
+
+    return b"".join(
+        b"%s %s\0%s"
+        % (
+            entries[name][0].encode(),
+            name.encode("utf-8", errors="surrogateescape"),
+            bytes.fromhex(entries[name][1]),
+        )
+        for name in sorted(entries, key=sort_key)
+    )
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Rebuild an object from its delta base and a git delta."""
+
+    def varint(pos: int) -> tuple[int, int]:
+        value = shift = 0
+        while True:
+            byte = delta[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                return value, pos
+
+    source_size, pos = varint(0)
+    target_size, pos = varint(pos)
+    if source_size != len(base):
+        raise OSError("Corrupt delta: base size mismatch")
+    out = bytearray()
+    while pos < len(delta):
+        cmd = delta[pos]
+        pos += 1
+        if cmd & 0x80:
+            # Copy from the base: offset and size bytes present per bit
+            offset = size = 0
+            for i in range(4):
+                if cmd & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if cmd & (0x10 << i):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            out += base[offset : offset + (size or 0x10000)]
+        elif cmd:
+            out += delta[pos : pos + cmd]
+            pos += cmd
+        else:
+            raise OSError("Corrupt delta: reserved instruction")
+    if len(out) != target_size:
+        raise OSError("Corrupt delta: result size mismatch")
+    return bytes(out)
+
+
+def _inflate(buf, pos: int) -> bytes:
+    """Decompress the zlib stream starting at `pos` of a mapped pack."""
+    inflater = zlib.decompressobj()
+    out = []
+    while not inflater.eof:
+        chunk = buf[pos : pos + INFLATE_CHUNK]
+        if not chunk:
+            raise OSError("Corrupt pack: truncated entry")
+        out.append(inflater.decompress(chunk))
+        pos += INFLATE_CHUNK
+    return b"".join(out)
+
+
+class Pack:
+    """One pack file with its version 2 index, memory-mapped on first use."""
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self.pack_path = index_path[: -len(".idx")] + ".pack"
+        self._index = None
+        self._pack = None
+
+    def _open(self) -> None:
+        with open(self.index_path, "rb") as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._index[:8] != PACK_INDEX_MAGIC + struct.pack(">I", 2):
+            raise OSError(f"Unsupported pack index: {self.index_path}")
+        self._fanout = struct.unpack_from(">256I", self._index, 8)
+        self._count = self._fanout[255]
+        self._ids = 8 + 256 * 4
+        self._offsets = self._ids + self._count * 24  # after IDs and CRCs
+        self._large = self._offsets + self._count * 4
+        with open(self.pack_path, "rb") as f:
+            self._pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        for mapped in (self._index, self._pack):
+            if mapped is not None:
+                mapped.close()
+        self._index = self._pack = None
+
+    def offset(self, oid: bytes) -> int | None:
+        """Offset of object `oid` (20 bytes) in the pack, or None."""
+        if self._index is None:
+            self._open()
+        lo = self._fanout[oid[0] - 1] if oid[0] else 0
+        hi = self._fanout[oid[0]]
+        ids = _IdView(self._index, self._ids)
+        pos = bisect_left(ids, oid, lo, hi)
+        if pos == hi or ids[pos] != oid:
+            return None
+        (offset,) = struct.unpack_from(">I", self._index, self._offsets + pos * 4)
+        if offset & 0x80000000:
+            (offset,) = struct.unpack_from(
+                ">Q", self._index, self._large + (offset & 0x7FFFFFFF) * 8
+            )
+        return offset
+
+    def entry(self, offset: int) -> tuple[int, bytes, int | bytes | None]:
+        """(type, inflated data, delta base) of the entry at `offset`.
+
+        The base is a pack offset for offset deltas, an object ID (20 bytes)
+        for reference deltas, and None for whole objects.
+        """
+        buf = self._pack
+        byte = buf[offset]
+        kind = (byte >> 4) & 7
+        pos = offset + 1
+        while byte & 0x80:
+            byte = buf[pos]
+            pos += 1
+        base = None
+        if kind == OFS_DELTA:
+            byte = buf[pos]
+            pos += 1
+            distance = byte & 0x7F
+            while byte & 0x80:
+                byte = buf[pos]
+                pos += 1
+                distance = ((distance + 1) << 7) | (byte & 0x7F)
+            base = offset - distance
+        elif kind == REF_DELTA:
+            base = bytes(buf[pos : pos + 20])
+            pos += 20
+        return kind, _inflate(buf, pos), base
+
+
+class _IdView:
+    """The sorted object IDs of a pack index, as a sequence for bisect."""
+
+    def __init__(self, buf, start: int):
+        self.buf = buf
+        self.start = start
+
+    def __getitem__(self, i: int) -> bytes:
+        pos = self.start + i * 20
+        return self.buf[pos : pos + 20]
+
+
+class Repository:
+    """Read and write objects and refs of a repository without running git.
+
+    Objects are read from loose files, pack files and alternates; new
+    objects are always written loose. Raises OSError for anything missing
+    or malformed, and `UnsupportedRepository` up front for SHA-256 object
+    IDs or ref storage other than files (`extensions.objectFormat`,
+    `extensions.refStorage`).
+    """
+
+    def __init__(self, git_dir: str, work_tree: str | None = None):
+        self.git_dir = git_dir
+        self.work_tree = work_tree
+        common = os.path.join(git_dir, "commondir")
+        if os.path.isfile(common):  # a linked worktree
+            with open(common) as f:
+                self.common_dir = os.path.normpath(
+                    os.path.join(git_dir, f.read().strip())
+                )
+        else:
+            self.common_dir = git_dir
+        extensions = read_extensions(os.path.join(self.common_dir, "config"))
+        for name, supported in SUPPORTED_FORMATS.items():
+            value = extensions.get(name, supported)
+            if value != supported:
+                raise UnsupportedRepository(
+                    f"Unsupported repository format: extensions.{name} = {value}"
+                )
+        self.object_dirs = [os.path.join(self.common_dir, "objects")]
+        self.object_dirs += self._alternates(self.object_dirs[0])
+        self._packs: list[Pack] | None = None
+
+    @classmethod
+    def discover(cls, start: str = ".") -> Repository | None:
+        """The repository containing `start`, or None."""
+        path = os.path.realpath(start)
+        while True:
+            candidate = os.path.join(path, ".git")
+            if os.path.isdir(candidate):
+                return cls(candidate, path)
+            if os.path.isfile(candidate):  # "gitdir: <path>"
+                with open(candidate) as f:
+                    target = f.read().strip().removeprefix("gitdir:").strip()
+                return cls(os.path.normpath(os.path.join(path, target)), path)
+            parent = os.path.dirname(path)
+            if parent == path:
+                return None
+            path = parent
+
+    @staticmethod
+    def _alternates(object_dir: str) -> list[str]:
+        try:
+            with open(os.path.join(object_dir, "info", "alternates")) as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.normpath(os.path.join(object_dir, line))
+            for line in lines
+            if line and not line.startswith("#")
+        ]
+
+    def prefix(self, path: str = ".") -> str:
+        """Path of `path` relative to the work tree, `/`-separated."""
+        relative = os.path.relpath(os.path.realpath(path), self.work_tree)
+        return "" if relative == "." else relative.replace(os.sep, "/") + "/"
+
+    def close(self) -> None:
+        for pack in self._packs or ():
+            pack.close()
+        self._packs = None
+
+    # -- objects ---------------------------------------------------------
+
+    def _loose_path(self, object_dir: str, oid: str) -> str:
+        return os.path.join(object_dir, oid[:2], oid[2:])
+
+    def packs(self) -> list[Pack]:
+        if self._packs is None:
+            self._packs = [
+                Pack(path)
+                for object_dir in self.object_dirs
+                for path in sorted(glob(os.path.join(object_dir, "pack", "*.idx")))
+            ]
+        return self._packs
+
+    def contains(self, oid: str) -> bool:
+        """Whether the object exists, loose or packed."""
+        if any(os.path.exists(self._loose_path(d, oid)) for d in self.object_dirs):
+            return True
+        raw = bytes.fromhex(oid)
+        return any(pack.offset(raw) is not None for pack in self.packs())
+
+    def read(self, oid: str) -> tuple[str, bytes]:
+        """Return (type, content) of object `oid`."""
+        for object_dir in self.object_dirs:
+            try:
+                with open(self._loose_path(object_dir, oid), "rb") as f:
+                    data = zlib.decompress(f.read())
+            except FileNotFoundError:
+                continue
+            header, _, content = data.partition(b"\0")
+            kind, size = header.decode().split()
+            if int(size) != len(content):
+                raise OSError(f"Corrupt object: {oid}")
+            return kind, content
+        raw = bytes.fromhex(oid)
+        for pack in self.packs():
+            offset = pack.offset(raw)
+            if offset is not None:
+                return self._read_packed(pack, offset)
+        raise OSError(f"Object not found: {oid}")
+
+    def _read_packed(self, pack: Pack, offset: int) -> tuple[str, bytes]:
+        # Walk offset-delta chains iteratively; they can be thousands deep
+        deltas = []
+        while True:
+            kind, data, base = pack.entry(offset)
+            if kind == OFS_DELTA:
+                deltas.append(data)
+                offset = base
+            elif kind == REF_DELTA:
+                deltas.append(data)
+                kind_name, data = self.read(base.hex())
+                break
+            elif kind in PACK_TYPES:
+                kind_name = PACK_TYPES[kind]
+                break
+            else:
+                raise OSError(f"Corrupt pack entry in {pack.pack_path}")
+        for delta in reversed(deltas):
+            data = apply_delta(data, delta)
+        return kind_name, data
+
+    def write(self, kind: str, content: bytes) -> str:
+        """Store an object (loose) unless it exists and return its ID."""
+        oid = object_id(kind, content)
+        if self.contains(oid):
+            return oid
+        path = self._loose_path(self.object_dirs[0], oid)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix="tmp_obj_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(
+                    zlib.compress(b"%s %d\0" % (kind.encode(), len(content)) + content)
+                )
+            os.chmod(tmp, 0o444)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return oid
+
+    def write_tree(self, base: str | None, changes: dict[str, tuple[str, str]]) -> str:
+        """Write the tree `base` with `changes` ({path: (mode, ID)}) applied.
+
+        Only the trees on the way to a changed path are read and rewritten;
+        every other subtree keeps its ID.
+        """
+        entries = {}
+        if base is not None:
+            kind, content = self.read(base)
+            if kind != "tree":
+                raise OSError(f"Not a tree: {base}")
+            entries = parse_tree(content)
+        subtrees: dict[str, dict[str, tuple[str, str]]] = {}
+        for path, entry in changes.items():
+            name, sep, rest = path.partition("/")
+            if sep:
+                subtrees.setdefault(name, {})[rest] = entry
+            else:
+                entries[name] = entry
+        for name, subchanges in subtrees.items():
+            mode, oid = entries.get(name, (None, None))
+            entries[name] = (
+                TREE_MODE,
+                self.write_tree(oid if mode == TREE_MODE else None, subchanges),
+            )
+        return self.write("tree", format_tree(entries))
+
+    def commit_tree(self, commit: str) -> str:
+        """The tree ID of commit `commit`."""
+        kind, content = self.read(commit)
+        if kind != "commit" or not content.startswith(b"tree "):
+            raise OSError(f"Not a commit: {commit}")
+        return content[5:45].decode()
+
+    def write_commit(
+        self,
+        tree: str,
+        parents: list[str],
+        author: str,
+        committer: str,
+        message: str,
+    ) -> str:
+        """Write a commit; identities are `Name <email> <time> <+hhmm>`."""
+        lines = [f"tree {tree}"] + [f"parent {p}" for p in parents]
+        lines += [f"author {author}", f"committer {committer}", "", message]
+        text = "\n".join(lines)
+        return self.write("commit", text.encode("utf-8") + b"\n")
+
+    # -- refs ------------------------------------------------------------
+
+    def _ref_path(self, ref: str) -> str:
+        root = self.git_dir if ref == "HEAD" else self.common_dir
+        return os.path.join(root, *ref.split("/"))
+
+    def head(self) -> tuple[str, str | None]:
+        """(ref HEAD points to, its commit ID or None if unborn).
+
+        A detached HEAD is returned as ("HEAD", ID).
+        """
+        with open(self._ref_path("HEAD")) as f:
+            value = f.read().strip()
+        if value.startswith("ref:"):
+            ref = value[4:].strip()
+            return ref, self.read_ref(ref)
+        return "HEAD", value
+
+    def read_ref(self, ref: str) -> str | None:
+        """The ID a ref points to, loose or packed, or None."""
+        try:
+            with open(self._ref_path(ref)) as f:
+                value = f.read().strip()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            value = None
+        if value:
+            return (
+                self.read_ref(value[4:].strip()) if value.startswith("ref:") else value
+            )
+        try:
+            with open(os.path.join(self.common_dir, "packed-refs")) as f:
+                for line in f:
+                    if line[:1] not in ("#", "^"):
+                        oid, _, name = line.rstrip("\n").partition(" ")
+                        if name == ref:
+                            return oid
+        except FileNotFoundError:
+            pass
+        return None
+
+    def update_ref(
+        self, ref: str, new: str, old: str | None, identity: str, message: str
+    ) -> None:
+        """Point `ref` at `new` if it still points at `old` (None: absent).
+
+        Takes git's `<ref>.lock` so concurrent git commands are excluded, and
+        appends to the ref's reflog (and HEAD's, if HEAD points to the ref).
+        """
+        path = self._ref_path(ref)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lock = path + ".lock"
+        try:
+            fd = os.open(lock, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            raise OSError(f"Unable to lock {ref}: {lock} exists") from None
+        try:
+            # The file object owns the descriptor, so every path closes it
+            with os.fdopen(fd, "w") as f:
+                current = self.read_ref(ref)
+                if current != old:
+                    raise OSError(f"{ref} moved to {current}, expected {old}")
+                f.write(new + "\n")
+            os.replace(lock, path)
+        except BaseException:
+            if os.path.exists(lock):
+                os.unlink(lock)
+            raise
+
+        entry = f"{old or ZERO_ID} {new} {identity}\t{message}\n"
+        logs = [ref]
+        if ref != "HEAD" and self.head()[0] == ref:
+            logs.append("HEAD")
+        for name in logs:
+            log = os.path.join(
+                self.git_dir if name == "HEAD" else self.common_dir, "logs", name
+            )
+            if os.path.exists(log):
+                with open(log, "a") as f:
+                    f.write(entry)
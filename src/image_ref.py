@@ -0,0 +1,106 @@
+"""Image reference scanning for image tag updater."""
+
+from __future__ import annotations
+
+import re
+
+from .scanner import TagMatch, TagScanner
+from .yaml_path import DocumentSelector
+
+# An image reference after `image:` (YAML, docker-compose) or `FROM`
+# (Dockerfile). `suffix` is the tag and/or digest, empty for a bare name.
+IMAGE_LINE = re.compile(
+    rb"^[ \t]*(?:-[ \t]+)?"
+    rb"""(?:["']?image["']?[ \t]*:[ \t]*|(?i:FROM)[ \t]+(?:--\S+[ \t]+)*)["']?"""
+    rb"(?P<name>[\w.-]+(?::\d+(?=/))?(?:/[\w.-]+)*)"
+    rb"(?P<suffix>(?::\w[\w.-]{0,127})?(?:@[\w+.-]+:[0-9a-fA-F]{32,})?)"
+    rb"""(?=["'\s]|\Z)""",
+    re.MULTILINE,
+)
+
+DIGEST_PATTERN = re.compile(r"^[A-Za-z0-9_+.-]+:[0-9a-fA-F]{32,}$")
+
+# Registries whose images may be written without one
+DEFAULT_REGISTRIES = ("docker.io", "index.docker.io", "registry-1.docker.io")
+
+
+def is_digest(value: str) -> bool:
+    """Whether a tag value is a content digest (`sha256:...`)."""
+    return DIGEST_PATTERN.match(value) is not None
+
+
+def split_image_name(name: str) -> tuple[str, str]:
+    """Split an image name into (registry, repository), normalized.
+
+    The first component is a registry only if it looks like a host (has a
+    dot or port, or is `localhost`). Docker Hub names compare equal with or
+    without `docker.io/` and `library/`.
+    """
+    registry, sep, rest = name.partition("/")
+    if not sep or not ("." in registry or ":" in registry or registry == "localhost"):
+        registry, rest = "", name
+    if registry in DEFAULT_REGISTRIES:
+        registry = ""
+    if not registry and rest.startswith("library/"):
+        rest = rest[len("library/") :]
+    return registry, rest
+
+
+class ImageScanner(TagScanner):
+    """Find and rewrite the tag or digest of image references by image name.
+
+    Keys are image names, optionally with a registry (`nginx`,
+    `ghcr.io/acme/api`); a name without a registry matches the repository
+    on any registry. Each match covers the reference's `:tag`/`@digest`
+    suffix only, so the name, quotes and comments are never touched.
+    """
+
+    def __init__(
+        self, images: str | list[str], documents: DocumentSelector | None = None
+    ):
+        self.keys = [images] if isinstance(images, str) else list(images)
+        self.documents = documents
+        self.paths = None
+        self.pattern = IMAGE_LINE
+        self._by_repository: dict[str, list[tuple[str, str]]] = {}
+        for key in self.keys:
+            registry, repository = split_image_name(key)
+            self._by_repository.setdefault(repository, []).append((key, registry))
+        # Every reference contains the last component of its repository
+        self.needles = sorted(
+            {
+                repository.rsplit("/", 1)[-1].encode()
+                for repository in self._by_repository
+            }
+        )
+
+    @property
+    def signature(self) -> list[str]:
+        return ["@image"] + super().signature
+
+    def image_key(self, name: str) -> str | None:
+        """The configured image a reference name matches, if any."""
+        registry, repository = split_image_name(name)
+        for key, want in self._by_repository.get(repository, ()):
+            if not want or want == registry:
+                return key
+        return None
+
+    def _to_match(self, m: re.Match, line: int) -> TagMatch | None:
+        key = self.image_key(m.group("name").decode("utf-8", errors="replace"))
+        if key is None:
+            return None
+        suffix = m.group("suffix").decode("utf-8")
+        return TagMatch(
+            key=key,
+            value=suffix[1:],
+            start=m.start("suffix"),
+            end=m.end("suffix"),
+            line=line,
+        )
+
+    @staticmethod
+    def replacement(final_tag: str) -> bytes:
+        """A `:tag`, or an `@digest` that replaces any tag as well."""
+        sep = "@" if is_digest(final_tag) else ":"
+        return f"{sep}{final_tag}".encode()
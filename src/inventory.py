@@ -0,0 +1,32 @@
+"""Tag inventory output for image tag updater's scan mode."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from .logger import Logger
+
+# File extensions written as one JSON record per line
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+
+def format_inventory(records: list[dict], ndjson: bool = False) -> str:
+    """Serialize inventory records as one compact JSON array or as NDJSON."""
+    if ndjson:
+        return "".join(
+            json.dumps(record, separators=(",", ":")) + "\n" for record in records
+        )
+    return json.dumps(records, separators=(",", ":"))
+
+
+def save_inventory(records: list[dict], path: str, logger: Logger) -> None:
+    """Write the inventory to `path`; `.ndjson`/`.jsonl` files get NDJSON."""
+    inventory_path = Path(path)
+    try:
+        inventory_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(inventory_path, "w") as f:
+            f.write(format_inventory(records, path.endswith(NDJSON_SUFFIXES)))
+    except OSError as e:
+        logger.error(f"Failed to write inventory file: {e}")
+    logger.success(f"Inventory saved to: {path}")
@@ -0,0 +1,85 @@
+"""Kustomization `images:` support for image tag updater."""
+
+from __future__ import annotations
+
+import os
+
+from .image_ref import ImageScanner, is_digest
+from .scanner import TagMatch, TagScanner, count_newlines, parse_tag_value
+from .yaml_path import DocumentSelector, YamlPathScanner
+
+# File names kustomize reads a kustomization from
+KUSTOMIZATION_FILES = ("kustomization.yaml", "kustomization.yml", "Kustomization")
+
+IMAGE_FIELDS = ("name", "newTag", "digest")
+
+
+def is_kustomization(file_path: str) -> bool:
+    """Whether a file is a kustomization, by name."""
+    return os.path.basename(file_path) in KUSTOMIZATION_FILES
+
+
+class KustomizeScanner(TagScanner):
+    """Find and rewrite `newTag`/`digest` of entries under `images:`.
+
+    Keys are image names, matched like in `ImageScanner` against each
+    entry's `name`; images in `digests` have their `digest` field updated,
+    all others their `newTag`. All fields of every entry are collected in
+    one `YamlPathScanner` pass, however many images and entries there are.
+    """
+
+    def __init__(
+        self,
+        images: str | list[str],
+        documents: DocumentSelector | None = None,
+        digests: frozenset[str] = frozenset(),
+    ):
+        self.keys = [images] if isinstance(images, str) else list(images)
+        self.documents = documents
+        self.digests = digests
+        self.paths = None
+        self._images = ImageScanner(self.keys)
+        self._fields = YamlPathScanner([f"images[*].{field}" for field in IMAGE_FIELDS])
+
+    @property
+    def signature(self) -> list[str]:
+        digests = [f"@digest={key}" for key in sorted(self.digests)]
+        return ["@kustomize", *digests] + super().signature
+
+    @classmethod
+    def for_targets(cls, targets, documents: DocumentSelector | None = None):
+        """Build a scanner for image targets, choosing each one's field."""
+        return cls(
+            [t.key for t in targets],
+            documents,
+            frozenset(t.key for t in targets if is_digest(t.final_tag)),
+        )
+
+    def find(self, buf) -> list[TagMatch]:
+        """Return the targeted field of every matching `images:` entry."""
+        entries: dict[tuple, dict[str, tuple[int, int]]] = {}
+        for path, start, end, document, indexes in self._fields.find(buf):
+            field = path.rsplit(".", 1)[1]
+            entries.setdefault((document, indexes), {}).setdefault(field, (start, end))
+
+        found = []
+        for fields in entries.values():
+            if "name" not in fields:
+                continue
+            name = parse_tag_value(buf[slice(*fields["name"])]).strip("'")
+            key = self._images.image_key(name)
+            if key is None:
+                continue
+            field = "digest" if key in self.digests else "newTag"
+            if field in fields:
+                found.append((key, *fields[field]))
+
+        matches = []
+        line = 1
+        last = 0
+        for key, start, end in sorted(found, key=lambda item: item[1]):
+            line += count_newlines(buf, last, start)
+            last = start
+            value = parse_tag_value(buf[start:end]).strip("'")
+            matches.append(TagMatch(key, value, start, end, line))
+        return self._select_documents(buf, matches)
@@ -0,0 +1,121 @@
+"""Batch update manifest loading for image tag updater."""
+
+from __future__ import annotations
+
+import json
+import re
+
+# Keys accepted in a manifest entry
+MANIFEST_KEYS = {
+    "file",
+    "target_values_file",
+    "file_pattern",
+    "exclude_pattern",
+    "tag_string",
+    "new_tag",
+    "tag_prefix",
+    "tag_suffix",
+    "update_if_contains",
+    "skip_if_contains",
+}
+
+
+class ManifestError(ValueError):
+    """A manifest that cannot be read or does not describe valid updates."""
+
+
+YAML_ITEM = re.compile(r"^(\s*)-\s*(.*)$")
+YAML_PAIR = re.compile(r"^([A-Za-z_][\w.-]*)\s*:(?:\s+(.*))?$")
+
+
+def _yaml_scalar(raw: str) -> str:
+    """Parse a flow scalar: quoted string or plain value with optional comment."""
+    raw = raw.strip()
+    if raw[:1] in ("'", '"'):
+        quote = raw[0]
+        end = raw.find(quote, 1)
+        if end == -1:
+            raise ManifestError(f"Unterminated quoted value: {raw}")
+        return raw[1:end]
+    return re.split(r"\s+#", raw, maxsplit=1)[0].strip()
+
+
+def parse_yaml_manifest(text: str) -> list[dict[str, str]]:
+    """Parse the YAML subset used by manifests: a list of flat mappings.
+
+    The list may be at the top level or under an `updates:` key. Values are
+    plain or quoted scalars; anything else is rejected so that a manifest is
+    never half-understood.
+    """
+    entries: list[dict[str, str]] = []
+    item_indent = None
+    for lineno, line in enumerate(text.splitlines(), 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#") or stripped == "---":
+            continue
+        if item_indent is None and stripped == "updates:":
+            continue
+
+        item = YAML_ITEM.match(line)
+        indent = len(line) - len(line.lstrip())
+        if item and (item_indent is None or indent == item_indent):
+            item_indent = indent
+            entries.append({})
+            stripped = item.group(2).strip()
+            if not stripped:
+                continue
+        elif item_indent is None or indent <= item_indent:
+            raise ManifestError(f"Unsupported manifest syntax at line {lineno}: {line}")
+
+        pair = YAML_PAIR.match(stripped)
+        if not pair:
+            raise ManifestError(f"Unsupported manifest syntax at line {lineno}: {line}")
+        entries[-1][pair.group(1)] = _yaml_scalar(pair.group(2) or "")
+    return entries
+
+
+def load_manifest(path: str) -> list[dict[str, str]]:
+    """Load a JSON or YAML manifest into a list of raw update entries.
+
+    Every value must be a string; JSON numbers, booleans and nulls are
+    rejected rather than converted, since `1.10` would turn into `1.1`.
+
+    Raises:
+        ManifestError: If the manifest cannot be read or is malformed
+    """
+    try:
+        with open(path, "r") as f:
+            text = f.read()
+    except OSError as e:
+        raise ManifestError(f"Failed to read manifest {path}: {e}") from e
+
+    if path.endswith((".yaml", ".yml")):
+        data = parse_yaml_manifest(text)
+    else:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ManifestError(f"Invalid JSON in manifest {path}: {e}") from e
+
+    if isinstance(data, dict):
+        data = data.get("updates")
+    if not isinstance(data, list) or not data:
+        raise ManifestError(f"Manifest {path} must contain a non-empty list of updates")
+
+    entries = []
+    for index, entry in enumerate(data, 1):
+        if not isinstance(entry, dict):
+            raise ManifestError(f"Manifest entry {index} must be a mapping")
+        unknown = set(entry) - MANIFEST_KEYS
+        if unknown:
+            raise ManifestError(
+                f"Manifest entry {index} has unknown keys: {', '.join(sorted(unknown))}"
+            )
+        for key, value in entry.items():
+            if not isinstance(value, str):
+                raise ManifestError(
+                    f"Manifest entry {index} has a non-string value for '{key}': "
+                    f'{json.dumps(value)} (quote it, e.g. "1.10")'
+                )
+        entries.append(dict(entry))
+    return entries
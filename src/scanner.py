@@ -0,0 +1,300 @@
+"""Single-pass tag scanning engine for image tag updater."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+
+from .yaml_path import DocumentSelector, YamlPathScanner, is_path_key
+
+
+@dataclass
+class TagMatch:
+    """A single `tag_string:` occurrence found in a file."""
+
+    key: str
+    value: str
+    start: int  # offset of the value region (right after the colon)
+    end: int  # offset of the end of the line, excluding the line break
+    line: int  # 1-based line number
+
+
+@dataclass
+class ScanResult:
+    """Everything a single read of a file tells us about its tags.
+
+    For memory-mapped scans (`mapped=True`) the file content is not held:
+    `content` and `new_content` are empty and the file is patched by offset.
+    Scans served from the tag index (`cached=True`) hold no content either;
+    the file is read only if it has to be rewritten.
+    """
+
+    content: bytes
+    matches: list[TagMatch] = field(default_factory=list)
+    new_content: bytes = b""
+    changed: bool = False
+    mapped: bool = False
+    cached: bool = False
+    final_tags: dict[str, str] = field(default_factory=dict)  # what was rendered
+
+    @property
+    def found(self) -> bool:
+        """Whether the tag string occurs in the file at all."""
+        return bool(self.matches)
+
+    @property
+    def current_tag(self) -> str:
+        """Current tag value (first occurrence), or an empty string."""
+        return self.matches[0].value if self.matches else ""
+
+    @property
+    def current_tags(self) -> dict[str, str]:
+        """Current tag value per key (first occurrence of each key found)."""
+        tags: dict[str, str] = {}
+        for match in self.matches:
+            tags.setdefault(match.key, match.value)
+        return tags
+
+
+# Chunk size for line counting over memory-mapped buffers
+LINE_COUNT_CHUNK = 1 << 20
+
+# Above this many keys, keys are matched through a trie instead of a flat
+# alternation, whose cost grows with the key count at every line start
+KEY_TRIE_THRESHOLD = 8
+
+
+def count_newlines(buf, start: int, end: int) -> int:
+    """Count line breaks in buf[start:end] without copying large ranges."""
+    if isinstance(buf, bytes):
+        return buf.count(b"\n", start, end)
+    total = 0
+    for pos in range(start, end, LINE_COUNT_CHUNK):
+        total += buf[pos : min(pos + LINE_COUNT_CHUNK, end)].count(b"\n")
+    return total
+
+
+def trie_pattern(keys: list[bytes]) -> bytes:
+    """Compile keys into one regex that walks a trie of their bytes.
+
+    Each step of the trie only branches on distinct next bytes, so matching a
+    line costs about the length of its key regardless of how many keys exist.
+    """
+    trie: dict = {}
+    for key in keys:
+        node = trie
+        for byte in key:
+            node = node.setdefault(bytes([byte]), {})
+        node[b""] = {}  # a key ends here
+
+    def emit(node: dict) -> bytes:
+        terminal = b"" in node
+        branches = [
+            re.escape(char) + emit(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return b""
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        group = b"(?:" + b"|".join(branches) + b")"
+        return group + b"?" if terminal else group
+
+    return emit(trie)
+
+
+def key_pattern(keys: list[str]) -> bytes:
+    """Build the key part of the scan pattern for any number of keys."""
+    encoded = [key.encode("utf-8") for key in keys]
+    if len(encoded) > KEY_TRIE_THRESHOLD:
+        return trie_pattern(encoded)
+    # Longest first so a key never shadows a longer key it prefixes
+    return b"|".join(re.escape(key) for key in sorted(encoded, key=len, reverse=True))
+
+
+def parse_tag_value(raw: bytes) -> str:
+    """Parse the value part of a `key: value` line into a tag string."""
+    value = raw.decode("utf-8", errors="replace").strip().removeprefix('"')
+    return value.split('"', 1)[0].strip()
+
+
+class TagScanner:
+    """Find and rewrite `key:` lines for one or more keys in a single pass.
+
+    All keys share one pattern, compiled once per run; large key sets are
+    compiled as a trie (see `trie_pattern`). Small key sets are prefiltered
+    with plain substring searches (see `candidate_lines`).
+
+    Keys containing `.` or `[` are YAML paths (`api.image.tag`,
+    `workers[*].image.tag`), resolved by a `YamlPathScanner`. A line keyed
+    literally `api.image.tag:` still matches, and where a bare key and a path
+    both match a line, the path wins.
+
+    With a `DocumentSelector`, only matches inside the selected documents of
+    a multi-document stream are reported, and so rendered.
+    """
+
+    def __init__(
+        self, keys: str | list[str], documents: DocumentSelector | None = None
+    ):
+        self.keys = [keys] if isinstance(keys, str) else list(keys)
+        self.documents = documents
+        self.pattern = re.compile(
+            rb"^[ \t]*(" + key_pattern(self.keys) + rb"):([^\r\n]*)", re.MULTILINE
+        )
+        self.needles = [key.encode("utf-8") + b":" for key in self.keys]
+        paths = [key for key in self.keys if is_path_key(key)]
+        self.paths = YamlPathScanner(paths) if paths else None
+
+    @property
+    def signature(self) -> list[str]:
+        """What the matches of a scan depend on besides content, for caches."""
+        if self.documents is None:
+            return self.keys
+        return self.keys + [f"@documents={self.documents.spec}"]
+
+    def candidate_lines(self, buf) -> list[int]:
+        """Start offsets of the lines containing any `key:` byte string.
+
+        Every match of the anchored pattern starts on such a line, so the
+        pattern only needs to run there; a file without the keys costs one
+        `find` per key.
+        """
+        starts = set()
+        for needle in self.needles:
+            pos = buf.find(needle)
+            while pos != -1:
+                starts.add(buf.rfind(b"\n", 0, pos) + 1)
+                line_end = buf.find(b"\n", pos)
+                if line_end == -1:
+                    break
+                pos = buf.find(needle, line_end)
+        return sorted(starts)
+
+    def _iter_matches(self, buf):
+        """Pattern matches in file order, prefiltered for small key sets."""
+        if len(self.keys) > KEY_TRIE_THRESHOLD:
+            # One find pass per key would cost more than the trie scan itself
+            yield from self.pattern.finditer(buf)
+            return
+        for start in self.candidate_lines(buf):
+            m = self.pattern.match(buf, start)
+            if m:
+                yield m
+
+    def tag_map(self, final_tags: str | dict[str, str]) -> dict[str, str]:
+        """Normalize a single final tag or a per-key mapping to a mapping."""
+        if isinstance(final_tags, str):
+            return dict.fromkeys(self.keys, final_tags)
+        return final_tags
+
+    def find(self, buf) -> list[TagMatch]:
+        """Return every tag occurrence in `buf` (bytes or mmap), in file order."""
+        matches = []
+        line = 1
+        last = 0
+        for m in self._iter_matches(buf):
+            line += count_newlines(buf, last, m.start())
+            last = m.start()
+            match = self._to_match(m, line)
+            if match is not None:
+                matches.append(match)
+        if self.paths is not None:
+            matches = self._merge_paths(buf, matches)
+        return self._select_documents(buf, matches)
+
+    def _select_documents(self, buf, matches: list[TagMatch]) -> list[TagMatch]:
+        """Drop matches outside the selected documents, if any are selected."""
+        if self.documents is None or not matches:
+            return matches
+        selected = self.documents.filter(buf, [m.start for m in matches])
+        return [m for m, keep in zip(matches, selected) if keep]
+
+    def _to_match(self, m: re.Match, line: int) -> TagMatch | None:
+        """Turn a pattern match into a tag match (None to ignore it)."""
+        return TagMatch(
+            key=m.group(1).decode("utf-8"),
+            value=parse_tag_value(m.group(2)),
+            start=m.start(2),
+            end=m.end(2),
+            line=line,
+        )
+
+    def _merge_paths(self, buf, matches: list[TagMatch]) -> list[TagMatch]:
+        """Add path-key matches, replacing literal matches on the same lines."""
+        found = []
+        line = 1
+        last = 0
+        for key, start, end, *_ in self.paths.find(buf):
+            line += count_newlines(buf, last, start)
+            last = start
+            found.append(
+                TagMatch(key, parse_tag_value(buf[start:end]), start, end, line)
+            )
+        if not found:
+            return matches
+        taken = {match.start for match in found}
+        merged = [match for match in matches if match.start not in taken] + found
+        return sorted(merged, key=lambda match: match.start)
+
+    @staticmethod
+    def replacement(final_tag: str) -> bytes:
+        """Bytes written in place of each matched value region."""
+        return f' "{final_tag}"'.encode()
+
+    def render(
+        self,
+        buf: bytes,
+        matches: list[TagMatch],
+        final_tags: str | dict[str, str],
+    ) -> bytes:
+        """Build the updated content by splicing the final tag into each match.
+
+        Matches whose key has no entry in `final_tags` are left untouched.
+        """
+        tags = self.tag_map(final_tags)
+        replacements = {key: self.replacement(tag) for key, tag in tags.items()}
+        parts = []
+        pos = 0
+        for match in matches:
+            replacement = replacements.get(match.key)
+            if replacement is None:
+                continue
+            parts.append(buf[pos : match.start])
+            parts.append(replacement)
+            pos = match.end
+        if not parts:
+            return buf
+        parts.append(buf[pos:])
+        return b"".join(parts)
+
+    def scan(self, buf: bytes, final_tags: str | dict[str, str]) -> ScanResult:
+        """Scan `buf` once and return current tags, offsets and new content."""
+        tags = self.tag_map(final_tags)
+        matches = self.find(buf)
+        new_content = self.render(buf, matches, tags)
+        return ScanResult(
+            content=buf,
+            matches=matches,
+            new_content=new_content,
+            changed=new_content != buf,
+            final_tags=tags,
+        )
+
+    def scan_mapped(self, buf, final_tags: str | dict[str, str]) -> ScanResult:
+        """Scan a memory-mapped buffer without copying or rendering it."""
+        tags = self.tag_map(final_tags)
+        matches = self.find(buf)
+        changed = any(
+            buf[m.start : m.end] != self.replacement(tags[m.key])
+            for m in matches
+            if m.key in tags
+        )
+        return ScanResult(
+            content=b"",
+            matches=matches,
+            changed=changed,
+            mapped=True,
+            final_tags=tags,
+        )
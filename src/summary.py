@@ -24,22 +24,34 @@ class ChangeSummary:
         updated_files: list[str],
         old_tags: dict[str, str],
         commit_sha: str | None = None,
+        old_tags_by_key: dict[str, dict[str, str]] | None = None,
+        new_tags_by_key: dict[str, dict[str, str]] | None = None,
     ) -> dict:
-        """Create a summary of changes."""
+        """Create a summary of changes.
+
+        When `old_tags_by_key` is given, one change record is created per
+        updated key instead of one per file. `new_tags_by_key` overrides the
+        configured final tags per file (manifest runs).
+        """
         final_tag = self.config.get_final_tag()
+        final_tags = {t.key: t.final_tag for t in self.config.get_tag_targets()}
 
-        # Create change records for each file
+        # Create change records for each file (and key)
         changes = []
         for file_path in updated_files:
-            old_tag = old_tags.get(file_path, "")
-            changes.append(
-                {
-                    "file": file_path,
-                    "old_tag": old_tag,
-                    "new_tag": final_tag,
-                    "tag_string": self.config.tag_string,
-                }
-            )
+            key_tags = (old_tags_by_key or {}).get(file_path)
+            if not key_tags:
+                key_tags = {self.config.tag_string: old_tags.get(file_path, "")}
+            new_tags = (new_tags_by_key or {}).get(file_path, final_tags)
+            for key, old_tag in key_tags.items():
+                changes.append(
+                    {
+                        "file": file_path,
+                        "old_tag": old_tag,
+                        "new_tag": new_tags.get(key, final_tag),
+                        "tag_string": key,
+                    }
+                )
 
         summary = {
             "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
@@ -59,12 +71,16 @@ class ChangeSummary:
         updated_files: list[str],
         old_tags: dict[str, str],
         commit_sha: str | None = None,
+        old_tags_by_key: dict[str, dict[str, str]] | None = None,
+        new_tags_by_key: dict[str, dict[str, str]] | None = None,
     ) -> None:
         """Save change summary to file."""
         if not self.config.summary_file:
             return
 
-        summary = self.create_summary(updated_files, old_tags, commit_sha)
+        summary = self.create_summary(
+            updated_files, old_tags, commit_sha, old_tags_by_key, new_tags_by_key
+        )
 
         # Ensure parent directory exists
         summary_path = Path(self.config.summary_file)
@@ -105,20 +121,39 @@ class ChangeSummary:
         updated_files: list[str],
         old_tags: dict[str, str],
         commit_sha: str | None = None,
+        old_tags_by_key: dict[str, dict[str, str]] | None = None,
+        new_tags_by_key: dict[str, dict[str, str]] | None = None,
     ) -> None:
-        """Print change summary to console."""
+        """Print change summary to console.
+
+        Files updated under a single key keep the one-line `old → new`
+        format; files with several keys get one line per key.
+        """
         if not updated_files:
             return
 
         final_tag = self.config.get_final_tag()
+        final_tags = {t.key: t.final_tag for t in self.config.get_tag_targets()}
 
         self.logger.info("\nChange Summary:")
         self.logger.info(f"   Updated {len(updated_files)} file(s)")
 
         for file_path in updated_files:
-            old_tag = old_tags.get(file_path, "unknown")
             self.logger.info(f"   • {file_path}")
-            self.logger.info(f"     {old_tag} → {final_tag}")
+            key_tags = (old_tags_by_key or {}).get(file_path)
+            new_tags = (new_tags_by_key or {}).get(file_path, final_tags)
+            if not key_tags:
+                old_tag = old_tags.get(file_path, "unknown")
+                self.logger.info(f"     {old_tag} → {final_tag}")
+                continue
+            if len(key_tags) == 1 and len(final_tags) <= 1:
+                ((key, old_tag),) = key_tags.items()
+                self.logger.info(f"     {old_tag} → {new_tags.get(key, final_tag)}")
+                continue
+            for key, old_tag in key_tags.items():
+                self.logger.info(
+                    f"     {key}: {old_tag} → {new_tags.get(key, final_tag)}"
+                )
 
         if commit_sha:
             self.logger.info(f"\n   Commit: {commit_sha}")
@@ -0,0 +1,265 @@
+"""Indentation-aware YAML path matching for image tag updater."""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+
+from .discovery import split_list
+
+# A structural line: a document marker, or an indented line that may hold
+# list item dashes and a `key:`; blank, comment and continuation lines never
+# match, so the regex engine skips them
+STRUCT = re.compile(
+    rb"^(?:(---|\.\.\.)(?=[ \t\r\n]|\Z)"
+    rb"|( *)(?=[^\s#])((?:-(?:[ \t]+|(?=[\r\n]|\Z)))*)"
+    rb"""(?:("[^"\r\n]*"|'[^'\r\n]*'|[^\s#'"][^:#\r\n]*?)[ \t]*:(?=[ \t\r\n]|\Z)"""
+    rb"([^\r\n]*))?)",
+    re.MULTILINE,
+)
+
+# A document marker; each one starts a new document in a stream
+DOC_MARKER = re.compile(rb"^(?:---|\.\.\.)(?=[ \t\r\n]|\Z)", re.MULTILINE)
+
+# The scalar part of a value: a quoted string or a plain run up to a comment
+SCALAR = re.compile(rb"""[ \t]*(?:"[^"]*"|'[^']*'|(?:[^ \t#]|[ \t]+(?=[^ \t#]))*)""")
+
+# Value of a key that starts a literal/folded block scalar
+BLOCK_SCALAR = re.compile(rb"[ \t]*[|>][-+0-9]*[ \t]*(?:#.*)?$")
+
+PATH_SEGMENT = re.compile(r"([^.\[\]]+)|\[(\*|\d+)\]")
+
+# A path segment: a mapping key, a list index, or None for any list item
+Segment = str | int | None
+
+
+def is_path_key(key: str) -> bool:
+    """Whether a tag key addresses a YAML path rather than a bare key name."""
+    return "." in key or "[" in key
+
+
+def parse_path(path: str) -> tuple[Segment, ...]:
+    """Parse `workers[*].image.tag` into ("workers", None, "image", "tag").
+
+    Raises:
+        ValueError: If the path is malformed
+    """
+    segments: list[Segment] = []
+    for part in path.split("."):
+        if not part:
+            raise ValueError(f"Invalid tag path: {path}")
+        index = 0
+        while index < len(part):
+            m = PATH_SEGMENT.match(part, index)
+            if m is None or (m.group(1) and index):
+                raise ValueError(f"Invalid tag path: {path}")
+            if m.group(1):
+                segments.append(m.group(1))
+            else:
+                segments.append(None if m.group(2) == "*" else int(m.group(2)))
+            index = m.end()
+    if path.endswith("]"):  # the last segment is a list index
+        raise ValueError(f"Invalid tag path: {path} (must end with a key)")
+    return tuple(segments)
+
+
+class YamlPathScanner:
+    """Find `key: value` lines by their full YAML path in one streaming pass.
+
+    Lines are read once while a stack of (indent, key or list index) tracks
+    where each line sits; no YAML tree is built and nothing but the matched
+    value regions is ever rewritten. Block scalars (`|`, `>`) are skipped so
+    their text is never mistaken for keys, and `---` starts a fresh document.
+    """
+
+    def __init__(self, paths: list[str]):
+        self.paths = list(paths)
+        # Targets grouped by leaf key, so most lines are rejected by one lookup
+        self.by_leaf: dict[bytes, list[tuple[str, tuple]]] = {}
+        for path in self.paths:
+            segments = tuple(
+                s.encode("utf-8") if isinstance(s, str) else s for s in parse_path(path)
+            )
+            self.by_leaf.setdefault(segments[-1], []).append((path, segments))
+        # Leaf names without the colon, which may follow a closing quote
+        self.needles = list(self.by_leaf)
+
+    @staticmethod
+    def _match_path(stack: list[list], targets: list[tuple[str, tuple]]) -> str | None:
+        """The target whose parent segments match the open keys and items."""
+        for path, segments in targets:
+            # The stack holds the root plus one entry per parent segment
+            if len(segments) != len(stack):
+                continue
+            for pattern, entry in zip(segments, stack[1:]):
+                actual = entry[1]
+                if pattern is None:
+                    if not isinstance(actual, int):
+                        break
+                elif pattern != actual:
+                    break
+            else:
+                return path
+        return None
+
+    def find(self, buf) -> list[tuple[str, int, int]]:
+        """Find every targeted path in `buf` (bytes or mmap), in file order.
+
+        The value region of each match ends with its scalar, so a trailing
+        comment on the line survives a rewrite.
+
+        Returns:
+            (path, value start, value end, document index, list indexes)
+            per match; documents are counted as in `document_starts`, and
+            the list indexes are those of the items the match lies in
+        """
+        if not any(buf.find(needle) != -1 for needle in self.needles):
+            return []
+
+        by_leaf = self.by_leaf
+        matches = []
+        # Entries are [indent, segment, next list index]; the root never pops
+        stack: list[list] = [[-1, None, 0]]
+        block_indent = -1  # inside a block scalar indented deeper than this
+        document = 0
+        for m in STRUCT.finditer(buf):
+            if m.group(1) is not None:
+                stack = [[-1, None, 0]]
+                block_indent = -1
+                document += 1
+                continue
+            col = m.end(2) - m.start(2)
+            if block_indent >= 0:
+                if col > block_indent:
+                    continue
+                block_indent = -1
+
+            # Each leading "- " opens a list item one column further in
+            dashes = m.group(3)
+            index = 0
+            while index < len(dashes):
+                item_col = col + index
+                while stack[-1][0] > item_col or (
+                    stack[-1][0] == item_col and isinstance(stack[-1][1], int)
+                ):
+                    stack.pop()
+                parent = stack[-1]
+                stack.append([item_col, parent[2], 0])
+                parent[2] += 1
+                index += 1
+                while index < len(dashes) and dashes[index] in b" \t":
+                    index += 1
+
+            key = m.group(4)
+            if key is None:
+                continue
+            col += len(dashes)
+            if key[:1] in (b'"', b"'"):
+                key = key[1:-1]
+            while stack[-1][0] >= col:
+                stack.pop()
+
+            targets = by_leaf.get(key)
+            if targets is not None:
+                path = self._match_path(stack, targets)
+                if path is not None:
+                    start = m.start(5)
+                    end = start + SCALAR.match(m.group(5)).end()
+                    indexes = tuple(
+                        entry[1] for entry in stack if isinstance(entry[1], int)
+                    )
+                    matches.append((path, start, end, document, indexes))
+            stack.append([col, key, 0])
+            value = m.group(5)
+            if (
+                value
+                and value.lstrip()[:1] in (b"|", b">")
+                and BLOCK_SCALAR.match(value)
+            ):
+                block_indent = col
+        return matches
+
+
+def document_starts(buf) -> list[int]:
+    """Start offsets of the documents of a YAML stream; the first is always 0.
+
+    Every `---` or `...` marker line starts a new document, so indexes line
+    up with the document index reported by `YamlPathScanner.find`.
+    """
+    if buf.find(b"---") == -1 and buf.find(b"...") == -1:
+        return [0]
+    return [0] + [m.start() for m in DOC_MARKER.finditer(buf)]
+
+
+def _plain_scalar(raw: bytes) -> str:
+    """A key's value as text, without surrounding quotes."""
+    value = raw.decode("utf-8", errors="replace").strip()
+    if len(value) > 1 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def scalar_value(raw: str) -> str:
+    """A value as text, without quotes or a trailing `# comment`."""
+    raw = raw.encode("utf-8")
+    return _plain_scalar(SCALAR.match(raw).group())
+
+
+class DocumentSelector:
+    """Pick documents of a multi-document stream by `kind` and `metadata.name`.
+
+    Selectors are `Kind/name`, `Kind` (or `Kind/*`) and `*/name`, separated
+    by commas or newlines; kinds and names match exactly. Both fields of every
+    document are found in one `YamlPathScanner` pass.
+    """
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        self.selectors: list[tuple[str | None, str | None]] = []
+        for item in split_list(spec):
+            kind, sep, name = item.partition("/")
+            kind, name = kind.strip(), name.strip()
+            if not kind or (sep and not name) or "/" in name:
+                raise ValueError(f"Invalid document selector: {item}")
+            self.selectors.append(
+                (None if kind == "*" else kind, None if name in ("", "*") else name)
+            )
+        if not self.selectors:
+            raise ValueError(f"No document selectors found in: '{spec}'")
+        self._fields = YamlPathScanner(["kind", "metadata.name"])
+
+    def selects(self, kind: str | None, name: str | None) -> bool:
+        """Whether a document with this kind and name is selected."""
+        return any(
+            (want_kind is None or want_kind == kind)
+            and (want_name is None or want_name == name)
+            for want_kind, want_name in self.selectors
+        )
+
+    def ranges(self, buf) -> list[tuple[int, int]]:
+        """(start, end) offsets of the selected documents of `buf`."""
+        fields: dict[int, dict[str, str]] = {}
+        for path, start, end, document, _indexes in self._fields.find(buf):
+            fields.setdefault(document, {}).setdefault(
+                path, _plain_scalar(buf[start:end])
+            )
+        starts = document_starts(buf)
+        ends = starts[1:] + [len(buf)]
+        return [
+            (start, end)
+            for document, (start, end) in enumerate(zip(starts, ends))
+            if document in fields
+            and self.selects(
+                fields[document].get("kind"), fields[document].get("metadata.name")
+            )
+        ]
+
+    def filter(self, buf, offsets: list[int]) -> list[bool]:
+        """Whether each offset (ascending or not) lies in a selected document."""
+        ranges = self.ranges(buf)
+        starts = [start for start, _ in ranges]
+        selected = []
+        for offset in offsets:
+            index = bisect_right(starts, offset) - 1
+            selected.append(index >= 0 and offset < ranges[index][1])
+        return selected
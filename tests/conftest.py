@@ -41,6 +41,21 @@ def clean_env(request, monkeypatch):
         "UPDATE_IF_CONTAINS",
         "SKIP_IF_CONTAINS",
         "SUMMARY_FILE",
+        "MAX_WORKERS",
+        "LARGE_FILE_THRESHOLD",
+        "MANIFEST",
+        "EXCLUDE_DIRS",
+        "EXCLUDE_PATTERN",
+        "DISCOVERY",
+        "CACHE_MODE",
+        "CACHE_DIR",
+        "SKIP_MISSING",
+        "DOCUMENTS",
+        "IMAGE_NAME",
+        "MODE",
+        "INVENTORY_FILE",
+        "PROMOTIONS",
+        "COMMIT_MODE",
         "GITHUB_OUTPUT",
     ]
     for key in env_keys:
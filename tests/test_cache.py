@@ -0,0 +1,156 @@
+"""Tests for src/cache.py"""
+
+import json
+import os
+
+import pytest
+
+from src.cache import (
+    INDEX_VERSION,
+    BlobCache,
+    TagIndex,
+    find_git_dir,
+    stat_signature,
+)
+from src.scanner import TagMatch
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+MATCHES = [TagMatch(key="tag", value="v1.0.0", start=10, end=19, line=2)]
+
+
+@pytest.fixture
+def values_file(tmp_path):
+    path = tmp_path / "values.yaml"
+    path.write_text('image:\n  tag: "v1.0.0"\n')
+    # Old enough not to be racily clean
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    return str(path)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return TagIndex(str(tmp_path / "cache" / "tag-index.json"))
+
+
+# ---------------------------------------------------------------------------
+# find_git_dir
+# ---------------------------------------------------------------------------
+
+
+class TestFindGitDir:
+    def test_found_from_subdirectory(self, tmp_path):
+        (tmp_path / ".git").mkdir()
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        assert find_git_dir(str(tmp_path / "a" / "b")) == str(tmp_path / ".git")
+
+    def test_not_found(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("os.path.isdir", lambda path: False)
+        assert find_git_dir(str(tmp_path)) is None
+
+
+# ---------------------------------------------------------------------------
+# TagIndex
+# ---------------------------------------------------------------------------
+
+
+class TestTagIndex:
+    def test_store_and_lookup(self, index, values_file):
+        st = os.stat(values_file)
+        index.store(values_file, st, ["tag"], MATCHES)
+        assert index.dirty
+        assert index.lookup(values_file, st, ["tag"]) == MATCHES
+
+    def test_changed_stat_misses(self, index, values_file):
+        index.store(values_file, os.stat(values_file), ["tag"], MATCHES)
+        with open(values_file, "a") as f:
+            f.write("# changed\n")
+        os.utime(values_file, ns=(2_000_000_000, 2_000_000_000))
+        assert index.lookup(values_file, os.stat(values_file), ["tag"]) is None
+
+    def test_different_keys_miss(self, index, values_file):
+        st = os.stat(values_file)
+        index.store(values_file, st, ["tag"], MATCHES)
+        assert index.lookup(values_file, st, ["tag", "sidecarTag"]) is None
+
+    def test_racily_clean_file_not_stored(self, index, tmp_path):
+        path = tmp_path / "fresh.yaml"
+        path.write_text("tag: v1\n")
+        index.store(str(path), os.stat(path), ["tag"], [])
+        assert not index.entries
+
+    def test_discard(self, index, values_file):
+        st = os.stat(values_file)
+        index.store(values_file, st, ["tag"], MATCHES)
+        index.dirty = False
+        index.discard(values_file)
+        assert index.dirty
+        assert index.lookup(values_file, st, ["tag"]) is None
+
+    def test_save_and_load(self, index, values_file):
+        st = os.stat(values_file)
+        index.store(values_file, st, ["tag"], MATCHES)
+        index.save()
+        assert not index.dirty
+        loaded = TagIndex.load(index.path)
+        assert loaded.lookup(values_file, st, ["tag"]) == MATCHES
+        with open(index.path) as f:
+            data = json.load(f)
+        assert data["version"] == INDEX_VERSION
+        entry = data["files"][os.path.realpath(values_file)]
+        assert entry["stat"] == stat_signature(st)
+
+    def test_save_skipped_when_clean(self, index):
+        index.save()
+        assert not os.path.exists(index.path)
+
+    @pytest.mark.parametrize(
+        "content", ["{", '{"version": 0, "files": {}}', '{"version": 1, "files": []}']
+    )
+    def test_load_unusable_index(self, tmp_path, content):
+        path = tmp_path / "tag-index.json"
+        path.write_text(content)
+        assert TagIndex.load(str(path)).entries == {}
+
+    def test_load_missing_index(self, tmp_path):
+        assert TagIndex.load(str(tmp_path / "missing.json")).entries == {}
+
+    def test_malformed_entry_misses(self, index, values_file):
+        st = os.stat(values_file)
+        index.store(values_file, st, ["tag"], MATCHES)
+        index.entries[os.path.realpath(values_file)]["matches"] = [["tag"]]
+        assert index.lookup(values_file, st, ["tag"]) is None
+
+
+# ---------------------------------------------------------------------------
+# BlobCache
+# ---------------------------------------------------------------------------
+
+
+class TestBlobCache:
+    def test_store_and_lookup(self, tmp_path):
+        cache = BlobCache(str(tmp_path / "blob-cache.json"))
+        cache.store("abc123", ["tag"], MATCHES)
+        assert cache.lookup("abc123", ["tag"]) == MATCHES
+        assert cache.lookup("abc123", ["sidecarTag"]) is None
+        assert cache.lookup("def456", ["tag"]) is None
+
+    def test_only_used_blobs_saved(self, tmp_path):
+        path = str(tmp_path / "blob-cache.json")
+        cache = BlobCache(path)
+        cache.store("used", ["tag"], MATCHES)
+        cache.store("stale", ["tag"], [])
+        cache.save()
+
+        loaded = BlobCache.load(path)
+        assert loaded.lookup("used", ["tag"]) == MATCHES
+        loaded.save()
+        assert set(BlobCache.load(path).entries) == {"used"}
+
+    def test_clean_load_not_saved(self, tmp_path):
+        cache = BlobCache(str(tmp_path / "blob-cache.json"))
+        cache.save()
+        assert not os.path.exists(cache.path)
@@ -1,5 +1,6 @@
 """Tests for src/config.py"""
 
+import json
 import os
 import pytest
 from unittest.mock import patch
@@ -61,6 +62,7 @@ class TestFromEnv:
             "UPDATE_IF_CONTAINS": "v1.",
             "SKIP_IF_CONTAINS": "latest",
             "SUMMARY_FILE": "summary.json",
+            "MAX_WORKERS": "8",
         }
         with patch.dict(os.environ, env, clear=False):
             cfg = Config.from_env()
@@ -77,6 +79,7 @@ class TestFromEnv:
         assert cfg.update_if_contains == "v1."
         assert cfg.skip_if_contains == "latest"
         assert cfg.summary_file == "summary.json"
+        assert cfg.max_workers == 8
 
     def test_from_env_defaults(self):
         env = {
@@ -116,6 +119,8 @@ class TestFromEnv:
         assert cfg.tag_prefix == ""
         assert cfg.tag_suffix == ""
         assert cfg.commit_message == "Update image tag"
+        assert cfg.max_workers == 1
+        assert cfg.get_exclude_dirs() == [".git", "node_modules", "charts/*/charts"]
 
 
 # ---------------------------------------------------------------------------
@@ -147,6 +152,33 @@ class TestGetFinalTag:
         assert cfg.get_final_tag() == "release-1.0.0-staging"
 
 
+# ---------------------------------------------------------------------------
+# get_tag_targets
+# ---------------------------------------------------------------------------
+
+
+class TestGetTagTargets:
+    def test_single_key(self, valid_config):
+        targets = valid_config.get_tag_targets()
+        assert [(t.key, t.final_tag) for t in targets] == [("tag", "v1.0.0")]
+
+    def test_multiple_keys_with_per_key_tags(self, base_config_kwargs):
+        cfg = Config(
+            **{
+                **base_config_kwargs,
+                "tag_string": "tag, sidecarTag=2.1.0\nmigrationsTag",
+                "tag_prefix": "v",
+                "new_tag": "1.0.0",
+            }
+        )
+        targets = cfg.get_tag_targets()
+        assert [(t.key, t.final_tag) for t in targets] == [
+            ("tag", "v1.0.0"),
+            ("sidecarTag", "v2.1.0"),
+            ("migrationsTag", "v1.0.0"),
+        ]
+
+
 # ---------------------------------------------------------------------------
 # validate
 # ---------------------------------------------------------------------------
@@ -195,12 +227,242 @@ class TestValidate:
         with pytest.raises(ValueError, match="Invalid repo format"):
             cfg.validate()
 
+    def test_invalid_per_key_tag(self, base_config_kwargs):
+        base_config_kwargs["tag_string"] = "tag,sidecarTag=bad!tag"
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="for key 'sidecarTag'"):
+            cfg.validate()
+
+    def test_duplicate_key(self, base_config_kwargs):
+        base_config_kwargs["tag_string"] = "tag,tag=v2"
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="Duplicate key"):
+            cfg.validate()
+
+    def test_missing_key(self, base_config_kwargs):
+        base_config_kwargs["tag_string"] = "tag,=v2"
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="missing key"):
+            cfg.validate()
+
+    def test_invalid_tag_path(self, base_config_kwargs):
+        base_config_kwargs["tag_string"] = "workers[x].image.tag"
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="Invalid tag path"):
+            cfg.validate()
+
+    def test_tag_path_is_valid(self, base_config_kwargs):
+        base_config_kwargs["tag_string"] = "api.image.tag,workers[*].image.tag=v3"
+        Config(**base_config_kwargs).validate()
+
+    def test_invalid_documents(self, base_config_kwargs):
+        base_config_kwargs["documents"] = "Deployment/"
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="Invalid document selector"):
+            cfg.validate()
+
+    def test_image_name_accepts_digest(self, base_config_kwargs):
+        base_config_kwargs["image_name"] = "ghcr.io/acme/api,nginx=1.27"
+        base_config_kwargs["new_tag"] = "sha256:" + "0" * 64
+        cfg = Config(**base_config_kwargs)
+        cfg.validate()
+        assert [t.key for t in cfg.get_tag_targets()] == ["ghcr.io/acme/api", "nginx"]
+
+    def test_invalid_image_name(self, base_config_kwargs):
+        base_config_kwargs["image_name"] = "ghcr.io/acme/api:1.0"
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="Invalid image name"):
+            cfg.validate()
+
+    def test_invalid_image_tag(self, base_config_kwargs):
+        base_config_kwargs["image_name"] = "nginx=sha256:abc"
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="for image 'nginx'"):
+            cfg.validate()
+
+    def test_invalid_mode(self, base_config_kwargs):
+        base_config_kwargs["mode"] = "audit"
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="Invalid mode"):
+            cfg.validate()
+
+    def test_scan_mode_needs_no_tag_or_git_settings(self):
+        cfg = Config(
+            target_path="/tmp",
+            new_tag="",
+            tag_string="tag,api.image.tag",
+            git_user_name="",
+            git_user_email="",
+            github_token="",
+            repo="",
+            branch="",
+            file_pattern="*.yaml",
+            mode="scan",
+        )
+        cfg.validate()
+
+    def test_scan_mode_validates_keys(self, base_config_kwargs):
+        base_config_kwargs.update(mode="scan", tag_string="tag,tag")
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="Duplicate key"):
+            cfg.validate()
+
+    def test_promotions_parsed(self, base_config_kwargs):
+        base_config_kwargs.update(
+            mode="promote",
+            new_tag="",
+            target_values_file=None,
+            promotions="dev1.yaml -> dev2.yaml\ndev2.yaml->prod.yaml",
+        )
+        cfg = Config(**base_config_kwargs)
+        cfg.validate()
+        assert cfg.get_promotions() == [
+            ("dev1.yaml", "dev2.yaml"),
+            ("dev2.yaml", "prod.yaml"),
+        ]
+
+    @pytest.mark.parametrize(
+        "promotions, match",
+        [
+            ("", "promotions must be set"),
+            ("dev.yaml", "Invalid promotion"),
+            ("a -> b -> c", "Invalid promotion"),
+            ("a.yaml -> a.yaml", "are the same"),
+        ],
+    )
+    def test_invalid_promotions(self, base_config_kwargs, promotions, match):
+        base_config_kwargs.update(
+            mode="promote", target_values_file=None, promotions=promotions
+        )
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match=match):
+            cfg.validate()
+
+    def test_promotions_exclude_file_selection(self, base_config_kwargs):
+        base_config_kwargs.update(mode="promote", promotions="a -> b")
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="Cannot combine promotions"):
+            cfg.validate()
+
+    def test_no_keys(self, base_config_kwargs):
+        base_config_kwargs["tag_string"] = " , "
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="No tag keys"):
+            cfg.validate()
+
+    def test_invalid_max_workers(self, base_config_kwargs):
+        base_config_kwargs["max_workers"] = 0
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="Invalid max_workers"):
+            cfg.validate()
+
+    def test_invalid_large_file_threshold(self, base_config_kwargs):
+        base_config_kwargs["large_file_threshold"] = -1
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="Invalid large_file_threshold"):
+            cfg.validate()
+
+    def test_exclude_pattern_requires_file_pattern(self, base_config_kwargs):
+        base_config_kwargs["exclude_pattern"] = "*.bak"
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="exclude_pattern can only be used"):
+            cfg.validate()
+
+    def test_invalid_discovery(self, base_config_kwargs):
+        base_config_kwargs["discovery"] = "index"
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="Invalid discovery"):
+            cfg.validate()
+
+    def test_invalid_cache_mode(self, base_config_kwargs):
+        base_config_kwargs["cache_mode"] = "mtime"
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="Invalid cache_mode"):
+            cfg.validate()
+
+    def test_invalid_commit_mode(self, base_config_kwargs):
+        base_config_kwargs["commit_mode"] = "index"
+        cfg = Config(**base_config_kwargs)
+        with pytest.raises(ValueError, match="Invalid commit_mode"):
+            cfg.validate()
+
     def test_valid_repo_format(self, base_config_kwargs):
         base_config_kwargs["repo"] = "my-org/my-repo.name"
         cfg = Config(**base_config_kwargs)
         cfg.validate()  # should not raise
 
 
+# ---------------------------------------------------------------------------
+# manifest
+# ---------------------------------------------------------------------------
+
+
+class TestManifest:
+    def _config(self, base_config_kwargs, tmp_path, entries):
+        path = tmp_path / "updates.json"
+        path.write_text(json.dumps(entries))
+        kwargs = {**base_config_kwargs, "manifest": str(path), "new_tag": ""}
+        del kwargs["target_values_file"]
+        return Config(**kwargs)
+
+    def test_get_updates_with_defaults(self, base_config_kwargs, tmp_path):
+        base_config_kwargs["tag_prefix"] = "v"
+        cfg = self._config(
+            base_config_kwargs,
+            tmp_path,
+            [
+                {"file": "a.yaml", "new_tag": "1.0"},
+                {"file_pattern": "*.yaml", "new_tag": "2.0", "tag_prefix": ""},
+            ],
+        )
+        cfg.validate()
+        first, second = cfg.get_updates()
+        assert first.target_values_file == "a.yaml"
+        assert first.get_tag_targets()[0].final_tag == "v1.0"
+        assert second.file_pattern == "*.yaml"
+        assert second.get_tag_targets()[0].final_tag == "2.0"
+
+    def test_targets_carry_conditions(self, base_config_kwargs, tmp_path):
+        cfg = self._config(
+            base_config_kwargs,
+            tmp_path,
+            [{"file": "a.yaml", "new_tag": "v1", "skip_if_contains": "prod"}],
+        )
+        (target,) = cfg.get_updates()[0].get_tag_targets()
+        assert target.skip_if_contains == "prod"
+
+    def test_entry_without_tag(self, base_config_kwargs, tmp_path):
+        cfg = self._config(base_config_kwargs, tmp_path, [{"file": "a.yaml"}])
+        with pytest.raises(ValueError, match="Manifest entry 1: No tag given"):
+            cfg.validate()
+
+    def test_entry_without_file(self, base_config_kwargs, tmp_path):
+        cfg = self._config(base_config_kwargs, tmp_path, [{"new_tag": "v1"}])
+        with pytest.raises(ValueError, match="either file or file_pattern"):
+            cfg.validate()
+
+    def test_entry_with_both_files(self, base_config_kwargs, tmp_path):
+        entry = {"file": "a.yaml", "file_pattern": "*.yaml", "new_tag": "v1"}
+        cfg = self._config(base_config_kwargs, tmp_path, [entry])
+        with pytest.raises(ValueError, match="cannot set both"):
+            cfg.validate()
+
+    def test_entry_invalid_tag(self, base_config_kwargs, tmp_path):
+        cfg = self._config(
+            base_config_kwargs, tmp_path, [{"file": "a.yaml", "new_tag": "v1 beta"}]
+        )
+        with pytest.raises(ValueError, match="Manifest entry 1: Invalid final tag"):
+            cfg.validate()
+
+    def test_combined_with_target_file(self, base_config_kwargs, tmp_path):
+        cfg = self._config(
+            base_config_kwargs, tmp_path, [{"file": "a.yaml", "new_tag": "v1"}]
+        )
+        cfg.target_values_file = "values.yaml"
+        with pytest.raises(ValueError, match="Cannot combine manifest"):
+            cfg.validate()
+
+
 # ---------------------------------------------------------------------------
 # print_config
 # ---------------------------------------------------------------------------
@@ -0,0 +1,349 @@
+"""Tests for src/discovery.py"""
+
+import os
+import re
+import subprocess
+
+import pytest
+
+from src.discovery import (
+    DirectoryPruner,
+    PathMatcher,
+    git_blob_ids,
+    git_files,
+    split_list,
+    translate_component,
+    translate_pattern,
+    walk_files,
+)
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+TREE = [
+    "top.values.yaml",
+    ".hidden.yaml",
+    "apps/api/values.yaml",
+    "apps/api/dev.values.yaml",
+    "apps/web/values.yaml",
+    "charts/api/values.yaml",
+    "charts/api/charts/redis/values.yaml",
+    "apps/node_modules/values.yaml",
+    "node_modules/pkg/values.yaml",
+    ".git/values.yaml",
+    ".github/values.yaml",
+]
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    for name in TREE:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("tag: v1\n")
+    (tmp_path / "dir.yaml").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+# ---------------------------------------------------------------------------
+# helpers
+# ---------------------------------------------------------------------------
+
+
+class TestTranslateComponent:
+    @pytest.mark.parametrize(
+        "part,name,expected",
+        [
+            ("*.yaml", "a.yaml", True),
+            ("*.yaml", "a.yml", False),
+            ("*.yaml", ".a.yaml", False),
+            (".*", ".a.yaml", True),
+            ("v?.yaml", "v1.yaml", True),
+            ("[!a]*", "b.yaml", True),
+            ("[!a]*", "a.yaml", False),
+            ("[ab]", "b", True),
+            ("a[", "a[", True),
+        ],
+    )
+    def test_matches(self, part, name, expected):
+        assert bool(re.fullmatch(translate_component(part), name)) is expected
+
+
+class TestSplitList:
+    def test_commas_and_newlines(self):
+        assert split_list(".git, node_modules\ncharts/*/charts,,") == [
+            ".git",
+            "node_modules",
+            "charts/*/charts",
+        ]
+
+
+class TestDirectoryPruner:
+    def test_name_and_path_patterns(self):
+        pruner = DirectoryPruner([".git", "charts/*/charts"])
+        assert pruner.excluded(".git", "a/.git")
+        assert pruner.excluded("charts", "deploy/charts/api/charts")
+        assert not pruner.excluded("charts", "charts")
+        assert not pruner.excluded("api", "charts/api")
+
+    def test_empty(self):
+        assert not DirectoryPruner([]).excluded(".git", ".git")
+        assert not DirectoryPruner([]).excludes_file(".git/config")
+
+    def test_excludes_file(self):
+        pruner = DirectoryPruner(["node_modules", "charts/*/charts"])
+        assert pruner.excludes_file("a/node_modules/x/values.yaml")
+        assert pruner.excludes_file("charts/api/charts/redis/values.yaml")
+        assert not pruner.excludes_file("charts/api/values.yaml")
+        assert not pruner.excludes_file("node_modules")
+
+
+class TestTranslatePattern:
+    @pytest.mark.parametrize(
+        "pattern,path,expected",
+        [
+            ("**/values.yaml", "values.yaml", True),
+            ("**/values.yaml", "a/b/values.yaml", True),
+            ("**/values.yaml", ".git/values.yaml", False),
+            ("apps/*/values.yaml", "apps/api/values.yaml", True),
+            ("apps/*/values.yaml", "apps/api/x/values.yaml", False),
+            ("apps/**", "apps/a/b.yaml", True),
+            ("./*.yaml", "a.yaml", True),
+            ("/srv/*.yaml", "/srv/a.yaml", True),
+        ],
+    )
+    def test_file_regex(self, pattern, path, expected):
+        assert bool(re.fullmatch(translate_pattern(pattern)[0], path)) is expected
+
+    @pytest.mark.parametrize(
+        "pattern,directory,expected",
+        [
+            ("apps/*/values.yaml", "apps", True),
+            ("apps/*/values.yaml", "apps/api", True),
+            ("apps/*/values.yaml", "apps/api/x", False),
+            ("apps/*/values.yaml", "charts", False),
+            ("a/**/x.yaml", "a/b/c/d", True),
+            ("**/x.yaml", ".git", False),
+        ],
+    )
+    def test_directory_regex(self, pattern, directory, expected):
+        assert bool(re.fullmatch(translate_pattern(pattern)[1], directory)) is expected
+
+    def test_single_component_has_no_directories(self):
+        assert translate_pattern("*.yaml")[1] == ""
+
+
+class TestPathMatcher:
+    def test_include_and_exclude(self):
+        matcher = PathMatcher(["apps/**/*.yaml", "*.yaml"], ["**/prod.yaml"])
+        assert matcher.match("apps/api/dev.yaml")
+        assert matcher.match("top.yaml")
+        assert not matcher.match("apps/api/prod.yaml")
+        assert not matcher.match("prod.yaml")
+        assert not matcher.match("charts/api/dev.yaml")
+
+    def test_enters(self):
+        matcher = PathMatcher(["apps/*/values.yaml", "charts/**"])
+        assert matcher.enters("apps/api")
+        assert matcher.enters("charts/a/b")
+        assert not matcher.enters("docs")
+        assert not PathMatcher(["*.yaml"]).enters("apps")
+
+    def test_names_dir(self):
+        matcher = PathMatcher(["charts/*/charts/*/values.yaml", "**/x/*.yaml"])
+        assert matcher.names_dir("charts")
+        assert matcher.names_dir("charts/api/charts")
+        assert matcher.names_dir("a/b/x")
+        assert not matcher.names_dir("charts/api")
+        assert not matcher.names_dir("charts/api/charts/redis")
+
+    def test_bases_are_not_nested(self):
+        matcher = PathMatcher(["apps/a/*.yaml", "apps/*.yaml", "/srv/x/*", "b/c/*"])
+        assert matcher.bases == ["/srv/x", "apps", "b/c"]
+        assert PathMatcher(["apps/*.yaml", "*.yaml"]).bases == [""]
+
+
+# ---------------------------------------------------------------------------
+# walk_files
+# ---------------------------------------------------------------------------
+
+
+class TestWalkFiles:
+    def test_single_level(self, tree):
+        assert list(walk_files("*.yaml")) == ["top.values.yaml"]
+
+    def test_wildcard_directories(self, tree):
+        assert list(walk_files("apps/*/values.yaml")) == [
+            "apps/api/values.yaml",
+            "apps/web/values.yaml",
+        ]
+
+    def test_recursive_prunes_default_excludes(self, tree):
+        assert list(walk_files("**/values.yaml")) == [
+            "apps/api/values.yaml",
+            "apps/web/values.yaml",
+            "charts/api/values.yaml",
+        ]
+
+    def test_recursive_all_files(self, tree):
+        assert list(walk_files("apps/**")) == [
+            "apps/api/dev.values.yaml",
+            "apps/api/values.yaml",
+            "apps/web/values.yaml",
+        ]
+
+    def test_custom_excludes(self, tree):
+        files = list(walk_files("**/values.yaml", exclude_dirs=["apps"]))
+        assert "charts/api/charts/redis/values.yaml" in files
+        assert "node_modules/pkg/values.yaml" in files
+        assert not any(f.startswith("apps/") for f in files)
+
+    def test_literal_directory_not_pruned(self, tree):
+        assert list(walk_files("node_modules/*/values.yaml")) == [
+            "node_modules/pkg/values.yaml"
+        ]
+
+    def test_literal_components_not_pruned(self, tree):
+        assert list(walk_files("charts/*/charts/*/values.yaml")) == [
+            "charts/api/charts/redis/values.yaml"
+        ]
+        assert list(walk_files("*/node_modules/values.yaml")) == [
+            "apps/node_modules/values.yaml"
+        ]
+
+    def test_dot_prefix_kept(self, tree):
+        assert list(walk_files("./apps/*/values.yaml")) == [
+            "./apps/api/values.yaml",
+            "./apps/web/values.yaml",
+        ]
+        assert list(walk_files(["./*.yaml", "apps/web/*.yaml"])) == [
+            "apps/web/values.yaml",
+            "./top.values.yaml",
+        ]
+
+    def test_hidden_directory_needs_explicit_dot(self, tree):
+        assert list(walk_files(".*/values.yaml")) == [".github/values.yaml"]
+
+    def test_directories_not_yielded(self, tree):
+        assert list(walk_files("*.yaml")) == ["top.values.yaml"]
+        assert list(walk_files("dir.yaml")) == []
+
+    def test_absolute_pattern(self, tree):
+        assert list(walk_files(str(tree / "apps" / "web" / "*.yaml"))) == [
+            os.path.join(str(tree), "apps", "web", "values.yaml")
+        ]
+
+    def test_missing_base(self, tree):
+        assert list(walk_files("missing/**/*.yaml")) == []
+
+    def test_multiple_includes_with_exclude(self, tree):
+        files = walk_files(
+            ["apps/**/values.yaml", "*.yaml", "apps/api/*.yaml"],
+            exclude=["apps/web/*"],
+        )
+        assert list(files) == [
+            "apps/api/dev.values.yaml",
+            "apps/api/values.yaml",
+            "top.values.yaml",
+        ]
+
+    def test_lazy(self, tree):
+        files = walk_files("**/*.yaml")
+        assert next(files) == "apps/api/dev.values.yaml"
+
+
+# ---------------------------------------------------------------------------
+# git_files
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def repo(tree):
+    (tree / ".gitignore").write_text("build/\n")
+    (tree / "build").mkdir()
+    (tree / "build" / "values.yaml").write_text("tag: v1\n")
+    subprocess.run(["git", "init", "-q"], check=True)
+    subprocess.run(["git", "add", "-A", "-f", "--", ".", ":!.git"], check=True)
+    subprocess.run(["git", "rm", "-q", "--cached", "build/values.yaml"], check=True)
+    (tree / "untracked.yaml").write_text("tag: v1\n")
+    return tree
+
+
+class TestGitFiles:
+    def _files(self, include, exclude=None, exclude_dirs=None):
+        pruner = DirectoryPruner(
+            ["node_modules", "charts/*/charts"]
+            if exclude_dirs is None
+            else exclude_dirs
+        )
+        return list(git_files(PathMatcher(include, exclude), pruner))
+
+    def test_tracked_files_only(self, repo):
+        assert self._files(["**/values.yaml", "*.yaml"]) == [
+            "apps/api/values.yaml",
+            "apps/web/values.yaml",
+            "charts/api/values.yaml",
+            "top.values.yaml",
+        ]
+
+    def test_exclude_and_literal_base(self, repo):
+        assert self._files(["apps/**"], ["**/dev.*"]) == [
+            "apps/api/values.yaml",
+            "apps/web/values.yaml",
+        ]
+        assert self._files(["node_modules/*/values.yaml"]) == [
+            "node_modules/pkg/values.yaml"
+        ]
+
+    def test_literal_components_not_pruned(self, repo):
+        assert self._files(["charts/*/charts/*/values.yaml"]) == [
+            "charts/api/charts/redis/values.yaml"
+        ]
+        assert self._files(["*/node_modules/values.yaml"]) == [
+            "apps/node_modules/values.yaml"
+        ]
+        assert self._files(["./apps/web/*.yaml"]) == ["./apps/web/values.yaml"]
+
+    def test_deleted_file_skipped(self, repo):
+        os.remove(repo / "apps" / "web" / "values.yaml")
+        assert self._files(["apps/*/values.yaml"]) == ["apps/api/values.yaml"]
+
+    def test_subdirectory_and_absolute(self, repo, monkeypatch):
+        monkeypatch.chdir(repo / "apps")
+        assert self._files(["*/values.yaml"]) == [
+            "api/values.yaml",
+            "web/values.yaml",
+        ]
+        assert self._files([str(repo / "apps" / "web" / "*.yaml")]) == [
+            str(repo / "apps" / "web" / "values.yaml")
+        ]
+
+    def test_not_a_repository(self, tree):
+        with pytest.raises(OSError, match="git ls-files failed"):
+            self._files(["*.yaml"])
+
+
+class TestGitBlobIds:
+    def test_unmodified_tracked_files(self, repo):
+        blob_ids = git_blob_ids()
+        expected = subprocess.run(
+            ["git", "hash-object", "top.values.yaml"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        assert blob_ids["top.values.yaml"] == expected
+        assert "untracked.yaml" not in blob_ids
+        assert "build/values.yaml" not in blob_ids
+
+    def test_modified_file_left_out(self, repo):
+        (repo / "top.values.yaml").write_text("tag: v2\n")
+        assert "top.values.yaml" not in git_blob_ids()
+        assert "apps/api/values.yaml" in git_blob_ids()
+
+    def test_not_a_repository(self, tree):
+        with pytest.raises(OSError, match="git ls-files failed"):
+            git_blob_ids()
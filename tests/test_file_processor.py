@@ -1,6 +1,9 @@
 """Tests for src/file_processor.py"""
 
+import json
 import os
+import subprocess
+
 import pytest
 from unittest.mock import patch
 
@@ -179,6 +182,56 @@ class TestPerformUpdate:
             with pytest.raises(ActionError):
                 proc._perform_update(fp, "v2.0.0")
 
+    def test_write_is_atomic(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "v.yaml", YAML_CONTENT)
+        proc = FileProcessor(Config(**base_kwargs), logger)
+        with (
+            patch("os.replace", side_effect=OSError("killed")),
+            pytest.raises(ActionError),
+        ):
+            proc._perform_update(fp, "v2.0.0")
+        # Original content untouched and no temp file left behind
+        with open(fp) as f:
+            assert f.read() == YAML_CONTENT
+        assert os.listdir(tmp_path) == ["v.yaml"]
+
+    def test_preserves_mode_and_symlink(self, base_kwargs, logger, tmp_path):
+        real = _write(str(tmp_path), "real.yaml", YAML_CONTENT)
+        os.chmod(real, 0o640)
+        link = str(tmp_path / "link.yaml")
+        os.symlink(real, link)
+        proc = FileProcessor(Config(**base_kwargs), logger)
+        assert proc._perform_update(link, "v2.0.0") is True
+        assert os.path.islink(link)
+        assert os.stat(real).st_mode & 0o777 == 0o640
+        with open(real) as f:
+            assert "v2.0.0" in f.read()
+
+    def test_preserves_owner(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "v.yaml", YAML_CONTENT)
+        st = os.stat(fp)
+        proc = FileProcessor(Config(**base_kwargs), logger)
+        with patch("os.chown") as mock_chown:
+            assert proc._perform_update(fp, "v2.0.0") is True
+        (tmp_file, uid, gid), _ = mock_chown.call_args
+        assert os.path.dirname(tmp_file) == str(tmp_path)
+        assert (uid, gid) == (st.st_uid, st.st_gid)
+
+    def test_owner_change_not_permitted(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "v.yaml", YAML_CONTENT)
+        proc = FileProcessor(Config(**base_kwargs), logger)
+        with patch("os.chown", side_effect=PermissionError("not owner")):
+            assert proc._perform_update(fp, "v2.0.0") is True
+        with open(fp) as f:
+            assert "v2.0.0" in f.read()
+
+    def test_skips_identical_write(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "v.yaml", 'tag: "v2.0.0"\n')
+        proc = FileProcessor(Config(**base_kwargs), logger)
+        with patch("builtins.open", wraps=open) as mock_open:
+            assert proc._perform_update(fp, "v2.0.0") is False
+        assert mock_open.call_count == 1  # read only, no write
+
 
 # ---------------------------------------------------------------------------
 # update_file
@@ -251,6 +304,18 @@ class TestGetFilesToProcess:
         files = proc.get_files_to_process()
         assert len(files) == 2
 
+    def test_recursive_pattern_prunes_excludes(self, base_kwargs, logger, tmp_path):
+        for sub in ("a", "a/charts/x/charts/y", "node_modules/m"):
+            os.makedirs(tmp_path / sub)
+            _write(str(tmp_path / sub), "values.yaml", YAML_CONTENT)
+        kw = {
+            **base_kwargs,
+            "target_values_file": None,
+            "file_pattern": str(tmp_path / "**" / "values.yaml"),
+        }
+        proc = FileProcessor(Config(**kw), logger)
+        assert proc.get_files_to_process() == [str(tmp_path / "a" / "values.yaml")]
+
     def test_no_match(self, base_kwargs, logger, tmp_path):
         kw = {
             **base_kwargs,
@@ -261,6 +326,35 @@ class TestGetFilesToProcess:
         with pytest.raises(ActionError):
             proc.get_files_to_process()
 
+    def test_multiple_patterns_with_exclude(self, base_kwargs, logger, tmp_path):
+        for name in ("dev.values.yaml", "prod.values.yaml", "extra.yaml"):
+            _write(str(tmp_path), name, YAML_CONTENT)
+        kw = {
+            **base_kwargs,
+            "target_values_file": None,
+            "file_pattern": f"{tmp_path}/*.values.yaml\n{tmp_path}/extra.yaml",
+            "exclude_pattern": f"{tmp_path}/prod.*",
+        }
+        proc = FileProcessor(Config(**kw), logger)
+        assert proc.get_files_to_process() == [
+            str(tmp_path / "dev.values.yaml"),
+            str(tmp_path / "extra.yaml"),
+        ]
+
+    def test_git_discovery_outside_repository(
+        self, base_kwargs, logger, tmp_path, monkeypatch
+    ):
+        kw = {
+            **base_kwargs,
+            "target_values_file": None,
+            "file_pattern": str(tmp_path / "*.yaml"),
+            "discovery": "git",
+        }
+        proc = FileProcessor(Config(**kw), logger)
+        monkeypatch.chdir(tmp_path)
+        with pytest.raises(ActionError, match="Failed to list files from git"):
+            proc.get_files_to_process()
+
     def test_file_not_found(self, base_kwargs, logger):
         kw = {**base_kwargs, "target_values_file": "/nonexistent/file.yaml"}
         proc = FileProcessor(Config(**kw), logger)
@@ -285,3 +379,755 @@ class TestProcessFiles:
         kw = {**base_kwargs, "new_tag": "v1.0.0", "target_values_file": fp}
         proc = FileProcessor(Config(**kw), logger)
         assert proc.process_files() is False
+
+    def test_reads_each_file_once(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "values.yaml", YAML_CONTENT)
+        kw = {**base_kwargs, "target_values_file": fp}
+        proc = FileProcessor(Config(**kw), logger)
+        with patch("builtins.open", wraps=open) as mock_open:
+            assert proc.process_files() is True
+        modes = [c.args[1] for c in mock_open.call_args_list]
+        assert modes == ["rb", "wb"]
+        assert proc.old_tags == {fp: "v1.0.0"}
+
+    def test_batched_directory_fsync(self, base_kwargs, logger, tmp_path):
+        for i in range(5):
+            _write(str(tmp_path), f"env{i}.values.yaml", YAML_CONTENT)
+        kw = {
+            **base_kwargs,
+            "target_values_file": None,
+            "file_pattern": str(tmp_path / "*.values.yaml"),
+        }
+        proc = FileProcessor(Config(**kw), logger)
+        with patch("os.fsync") as mock_fsync:
+            assert proc.process_files() is True
+        assert len(proc.updated_files) == 5
+        assert mock_fsync.call_count == 1
+
+    def test_missing_tag_fails(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "values.yaml", "nothing: here\n")
+        kw = {**base_kwargs, "target_values_file": fp}
+        proc = FileProcessor(Config(**kw), logger)
+        with pytest.raises(ActionError, match="not found"):
+            proc.process_files()
+
+    def test_skip_missing(self, base_kwargs, logger, tmp_path):
+        _write(str(tmp_path), "a.values.yaml", "nothing: here\n")
+        fp = _write(str(tmp_path), "b.values.yaml", YAML_CONTENT)
+        kw = {
+            **base_kwargs,
+            "target_values_file": None,
+            "file_pattern": str(tmp_path / "*.values.yaml"),
+            "skip_missing": True,
+        }
+        proc = FileProcessor(Config(**kw), logger)
+        assert proc.process_files() is True
+        assert proc.updated_files == [fp]
+
+
+class TestProcessFilesParallel:
+    def _pattern_kwargs(self, base_kwargs, tmp_path, **overrides):
+        return {
+            **base_kwargs,
+            "target_values_file": None,
+            "file_pattern": str(tmp_path / "*.values.yaml"),
+            "max_workers": 4,
+            **overrides,
+        }
+
+    def test_deterministic_order(self, base_kwargs, logger, tmp_path):
+        expected = {}
+        for i in range(20):
+            fp = _write(str(tmp_path), f"env{i:02d}.values.yaml", f'tag: "v1.{i}"\n')
+            expected[fp] = f"v1.{i}"
+        proc = FileProcessor(
+            Config(**self._pattern_kwargs(base_kwargs, tmp_path)), logger
+        )
+        files = proc.get_files_to_process()
+        assert proc.process_files() is True
+        assert proc.updated_files == files
+        assert list(proc.old_tags) == files
+        assert proc.old_tags == expected
+        for fp in files:
+            with open(fp) as f:
+                assert f.read() == 'tag: "v2.0.0"\n'
+
+    def test_fail_fast(self, base_kwargs, logger, tmp_path):
+        for i in range(10):
+            _write(str(tmp_path), f"env{i:02d}.values.yaml", YAML_CONTENT)
+        _write(str(tmp_path), "bad.values.yaml", "nothing: here\n")
+        proc = FileProcessor(
+            Config(**self._pattern_kwargs(base_kwargs, tmp_path)), logger
+        )
+        with pytest.raises(ActionError, match="not found"):
+            proc.process_files()
+        assert proc.updated_files == []
+
+    def test_single_file_runs_inline(self, base_kwargs, logger, tmp_path):
+        _write(str(tmp_path), "only.values.yaml", YAML_CONTENT)
+        proc = FileProcessor(
+            Config(**self._pattern_kwargs(base_kwargs, tmp_path)), logger
+        )
+        with patch.object(proc, "_process_parallel") as mock_parallel:
+            assert proc.process_files() is True
+        mock_parallel.assert_not_called()
+
+
+class TestIdenticalFiles:
+    def _proc(self, base_kwargs, logger, tmp_path, **overrides):
+        kw = {
+            **base_kwargs,
+            "target_values_file": None,
+            "file_pattern": str(tmp_path / "*.values.yaml"),
+            **overrides,
+        }
+        return FileProcessor(Config(**kw), logger)
+
+    def test_scans_identical_content_once(self, base_kwargs, logger, tmp_path):
+        paths = [
+            _write(str(tmp_path), f"dev{i}.values.yaml", YAML_CONTENT) for i in range(4)
+        ]
+        other = _write(str(tmp_path), "prod.values.yaml", 'tag: "v0.9.0"\n')
+        proc = self._proc(base_kwargs, logger, tmp_path)
+        with patch.object(proc.scanner, "scan", wraps=proc.scanner.scan) as mock_scan:
+            assert proc.process_files() is True
+        assert mock_scan.call_count == 2
+        assert proc.memo_hits == 3
+        assert proc.old_tags == {**{p: "v1.0.0" for p in paths}, other: "v0.9.0"}
+        for path in paths:
+            with open(path) as f:
+                assert f.read() == YAML_CONTENT.replace("v1.0.0", "v2.0.0")
+
+    def test_unchanged_content_reused(self, base_kwargs, logger, tmp_path):
+        for i in range(3):
+            _write(str(tmp_path), f"dev{i}.values.yaml", YAML_CONTENT)
+        proc = self._proc(base_kwargs, logger, tmp_path, new_tag="v1.0.0")
+        assert proc.process_files() is False
+        assert proc.memo_hits == 2
+
+    def test_keyed_on_final_tags(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "dev.values.yaml", YAML_CONTENT)
+        proc = self._proc(base_kwargs, logger, tmp_path)
+        assert proc.scan_file(fp).changed is True
+        assert proc.scan_file(fp, {"tag": "v1.0.0"}).changed is False
+        assert proc.memo_hits == 0
+        assert (
+            proc.scan_file(fp).new_content
+            == YAML_CONTENT.replace("v1.0.0", "v2.0.0").encode()
+        )
+        assert proc.memo_hits == 1
+
+    def test_memo_size_bounded(self, base_kwargs, logger, tmp_path):
+        for i in range(3):
+            _write(str(tmp_path), f"dev{i}.values.yaml", YAML_CONTENT)
+        proc = self._proc(base_kwargs, logger, tmp_path)
+        with patch("src.file_processor.MEMO_MAX_BYTES", 0):
+            assert proc.process_files() is True
+        assert proc.memo_hits == 0
+        assert len(proc.updated_files) == 3
+
+
+class TestLargeFileMode:
+    PADDING = "# " + "x" * 200 + "\n"
+
+    def _proc(self, base_kwargs, logger, **overrides):
+        kw = {**base_kwargs, "large_file_threshold": 1024, **overrides}
+        return FileProcessor(Config(**kw), logger)
+
+    def _big(self, tmp_path, tag_line):
+        content = self.PADDING * 20 + tag_line + self.PADDING * 20 + tag_line
+        return _write(str(tmp_path), "big.yaml", content), content
+
+    def test_small_file_not_mapped(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "v.yaml", YAML_CONTENT)
+        assert self._proc(base_kwargs, logger).scan_file(fp).mapped is False
+
+    def test_same_length_patched_in_place(self, base_kwargs, logger, tmp_path):
+        fp, content = self._big(tmp_path, '  tag: "v1.0.0"\n')
+        inode = os.stat(fp).st_ino
+        proc = self._proc(base_kwargs, logger)
+        scan = proc.scan_file(fp)
+        assert scan.mapped is True
+        assert scan.current_tag == "v1.0.0"
+        assert proc.update_file(fp, scan) is True
+        with open(fp) as f:
+            assert f.read() == content.replace("v1.0.0", "v2.0.0")
+        assert os.stat(fp).st_ino == inode
+
+    def test_different_length_replaces_file(self, base_kwargs, logger, tmp_path):
+        fp, content = self._big(tmp_path, "  tag: v1 # pinned\n")
+        proc = self._proc(base_kwargs, logger, new_tag="v2.0.0-rc.1")
+        assert proc.update_file(fp) is True
+        with open(fp) as f:
+            assert f.read() == content.replace(" v1 # pinned", ' "v2.0.0-rc.1"')
+
+    def test_already_current_skips_write(self, base_kwargs, logger, tmp_path):
+        fp, _ = self._big(tmp_path, '  tag: "v2.0.0"\n')
+        proc = self._proc(base_kwargs, logger)
+        scan = proc.scan_file(fp)
+        assert scan.changed is False
+        assert proc._perform_update(fp, "v2.0.0", scan) is False
+
+
+class TestMultiKey:
+    CONTENT = (
+        'image:\n  tag: "v1.0.0"\n'
+        'sidecar:\n  sidecarTag: "v0.9.0"\n'
+        'migrations:\n  migrationsTag: "latest"\n'
+    )
+
+    def _proc(self, base_kwargs, logger, fp, **overrides):
+        kw = {
+            **base_kwargs,
+            "target_values_file": fp,
+            "tag_string": "tag,sidecarTag=v1.1.0,migrationsTag",
+            **overrides,
+        }
+        return FileProcessor(Config(**kw), logger)
+
+    def test_get_current_tags(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "values.yaml", self.CONTENT)
+        proc = self._proc(base_kwargs, logger, fp)
+        assert proc.get_current_tags(fp) == {
+            "tag": "v1.0.0",
+            "sidecarTag": "v0.9.0",
+            "migrationsTag": "latest",
+        }
+        assert proc.get_current_tag(fp, "sidecarTag") == "v0.9.0"
+
+    def test_updates_all_keys_in_one_write(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "values.yaml", self.CONTENT)
+        proc = self._proc(base_kwargs, logger, fp)
+        with patch("builtins.open", wraps=open) as mock_open:
+            assert proc.process_files() is True
+        assert len(mock_open.call_args_list) == 2  # one read, one write
+        with open(fp) as f:
+            content = f.read()
+        assert 'tag: "v2.0.0"' in content
+        assert 'sidecarTag: "v1.1.0"' in content
+        assert 'migrationsTag: "v2.0.0"' in content
+        assert proc.old_tags == {fp: "v1.0.0"}
+        assert proc.old_tags_by_key[fp] == {
+            "tag": "v1.0.0",
+            "sidecarTag": "v0.9.0",
+            "migrationsTag": "latest",
+        }
+
+    def test_conditions_apply_per_key(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "values.yaml", self.CONTENT)
+        proc = self._proc(base_kwargs, logger, fp, skip_if_contains="latest")
+        assert proc.process_files() is True
+        with open(fp) as f:
+            assert 'migrationsTag: "latest"' in f.read()
+        assert list(proc.old_tags_by_key[fp]) == ["tag", "sidecarTag"]
+
+    def test_missing_key_is_not_fatal(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "values.yaml", 'tag: "v1.0.0"\n')
+        proc = self._proc(base_kwargs, logger, fp)
+        assert proc.process_files() is True
+        assert proc.old_tags_by_key[fp] == {"tag": "v1.0.0"}
+
+    @pytest.mark.parametrize(
+        "content", ['tag: "v1.0.0"\n', "image:\n  repository: app\n"]
+    )
+    def test_dry_run_predicts_missing_keys(
+        self, base_kwargs, logger, tmp_path, content
+    ):
+        fp = _write(str(tmp_path), "values.yaml", content)
+        dry = self._proc(base_kwargs, logger, fp, dry_run=True)
+        dry_changed = dry.update_file(fp)
+        real = self._proc(base_kwargs, logger, fp)
+        assert real.update_file(fp) is dry_changed
+        assert dry.old_tags_by_key == real.old_tags_by_key
+        assert "sidecarTag" not in dry.old_tags_by_key.get(fp, {})
+
+    def test_mapped_file_patches_selected_keys(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "values.yaml", self.CONTENT)
+        proc = self._proc(
+            base_kwargs,
+            logger,
+            fp,
+            skip_if_contains="latest",
+            large_file_threshold=1,
+        )
+        assert proc.process_files() is True
+        with open(fp) as f:
+            assert f.read() == (
+                self.CONTENT.replace('"v1.0.0"', '"v2.0.0"').replace(
+                    '"v0.9.0"', '"v1.1.0"'
+                )
+            )
+
+
+class TestTagPaths:
+    CONTENT = (
+        "api:\n  image:\n    tag: v1.0.0  # api\n"
+        "workers:\n  - image:\n      tag: v1.0.0\n  - image:\n      tag: v1.0.0\n"
+        "image:\n  tag: v1.0.0\n"
+    )
+
+    def test_updates_only_addressed_paths(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "values.yaml", self.CONTENT)
+        kw = {
+            **base_kwargs,
+            "target_values_file": fp,
+            "tag_string": "api.image.tag,workers[*].image.tag=v3.0.0",
+        }
+        proc = FileProcessor(Config(**kw), logger)
+        assert proc.process_files() is True
+        with open(fp) as f:
+            assert f.read() == (
+                'api:\n  image:\n    tag: "v2.0.0"  # api\n'
+                'workers:\n  - image:\n      tag: "v3.0.0"\n'
+                '  - image:\n      tag: "v3.0.0"\n'
+                "image:\n  tag: v1.0.0\n"
+            )
+        assert proc.old_tags_by_key[fp] == {
+            "api.image.tag": "v1.0.0",
+            "workers[*].image.tag": "v1.0.0",
+        }
+
+
+class TestDocuments:
+    STREAM = (
+        "kind: Deployment\nmetadata:\n  name: api\nimage:\n  tag: v1.0.0\n"
+        "---\n"
+        "kind: Deployment\nmetadata:\n  name: worker\nimage:\n  tag: v0.1.0\n"
+    )
+
+    def test_only_selected_documents_updated(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "rendered.yaml", self.STREAM)
+        kw = {**base_kwargs, "target_values_file": fp, "documents": "*/worker"}
+        proc = FileProcessor(Config(**kw), logger)
+        with patch("builtins.open", wraps=open) as mock_open:
+            assert proc.process_files() is True
+        assert len(mock_open.call_args_list) == 2  # one read, one write
+        with open(fp) as f:
+            assert f.read() == self.STREAM.replace("v0.1.0", '"v2.0.0"')
+        assert proc.old_tags == {fp: "v0.1.0"}
+
+
+class TestImageReferences:
+    COMPOSE = (
+        "services:\n"
+        "  api:\n    image: ghcr.io/acme/api:1.0.0\n"
+        "  web:\n    image: ghcr.io/acme/web:1.0.0\n"
+        "  worker:\n    image: ghcr.io/acme/api:0.9.0 # pinned\n"
+    )
+
+    def test_updates_every_reference(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "compose.yaml", self.COMPOSE)
+        kw = {**base_kwargs, "target_values_file": fp, "image_name": "acme/api"}
+        proc = FileProcessor(Config(**kw), logger)
+        assert proc.process_files() is True
+        with open(fp) as f:
+            assert f.read() == self.COMPOSE.replace("api:1.0.0", "api:v2.0.0").replace(
+                "api:0.9.0", "api:v2.0.0"
+            )
+        assert proc.old_tags_by_key[fp] == {"acme/api": "1.0.0"}
+
+    def test_mapped_patch(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "compose.yaml", self.COMPOSE)
+        kw = {
+            **base_kwargs,
+            "target_values_file": fp,
+            "image_name": "acme/web",
+            "large_file_threshold": 1,
+        }
+        assert FileProcessor(Config(**kw), logger).process_files() is True
+        with open(fp) as f:
+            assert f.read() == self.COMPOSE.replace("web:1.0.0", "web:v2.0.0")
+
+    def test_image_not_found(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "compose.yaml", self.COMPOSE)
+        kw = {**base_kwargs, "target_values_file": fp, "image_name": "acme/db"}
+        with pytest.raises(ActionError):
+            FileProcessor(Config(**kw), logger).process_files()
+
+
+class TestKustomize:
+    KUSTOMIZATION = (
+        "resources:\n  - ../../base\n"
+        "images:\n  - name: ghcr.io/acme/api\n    newTag: 1.0.0\n"
+    )
+
+    def test_overlays_and_manifests_in_one_run(
+        self, base_kwargs, logger, tmp_path, monkeypatch
+    ):
+        monkeypatch.chdir(tmp_path)
+        for overlay in ("dev", "prod"):
+            os.makedirs(f"overlays/{overlay}")
+            _write(f"overlays/{overlay}", "kustomization.yaml", self.KUSTOMIZATION)
+        os.makedirs("base")
+        _write("base", "deployment.yaml", "image: ghcr.io/acme/api:0.1.0\n")
+        kw = {
+            **base_kwargs,
+            "target_values_file": None,
+            "file_pattern": "**/*.yaml",
+            "image_name": "acme/api",
+        }
+        proc = FileProcessor(Config(**kw), logger)
+        assert proc.process_files() is True
+        assert sorted(proc.updated_files) == [
+            "base/deployment.yaml",
+            "overlays/dev/kustomization.yaml",
+            "overlays/prod/kustomization.yaml",
+        ]
+        with open("overlays/prod/kustomization.yaml") as f:
+            assert f.read() == self.KUSTOMIZATION.replace(
+                "newTag: 1.0.0", 'newTag: "v2.0.0"'
+            )
+        with open("base/deployment.yaml") as f:
+            assert f.read() == "image: ghcr.io/acme/api:v2.0.0\n"
+
+
+class TestScanFiles:
+    def _proc(self, base_kwargs, logger, **overrides):
+        kw = {
+            **base_kwargs,
+            "target_values_file": None,
+            "file_pattern": "*.yaml",
+            "mode": "scan",
+            **overrides,
+        }
+        return FileProcessor(Config(**kw), logger)
+
+    def _tree(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        _write(".", "a.yaml", 'image:\n  tag: "v1.0.0"\nsidecar:\n  tag: v1.1.0\n')
+        _write(".", "b.yaml", "image:\n  repository: nginx\n")
+        _write(".", "c.yaml", "tag: v3\n")
+
+    def test_records_every_occurrence(self, base_kwargs, logger, tmp_path, monkeypatch):
+        self._tree(tmp_path, monkeypatch)
+        proc = self._proc(base_kwargs, logger)
+        assert proc.scan_files() == [
+            {"file": "a.yaml", "key": "tag", "value": "v1.0.0", "line": 2},
+            {"file": "a.yaml", "key": "tag", "value": "v1.1.0", "line": 4},
+            {"file": "c.yaml", "key": "tag", "value": "v3", "line": 1},
+        ]
+        assert proc.updated_files == []
+
+    def test_never_writes(self, base_kwargs, logger, tmp_path, monkeypatch):
+        self._tree(tmp_path, monkeypatch)
+        with patch("builtins.open", wraps=open) as mock_open:
+            self._proc(base_kwargs, logger).scan_files()
+        assert all(call.args[1] == "rb" for call in mock_open.call_args_list)
+
+    def test_parallel_keeps_order(self, base_kwargs, logger, tmp_path, monkeypatch):
+        self._tree(tmp_path, monkeypatch)
+        serial = self._proc(base_kwargs, logger).scan_files()
+        assert self._proc(base_kwargs, logger, max_workers=3).scan_files() == serial
+
+    def test_served_from_tag_index(self, base_kwargs, logger, tmp_path, monkeypatch):
+        self._tree(tmp_path, monkeypatch)
+        for name in ("a.yaml", "b.yaml", "c.yaml"):
+            os.utime(name, ns=(1_000_000_000, 1_000_000_000))
+        kw = {"cache_mode": "stat", "cache_dir": str(tmp_path / ".cache")}
+        first = self._proc(base_kwargs, logger, **kw).scan_files()
+        with patch("builtins.open", wraps=open) as mock_open:
+            assert self._proc(base_kwargs, logger, **kw).scan_files() == first
+        opened = [call.args[0] for call in mock_open.call_args_list]
+        assert not any(path.endswith(".yaml") for path in opened)
+
+
+class TestPromotions:
+    def _proc(self, base_kwargs, logger, promotions, **overrides):
+        kw = {
+            **base_kwargs,
+            "new_tag": "",
+            "target_values_file": None,
+            "mode": "promote",
+            "promotions": promotions,
+            **overrides,
+        }
+        return FileProcessor(Config(**kw), logger)
+
+    def _read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_copies_source_tags(self, base_kwargs, logger, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        _write(".", "dev1.yaml", "image:\n  tag: v1.2.0\nsidecarTag: s9\n")
+        _write(".", "dev2.yaml", 'image:\n  tag: "v1.0.0"\nsidecarTag: s1\n')
+        _write(".", "prod.yaml", 'image:\n  tag: "v0.9.0"\n')
+        proc = self._proc(
+            base_kwargs,
+            logger,
+            "dev1.yaml -> dev2.yaml, dev2.yaml -> prod.yaml",
+            tag_string="tag,sidecarTag",
+        )
+        with patch("builtins.open", wraps=open) as mock_open:
+            assert proc.process_files() is True
+        # dev1 and dev2 read once as sources; dev2 and prod read and written
+        assert len(mock_open.call_args_list) == 6
+        assert self._read("dev2.yaml") == 'image:\n  tag: "v1.2.0"\nsidecarTag: "s9"\n'
+        # prod gets dev2's tag from before the run
+        assert self._read("prod.yaml") == 'image:\n  tag: "v1.0.0"\n'
+        assert proc.new_tags_by_key == {
+            "dev2.yaml": {"tag": "v1.2.0", "sidecarTag": "s9"},
+            "prod.yaml": {"tag": "v1.0.0"},
+        }
+
+    def test_conflicting_sources(self, base_kwargs, logger, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        _write(".", "a.yaml", "tag: v1\n")
+        _write(".", "b.yaml", "tag: v2\n")
+        _write(".", "prod.yaml", "tag: v0\n")
+        proc = self._proc(
+            base_kwargs, logger, "a.yaml -> prod.yaml, b.yaml -> prod.yaml"
+        )
+        with pytest.raises(ActionError, match="Conflicting tags"):
+            proc.process_files()
+
+    def test_source_without_tag(self, base_kwargs, logger, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        _write(".", "a.yaml", "image: {}\n")
+        _write(".", "prod.yaml", "tag: v0\n")
+        proc = self._proc(base_kwargs, logger, "a.yaml -> prod.yaml")
+        with pytest.raises(ActionError, match="not found in file: a.yaml"):
+            proc.process_files()
+
+    def test_strips_source_comments(self, base_kwargs, logger, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        _write(".", "a.yaml", "tag: v5 # bumped by CI\nsidecarTag: 's1' # pinned\n")
+        _write(".", "prod.yaml", 'tag: "v0"\nsidecarTag: "s0"\n')
+        proc = self._proc(
+            base_kwargs, logger, "a.yaml -> prod.yaml", tag_string="tag,sidecarTag"
+        )
+        assert proc.process_files() is True
+        assert self._read("prod.yaml") == 'tag: "v5"\nsidecarTag: "s1"\n'
+
+    def test_invalid_source_tag(self, base_kwargs, logger, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        _write(".", "a.yaml", "tag: v5 beta\n")
+        _write(".", "prod.yaml", 'tag: "v0"\n')
+        proc = self._proc(base_kwargs, logger, "a.yaml -> prod.yaml")
+        with pytest.raises(ActionError, match="Invalid tag for 'tag' in a.yaml"):
+            proc.process_files()
+        assert self._read("prod.yaml") == 'tag: "v0"\n'
+
+    def test_missing_destination(self, base_kwargs, logger, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        _write(".", "a.yaml", "tag: v1\n")
+        proc = self._proc(base_kwargs, logger, "a.yaml -> prod.yaml")
+        with pytest.raises(ActionError, match="File not found: prod.yaml"):
+            proc.process_files()
+
+
+# ---------------------------------------------------------------------------
+# manifest
+# ---------------------------------------------------------------------------
+
+
+class TestManifest:
+    def _proc(self, base_kwargs, logger, tmp_path, entries, **overrides):
+        manifest = tmp_path / "updates.json"
+        manifest.write_text(json.dumps(entries))
+        kw = {**base_kwargs, "manifest": str(manifest), **overrides}
+        del kw["target_values_file"]
+        return FileProcessor(Config(**kw), logger)
+
+    def test_applies_per_file_tags(self, base_kwargs, logger, tmp_path):
+        a = _write(str(tmp_path), "a.yaml", 'tag: "v1.0.0"\n')
+        b = _write(str(tmp_path), "b.yaml", 'tag: "v1.0.0"\nsidecarTag: "v0"\n')
+        proc = self._proc(
+            base_kwargs,
+            logger,
+            tmp_path,
+            [
+                {"file": a, "new_tag": "v1.1.0"},
+                {"file": b, "tag_string": "tag,sidecarTag=v0.2"},
+            ],
+        )
+        assert proc.process_files() is True
+        assert proc.updated_files == [a, b]
+        with open(a) as f:
+            assert f.read() == 'tag: "v1.1.0"\n'
+        with open(b) as f:
+            assert f.read() == 'tag: "v2.0.0"\nsidecarTag: "v0.2"\n'
+        assert proc.new_tags_by_key == {
+            a: {"tag": "v1.1.0"},
+            b: {"tag": "v2.0.0", "sidecarTag": "v0.2"},
+        }
+
+    def test_entries_for_same_file_merge(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "a.yaml", 'tag: "v1"\nsidecarTag: "v0"\n')
+        proc = self._proc(
+            base_kwargs,
+            logger,
+            tmp_path,
+            [
+                {"file": fp, "new_tag": "v2"},
+                {"file_pattern": str(tmp_path / "*.yaml"), "tag_string": "sidecarTag"},
+            ],
+        )
+        proc.config.get_updates()  # manifest is loaded once, during validation
+        with patch("builtins.open", wraps=open) as mock_open:
+            assert proc.process_files() is True
+        assert len(mock_open.call_args_list) == 2  # one read, one write
+        assert proc.updated_files == [fp]
+        with open(fp) as f:
+            assert f.read() == 'tag: "v2"\nsidecarTag: "v2.0.0"\n'
+
+    def test_conflicting_tags_fail(self, base_kwargs, logger, tmp_path):
+        fp = _write(str(tmp_path), "a.yaml", 'tag: "v1"\n')
+        proc = self._proc(
+            base_kwargs,
+            logger,
+            tmp_path,
+            [{"file": fp, "new_tag": "v2"}, {"file": fp, "new_tag": "v3"}],
+        )
+        with pytest.raises(ActionError, match="Conflicting tags for 'tag'"):
+            proc.process_files()
+
+    def test_per_entry_conditions(self, base_kwargs, logger, tmp_path):
+        a = _write(str(tmp_path), "a.yaml", 'tag: "prod-1"\n')
+        b = _write(str(tmp_path), "b.yaml", 'tag: "prod-1"\n')
+        proc = self._proc(
+            base_kwargs,
+            logger,
+            tmp_path,
+            [{"file": a, "skip_if_contains": "prod"}, {"file": b}],
+        )
+        assert proc.process_files() is True
+        assert proc.updated_files == [b]
+
+    def test_parallel(self, base_kwargs, logger, tmp_path):
+        files = [_write(str(tmp_path), f"f{i}.yaml", 'tag: "v1"\n') for i in range(6)]
+        entries = [{"file": fp, "new_tag": f"v{i + 2}"} for i, fp in enumerate(files)]
+        proc = self._proc(base_kwargs, logger, tmp_path, entries, max_workers=3)
+        assert proc.process_files() is True
+        assert proc.updated_files == files
+        assert [proc.new_tags_by_key[fp]["tag"] for fp in files] == [
+            f"v{i + 2}" for i in range(6)
+        ]
+
+
+# ---------------------------------------------------------------------------
+# tag index (cache_mode: stat)
+# ---------------------------------------------------------------------------
+
+
+class TestTagIndex:
+    def _proc(self, base_kwargs, logger, fp, tmp_path, **overrides):
+        kw = {
+            **base_kwargs,
+            "target_values_file": fp,
+            "cache_mode": "stat",
+            "cache_dir": str(tmp_path / "cache"),
+            **overrides,
+        }
+        return FileProcessor(Config(**kw), logger)
+
+    def _write_old(self, tmp_path, content):
+        fp = _write(str(tmp_path), "values.yaml", content)
+        os.utime(fp, ns=(1_000_000_000, 1_000_000_000))
+        return fp
+
+    def test_unchanged_file_not_reopened(self, base_kwargs, logger, tmp_path):
+        fp = self._write_old(tmp_path, 'image:\n  tag: "v2.0.0"\n')
+        assert self._proc(base_kwargs, logger, fp, tmp_path).process_files() is False
+
+        proc = self._proc(base_kwargs, logger, fp, tmp_path)
+        with patch("builtins.open", wraps=open) as mock_open:
+            assert proc.process_files() is False
+        opened = [c.args[0] for c in mock_open.call_args_list]
+        assert fp not in opened
+
+    def test_cached_scan_rereads_to_update(self, base_kwargs, logger, tmp_path):
+        fp = self._write_old(tmp_path, 'image:\n  tag: "v1.0.0"\n')
+        dry = self._proc(base_kwargs, logger, fp, tmp_path, dry_run=True)
+        assert dry.process_files() is True
+
+        proc = self._proc(base_kwargs, logger, fp, tmp_path)
+        assert proc.scan_file(fp).cached
+        assert proc.process_files() is True
+        assert proc.old_tags == {fp: "v1.0.0"}
+        with open(fp) as f:
+            assert f.read() == 'image:\n  tag: "v2.0.0"\n'
+        # The rewritten file is rescanned next run
+        assert self._proc(base_kwargs, logger, fp, tmp_path).index.entries == {}
+
+    def test_modified_file_rescanned(self, base_kwargs, logger, tmp_path):
+        fp = self._write_old(tmp_path, 'image:\n  tag: "v2.0.0"\n')
+        self._proc(base_kwargs, logger, fp, tmp_path).process_files()
+        with open(fp, "w") as f:
+            f.write('image:\n  tag: "v1.5.0"\n')
+        os.utime(fp, ns=(2_000_000_000, 2_000_000_000))
+
+        proc = self._proc(base_kwargs, logger, fp, tmp_path)
+        assert proc.get_current_tag(fp) == "v1.5.0"
+
+    def test_default_cache_dir_under_git(
+        self, base_kwargs, logger, tmp_path, monkeypatch
+    ):
+        (tmp_path / ".git").mkdir()
+        monkeypatch.chdir(tmp_path)
+        fp = self._write_old(tmp_path, 'image:\n  tag: "v2.0.0"\n')
+        proc = self._proc(base_kwargs, logger, fp, tmp_path, cache_dir="")
+        proc.process_files()
+        assert os.path.isfile(
+            tmp_path / ".git" / "image-tag-updater" / "tag-index.json"
+        )
+
+    def test_no_git_dir_disables_cache(self, base_kwargs, logger, tmp_path):
+        fp = self._write_old(tmp_path, 'image:\n  tag: "v2.0.0"\n')
+        with patch("src.file_processor.find_git_dir", return_value=None):
+            proc = self._proc(base_kwargs, logger, fp, tmp_path, cache_dir="")
+        assert proc.index is None
+
+
+class TestBlobCache:
+    CONTENT = 'image:\n  tag: "v2.0.0"\n'
+
+    @pytest.fixture
+    def repo(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        _write(str(tmp_path), "values.yaml", self.CONTENT)
+        subprocess.run(["git", "init", "-q"], check=True)
+        subprocess.run(["git", "add", "values.yaml"], check=True)
+        return tmp_path
+
+    def _proc(self, base_kwargs, logger, tmp_path, **overrides):
+        kw = {
+            **base_kwargs,
+            "target_values_file": "values.yaml",
+            "cache_mode": "blob",
+            "cache_dir": str(tmp_path / "cache"),
+            **overrides,
+        }
+        return FileProcessor(Config(**kw), logger)
+
+    def test_known_blob_not_opened(self, base_kwargs, logger, repo):
+        assert self._proc(base_kwargs, logger, repo).process_files() is False
+        assert os.path.isfile(repo / "cache" / "blob-cache.json")
+
+        proc = self._proc(base_kwargs, logger, repo)
+        with patch("builtins.open", wraps=open) as mock_open:
+            assert proc.process_files() is False
+        opened = [c.args[0] for c in mock_open.call_args_list]
+        assert "values.yaml" not in opened
+
+    def test_modified_file_rescanned(self, base_kwargs, logger, repo):
+        self._proc(base_kwargs, logger, repo).process_files()
+        _write(str(repo), "values.yaml", 'image:\n  tag: "v1.0.0"\n')
+
+        proc = self._proc(base_kwargs, logger, repo)
+        assert proc.process_files() is True
+        assert proc.old_tags == {"values.yaml": "v1.0.0"}
+
+    def test_cached_blob_needing_update_is_read(self, base_kwargs, logger, repo):
+        self._proc(base_kwargs, logger, repo).process_files()
+
+        proc = self._proc(base_kwargs, logger, repo, new_tag="v3.0.0")
+        assert proc.process_files() is True
+        with open(repo / "values.yaml") as f:
+            assert f.read() == 'image:\n  tag: "v3.0.0"\n'
+
+    def test_git_failure_disables_blob_lookup(self, base_kwargs, logger, repo):
+        proc = self._proc(base_kwargs, logger, repo)
+        with patch("src.file_processor.git_blob_ids", side_effect=OSError("boom")):
+            assert proc.process_files() is False
+        assert proc.blob_ids == {}
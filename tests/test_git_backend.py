@@ -0,0 +1,207 @@
+"""Tests for src/git_backend.py"""
+
+import threading
+from unittest.mock import call, patch
+
+import pytest
+
+from src.config import Config
+from src.git_backend import InMemoryBackend, InMemoryRemote, SubprocessBackend
+from src.git_operations import GitOperations
+from src.logger import ActionError, Logger
+
+
+@pytest.fixture
+def config():
+    return Config(
+        target_path="charts",
+        new_tag="v2.0.0",
+        tag_string="tag",
+        git_user_name="bot",
+        git_user_email="bot@ci.com",
+        github_token="ghp_xxx",
+        repo="org/repo",
+        branch="main",
+        target_values_file="values.yaml",
+        max_retries=2,
+    )
+
+
+@pytest.fixture
+def logger():
+    return Logger(debug=False)
+
+
+@pytest.fixture
+def remote():
+    return InMemoryRemote({"main": {"values.yaml": b"tag: v1\n"}})
+
+
+# ---------------------------------------------------------------------------
+# SubprocessBackend
+# ---------------------------------------------------------------------------
+
+
+class TestSubprocessBackend:
+    def test_commands(self, config, logger):
+        git_ops = GitOperations(config, logger)
+        assert isinstance(git_ops.backend, SubprocessBackend)
+        with patch.object(git_ops, "run_command") as mock_cmd:
+            git_ops.backend.checkout("main")
+            git_ops.backend.checkout("main", create=True, start_point="origin/main")
+            git_ops.backend.stage()
+            git_ops.backend.stage(["a.yaml"])
+            git_ops.backend.pull("main")
+        assert mock_cmd.call_args_list == [
+            call(["git", "checkout", "main"]),
+            call(["git", "checkout", "-b", "main", "origin/main"]),
+            call(["git", "add", "."]),
+            call(["git", "add", "--", "a.yaml"]),
+            call(["git", "pull", "origin", "main"]),
+        ]
+
+
+# ---------------------------------------------------------------------------
+# InMemoryBackend
+# ---------------------------------------------------------------------------
+
+
+class TestInMemoryBackend:
+    def test_update_flow(self, config, logger, remote):
+        backend = InMemoryBackend(remote)
+        git_ops = GitOperations(config, logger, backend)
+        git_ops.setup_branch()
+        backend.worktree["values.yaml"] = b"tag: v2\n"
+        sha = git_ops.commit_and_push("values.yaml")
+        assert remote.refs["main"] == sha
+        assert remote.commits[sha].tree == {"values.yaml": b"tag: v2\n"}
+        assert remote.commits[sha].message == "Update image tag charts (values.yaml)"
+
+    def test_one_ref_advertisement_per_run(self, config, logger, remote):
+        backend = InMemoryBackend(remote)
+        git_ops = GitOperations(config, logger, backend)
+        with patch.object(remote, "advertise", wraps=remote.advertise) as mock_adv:
+            git_ops.setup_branch()
+            backend.worktree["values.yaml"] = b"tag: v2\n"
+            sha = git_ops.commit_and_push("values.yaml")
+            assert git_ops.check_branch_existence("main") == (True, True)
+        assert mock_adv.call_count == 1
+        assert git_ops.remote_refs() == {"refs/heads/main": sha}
+
+    def test_no_changes(self, config, logger, remote):
+        git_ops = GitOperations(config, logger, InMemoryBackend(remote))
+        git_ops.setup_branch()
+        assert git_ops.commit_and_push("values.yaml") is None
+        assert remote.pushes == 0
+
+    def test_new_branch(self, config, logger, remote):
+        config.branch = "release"
+        backend = InMemoryBackend(remote)
+        git_ops = GitOperations(config, logger, backend)
+        git_ops.setup_branch()
+        assert backend.current_branch() == "release"
+        backend.worktree["values.yaml"] = b"tag: v2\n"
+        git_ops.commit_and_push("values.yaml")
+        assert set(remote.refs) == {"main", "release"}
+
+    def test_tracks_remote_branch(self, config, logger, remote):
+        other = InMemoryBackend(remote)
+        other.checkout("release", create=True)
+        other.worktree["release.yaml"] = b"tag: r1\n"
+        other.stage()
+        other.commit("release")
+        other.push("origin", "release")
+
+        config.branch = "release"
+        backend = InMemoryBackend(remote)
+        GitOperations(config, logger, backend).setup_branch()
+        assert backend.worktree["release.yaml"] == b"tag: r1\n"
+
+    def test_stage_files(self, remote):
+        backend = InMemoryBackend(remote)
+        backend.worktree["values.yaml"] = b"tag: v2\n"
+        backend.worktree["other.yaml"] = b"x\n"
+        backend.stage(["values.yaml"])
+        assert backend.index == {"values.yaml": b"tag: v2\n"}
+        assert backend.has_staged_changes()
+
+
+class TestInMemoryRemote:
+    def _clone_with_change(self, remote, path, content):
+        backend = InMemoryBackend(remote)
+        backend.worktree[path] = content
+        backend.stage()
+        backend.commit(f"update {path}")
+        return backend
+
+    def test_non_fast_forward_rejected(self, remote):
+        first = self._clone_with_change(remote, "a.yaml", b"a\n")
+        second = self._clone_with_change(remote, "b.yaml", b"b\n")
+        first.push("origin", "main")
+        with pytest.raises(ActionError, match="non-fast-forward"):
+            second.push("origin", "main")
+        assert (remote.pushes, remote.rejections) == (2, 1)
+
+        # After a pull (merge), the push fast-forwards
+        second.pull("main")
+        second.push("origin", "main")
+        tree = remote.commits[remote.refs["main"]].tree
+        assert tree == {"values.yaml": b"tag: v1\n", "a.yaml": b"a\n", "b.yaml": b"b\n"}
+        assert len(remote.commits[remote.refs["main"]].parents) == 2
+
+    def test_merge_conflict(self, remote):
+        first = self._clone_with_change(remote, "values.yaml", b"tag: v2\n")
+        second = self._clone_with_change(remote, "values.yaml", b"tag: v3\n")
+        first.push("origin", "main")
+        with pytest.raises(ActionError, match="Merge conflict in values.yaml"):
+            second.pull("main")
+
+    def test_fast_forward_pull(self, remote):
+        first = self._clone_with_change(remote, "a.yaml", b"a\n")
+        first.push("origin", "main")
+        second = InMemoryBackend(remote)
+        second.refs["main"] = first.commits[first.refs["main"]].parents[0]
+        second.pull("main")
+        assert second.refs["main"] == remote.refs["main"]
+        assert second.worktree["a.yaml"] == b"a\n"
+
+    def test_latency(self, remote):
+        remote.latency = 0.25
+        backend = InMemoryBackend(remote)
+        with patch("time.sleep") as mock_sleep:
+            backend.fetch()
+            backend.remote_refs()
+        assert mock_sleep.call_args_list == [call(0.25), call(0.25)]
+
+    def test_push_retry_exhausted_on_rejection(self, config, logger, remote):
+        self._clone_with_change(remote, "a.yaml", b"a\n").push("origin", "main")
+        backend = InMemoryBackend(remote)
+        backend.refs["main"] = remote.commits[remote.refs["main"]].parents[0]
+        git_ops = GitOperations(config, logger, backend)
+        backend.worktree["b.yaml"] = b"b\n"
+        with patch("time.sleep"), pytest.raises(ActionError, match="Failed to push"):
+            git_ops.commit_and_push("b.yaml")
+        assert remote.rejections == 2
+
+    def test_concurrent_pushes(self, remote):
+        """Racing clones converge by pull-and-retry; every change lands."""
+        remote.latency = 0.001
+        workers = 8
+
+        def run(i):
+            backend = self._clone_with_change(remote, f"env{i}.yaml", b"tag\n")
+            while True:
+                try:
+                    backend.push("origin", "main")
+                    return
+                except ActionError:
+                    backend.pull("main")
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        tree = remote.commits[remote.refs["main"]].tree
+        assert {f"env{i}.yaml" for i in range(workers)} <= tree.keys()
+        assert remote.pushes - remote.rejections == workers
@@ -0,0 +1,114 @@
+"""Tests for src/git_batch.py"""
+
+import os
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from src.git_batch import CatFile, HashObject, UpdateIndex
+
+
+def _git(*args, cwd, input=None):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True, input=input
+    ).stdout.rstrip("\n")
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    _git("init", "-q", "-b", "main", cwd=tmp_path)
+    _git("config", "user.name", "bot", cwd=tmp_path)
+    _git("config", "user.email", "bot@ci.com", cwd=tmp_path)
+    (tmp_path / "values.yaml").write_text("tag: v1\n")
+    (tmp_path / "empty.yaml").write_text("")
+    _git("add", ".", cwd=tmp_path)
+    _git("commit", "-q", "-m", "init", cwd=tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestCatFile:
+    def test_reads_objects(self, repo):
+        with CatFile() as objects:
+            oid, kind, content = objects.read("HEAD:values.yaml")
+            assert kind == "blob"
+            assert content == b"tag: v1\n"
+            assert oid == _git("rev-parse", "HEAD:values.yaml", cwd=repo)
+            assert objects.read("HEAD:empty.yaml")[1:] == ("blob", b"")
+            oid, kind, content = objects.read("HEAD")
+            assert kind == "commit"
+            assert content.startswith(b"tree ")
+
+    def test_missing(self, repo):
+        with CatFile() as objects:
+            assert objects.read("HEAD:nothing.yaml") is None
+            assert objects.read("HEAD:values.yaml")[2] == b"tag: v1\n"
+
+    def test_one_process_for_many_reads(self, repo):
+        objects = CatFile()
+        with patch("subprocess.Popen", wraps=subprocess.Popen) as mock_popen:
+            for _ in range(50):
+                objects.read("HEAD:values.yaml")
+        objects.close()
+        assert mock_popen.call_count == 1
+
+    def test_restarts_after_close(self, repo):
+        objects = CatFile()
+        objects.read("HEAD")
+        objects.close()
+        objects.close()
+        assert objects.read("HEAD")[1] == "commit"
+        objects.close()
+
+    def test_invalid_revision(self, repo):
+        with CatFile() as objects, pytest.raises(ValueError):
+            objects.read("HEAD\nHEAD")
+
+
+class TestHashObject:
+    def test_matches_git(self, repo):
+        (repo / "new.yaml").write_text("tag: v2\n")
+        with HashObject() as hasher:
+            oids = [
+                hasher.hash(str(repo / name)) for name in ("values.yaml", "new.yaml")
+            ]
+        assert oids == [
+            _git("hash-object", "values.yaml", cwd=repo),
+            _git("hash-object", "new.yaml", cwd=repo),
+        ]
+        # Written to the object database
+        assert _git("cat-file", "-p", oids[1], cwd=repo) == "tag: v2"
+
+    def test_missing_file(self, repo):
+        hasher = HashObject()
+        with pytest.raises(OSError, match="hash-object failed"):
+            hasher.hash(str(repo / "nothing.yaml"))
+
+    def test_stderr_file_closed_with_process(self, repo):
+        hasher = HashObject()
+        hasher.hash(str(repo / "values.yaml"))
+        fd = hasher._stderr
+        hasher.close()
+        assert hasher._stderr is None
+        with pytest.raises(OSError):
+            os.fstat(fd)
+
+
+class TestUpdateIndex:
+    def test_stages_entries(self, repo):
+        (repo / "values.yaml").write_text("tag: v2\n")
+        oid = _git("hash-object", "-w", "values.yaml", cwd=repo)
+        with UpdateIndex() as index:
+            index.stage("100644", oid, "values.yaml")
+            index.stage("100644", oid, "dir with space/copy.yaml")
+        assert _git("diff", "--cached", "--name-only", cwd=repo).splitlines() == [
+            "dir with space/copy.yaml",
+            "values.yaml",
+        ]
+
+    def test_failure_raises_on_close(self, repo):
+        index = UpdateIndex()
+        with pytest.raises(OSError, match="update-index failed"):
+            index.stage("100644", "not-an-id", "values.yaml")
+            index.close()
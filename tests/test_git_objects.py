@@ -0,0 +1,276 @@
+"""Tests for src/git_objects.py"""
+
+import os
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from src.git_objects import (
+    Repository,
+    UnsupportedRepository,
+    apply_delta,
+    format_tree,
+    object_id,
+    parse_tree,
+)
+
+
+def _git(*args, cwd, input=None):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, input=input
+    ).stdout
+
+
+def _out(*args, cwd):
+    return _git(*args, cwd=cwd).decode().rstrip("\n")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _git("init", "-q", "-b", "main", cwd=tmp_path)
+    _git("config", "user.name", "bot", cwd=tmp_path)
+    _git("config", "user.email", "bot@ci.com", cwd=tmp_path)
+    (tmp_path / "charts" / "api").mkdir(parents=True)
+    (tmp_path / "charts" / "web").mkdir()
+    (tmp_path / "charts" / "api" / "values.yaml").write_text("tag: v1\n")
+    (tmp_path / "charts" / "web" / "values.yaml").write_text("tag: v1\n")
+    (tmp_path / "charts-index.yaml").write_text("index\n")
+    (tmp_path / "README.md").write_text("readme\n")
+    _git("add", ".", cwd=tmp_path)
+    _git("commit", "-q", "-m", "init", cwd=tmp_path)
+    return tmp_path
+
+
+def _history(repo, versions=30):
+    """Commits that deltify well: one large file, changed line by line."""
+    lines = [f"key{i}: value{i}\n" for i in range(200)]
+    for version in range(versions):
+        lines[version] = f"key{version}: changed{version}\n"
+        (repo / "big.yaml").write_text("".join(lines))
+        _git("add", "big.yaml", cwd=repo)
+        _git("commit", "-q", "-m", f"v{version}", cwd=repo)
+
+
+def _all_objects(repo):
+    listing = _out("rev-list", "--objects", "--all", cwd=repo)
+    return [line.split()[0] for line in listing.splitlines()]
+
+
+class TestObjectFormat:
+    def test_object_id_matches_git(self, repo):
+        content = b"tag: v2\n\0binary"
+        empty = _git("hash-object", "--stdin", cwd=repo, input=b"")
+        assert object_id("blob", b"") == empty.decode().strip()
+        expected = _git("hash-object", "--stdin", cwd=repo, input=content)
+        assert object_id("blob", content) == expected.decode().strip()
+
+    def test_tree_roundtrip(self, repo):
+        tree = _out("rev-parse", "HEAD^{tree}", cwd=repo)
+        content = _git("cat-file", "tree", tree, cwd=repo)
+        entries = parse_tree(content)
+        assert entries["charts"][0] == "40000"
+        assert entries["README.md"][0] == "100644"
+        assert format_tree(entries) == content
+        assert object_id("tree", format_tree(entries)) == tree
+
+    def test_directories_sort_with_slash(self):
+        entries = {
+            "charts": ("40000", "a" * 40),
+            "charts-index.yaml": ("100644", "b" * 40),
+            "charts.yaml": ("100644", "c" * 40),
+        }
+        names = [
+            entry.split(b"\0")[0] for entry in format_tree(entries).split(b" ")[1:]
+        ]
+        assert names == [b"charts-index.yaml", b"charts.yaml", b"charts"]
+
+    def test_apply_delta(self):
+        base = b"0123456789"
+        # sizes 10 -> 7, copy 4 bytes from offset 2, insert "abc"
+        delta = bytes([10, 7, 0x80 | 0x01 | 0x10, 2, 4, 3]) + b"abc"
+        assert apply_delta(base, delta) == b"2345abc"
+        with pytest.raises(OSError, match="base size"):
+            apply_delta(b"short", delta)
+
+
+class TestReadObjects:
+    def test_loose(self, repo):
+        store = Repository.discover(str(repo / "charts"))
+        for oid in _all_objects(repo):
+            kind, content = store.read(oid)
+            assert kind == _out("cat-file", "-t", oid, cwd=repo)
+            assert content == _git("cat-file", kind, oid, cwd=repo)
+
+    @pytest.mark.parametrize("offset_deltas", ["true", "false"])
+    def test_packed_with_deltas(self, repo, offset_deltas):
+        _history(repo)
+        _git(
+            "-c",
+            f"repack.useDeltaBaseOffset={offset_deltas}",
+            "repack",
+            "-adfq",
+            "--depth=50",
+            cwd=repo,
+        )
+        assert not any(
+            len(name) == 2
+            for name in os.listdir(repo / ".git" / "objects")
+            if name not in ("info", "pack")
+        )
+        store = Repository.discover(str(repo))
+        objects = _all_objects(repo)
+        assert len(objects) > 60
+        for oid in objects:
+            kind, content = store.read(oid)
+            assert content == _git("cat-file", kind, oid, cwd=repo)
+        store.close()
+
+    def test_alternates(self, repo, tmp_path_factory):
+        clone = tmp_path_factory.mktemp("clone")
+        _git("clone", "-q", "--shared", str(repo), str(clone), cwd=repo)
+        store = Repository.discover(str(clone))
+        head = _out("rev-parse", "HEAD", cwd=repo)
+        assert store.read(head)[0] == "commit"
+
+    def test_missing(self, repo):
+        store = Repository.discover(str(repo))
+        with pytest.raises(OSError, match="Object not found"):
+            store.read("0" * 40)
+
+
+class TestWriteTree:
+    def _git_tree(self, repo, changes):
+        """The tree `git write-tree` produces for the same changes."""
+        env = {**os.environ, "GIT_INDEX_FILE": str(repo / ".git" / "tmp-index")}
+        subprocess.run(["git", "read-tree", "HEAD"], cwd=repo, env=env, check=True)
+        info = "".join(
+            f"{mode} {oid}\t{path}\n" for path, (mode, oid) in changes.items()
+        )
+        subprocess.run(
+            ["git", "update-index", "--index-info"],
+            cwd=repo,
+            env=env,
+            input=info,
+            text=True,
+            check=True,
+        )
+        return subprocess.run(
+            ["git", "write-tree"],
+            cwd=repo,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+
+    def test_matches_git(self, repo):
+        store = Repository.discover(str(repo))
+        blob = store.write("blob", b"tag: v2\n")
+        assert _git("cat-file", "blob", blob, cwd=repo) == b"tag: v2\n"
+        changes = {
+            "charts/api/values.yaml": ("100644", blob),
+            "charts/new/deep/values.yaml": ("100644", blob),
+            "charts.yaml": ("100755", blob),
+        }
+        head_tree = store.commit_tree(_out("rev-parse", "HEAD", cwd=repo))
+        tree = store.write_tree(head_tree, changes)
+        assert tree == self._git_tree(repo, changes)
+        # Untouched subtrees keep their IDs
+        assert _out("rev-parse", f"{tree}:charts/web", cwd=repo) == _out(
+            "rev-parse", "HEAD:charts/web", cwd=repo
+        )
+
+    def test_unchanged(self, repo):
+        store = Repository.discover(str(repo))
+        head_tree = _out("rev-parse", "HEAD^{tree}", cwd=repo)
+        blob = _out("rev-parse", "HEAD:README.md", cwd=repo)
+        assert store.write_tree(head_tree, {"README.md": ("100644", blob)}) == head_tree
+
+    def test_into_packed_tree(self, repo):
+        _git("repack", "-adq", cwd=repo)
+        store = Repository.discover(str(repo))
+        blob = store.write("blob", b"tag: v3\n")
+        changes = {"charts/web/values.yaml": ("100644", blob)}
+        head_tree = _out("rev-parse", "HEAD^{tree}", cwd=repo)
+        assert store.write_tree(head_tree, changes) == self._git_tree(repo, changes)
+
+
+class TestRefs:
+    def test_head_and_packed_refs(self, repo):
+        store = Repository.discover(str(repo))
+        head = _out("rev-parse", "HEAD", cwd=repo)
+        assert store.head() == ("refs/heads/main", head)
+        _git("pack-refs", "--all", cwd=repo)
+        assert not (repo / ".git" / "refs" / "heads" / "main").exists()
+        assert store.head() == ("refs/heads/main", head)
+        assert store.read_ref("refs/heads/other") is None
+
+    def test_unborn_and_detached(self, repo, tmp_path_factory):
+        empty = tmp_path_factory.mktemp("empty")
+        _git("init", "-q", "-b", "main", cwd=empty)
+        assert Repository.discover(str(empty)).head() == ("refs/heads/main", None)
+        head = _out("rev-parse", "HEAD", cwd=repo)
+        _git("checkout", "-q", "--detach", cwd=repo)
+        assert Repository.discover(str(repo)).head() == ("HEAD", head)
+
+    def test_update_ref(self, repo):
+        store = Repository.discover(str(repo))
+        head = _out("rev-parse", "HEAD", cwd=repo)
+        tree = store.commit_tree(head)
+        identity = "bot <bot@ci.com> 1700000000 +0000"
+        commit = store.write_commit(tree, [head], identity, identity, "next")
+        store.update_ref("refs/heads/main", commit, head, identity, "commit: next")
+        assert _out("rev-parse", "main", cwd=repo) == commit
+        assert (
+            _out("log", "-1", "--format=%s %an %at", cwd=repo) == "next bot 1700000000"
+        )
+        assert _out("reflog", "-1", "--format=%gs", cwd=repo) == "commit: next"
+        _git("fsck", "--strict", cwd=repo)
+
+    def test_update_ref_compare_and_swap(self, repo):
+        store = Repository.discover(str(repo))
+        head = _out("rev-parse", "HEAD", cwd=repo)
+        opened = []
+        real_fdopen = os.fdopen
+
+        def fdopen(*args, **kwargs):
+            opened.append(real_fdopen(*args, **kwargs))
+            return opened[-1]
+
+        with (
+            patch("os.fdopen", fdopen),
+            pytest.raises(OSError, match="expected"),
+        ):
+            store.update_ref("refs/heads/main", "1" * 40, "2" * 40, "x", "m")
+        # The lock's descriptor is closed and the lock removed
+        assert [f.closed for f in opened] == [True]
+        assert not (repo / ".git" / "refs" / "heads" / "main.lock").exists()
+        (repo / ".git" / "refs" / "heads" / "main.lock").write_text("")
+        with pytest.raises(OSError, match="Unable to lock"):
+            store.update_ref("refs/heads/main", "1" * 40, head, "x", "m")
+        assert _out("rev-parse", "main", cwd=repo) == head
+
+    def test_sha256_repository_rejected(self, tmp_path):
+        _git("init", "-q", "--object-format=sha256", cwd=tmp_path)
+        with pytest.raises(UnsupportedRepository, match="objectformat = sha256"):
+            Repository.discover(str(tmp_path))
+
+    def test_ref_storage_rejected(self, repo):
+        _git("config", "extensions.refStorage", "reftable", cwd=repo)
+        with pytest.raises(UnsupportedRepository, match="refstorage = reftable"):
+            Repository.discover(str(repo))
+        _git("config", "--unset", "extensions.refStorage", cwd=repo)
+        _git("config", "extensions.objectFormat", "sha1", cwd=repo)
+        assert Repository.discover(str(repo)) is not None
+
+    def test_linked_worktree(self, repo, tmp_path_factory):
+        worktree = tmp_path_factory.mktemp("wt") / "feature"
+        _git("worktree", "add", "-q", "-b", "feature", str(worktree), cwd=repo)
+        store = Repository.discover(str(worktree / "charts"))
+        assert store.work_tree == str(worktree.resolve())
+        assert store.head() == (
+            "refs/heads/feature",
+            _out("rev-parse", "HEAD", cwd=repo),
+        )
+        assert store.prefix(str(worktree / "charts" / "api")) == "charts/api/"
@@ -1,6 +1,7 @@
 """Tests for src/git_operations.py"""
 
 import subprocess
+from pathlib import Path
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -170,6 +171,24 @@ class TestBranchExists:
         with patch.object(git_ops, "run_command", return_value=None):
             assert git_ops.branch_exists_remotely("x") is False
 
+    def test_remote_exact_name(self, git_ops):
+        output = "abc123\trefs/heads/main-old\ndef456\trefs/heads/feature/main"
+        with patch.object(git_ops, "run_command", return_value=output):
+            assert git_ops.branch_exists_remotely("main") is False
+            assert git_ops.branch_exists_remotely("main-old") is True
+            assert git_ops.branch_exists_remotely("feature/main") is True
+
+    def test_remote_snapshot_reused(self, git_ops):
+        with patch.object(
+            git_ops, "run_command", return_value="abc123\trefs/heads/main"
+        ) as mock_cmd:
+            assert git_ops.branch_exists_remotely("main") is True
+            assert git_ops.branch_exists_remotely("other") is False
+            assert git_ops.remote_refs() == {"refs/heads/main": "abc123"}
+        mock_cmd.assert_called_once_with(
+            ["git", "ls-remote", "--heads", "origin"], capture=True
+        )
+
 
 # ---------------------------------------------------------------------------
 # check_branch_existence
@@ -197,46 +216,75 @@ class TestSetupBranch:
         with (
             patch.object(git_ops, "run_command") as mock_cmd,
             patch.object(git_ops, "branch_exists_locally", return_value=True),
-            patch.object(git_ops, "branch_exists_remotely", return_value=True),
         ):
-            mock_cmd.side_effect = [None, "main", None]  # fetch, show-current, pull
+            # fetch, ls-remote, show-current, rev-parse, pull
+            mock_cmd.side_effect = [None, "new\trefs/heads/main", "main", "old", None]
             git_ops.setup_branch()
+        assert mock_cmd.call_args.args[0] == ["git", "pull", "origin", "main"]
+
+    def test_local_branch_up_to_date(self, git_ops):
+        with (
+            patch.object(git_ops, "run_command") as mock_cmd,
+            patch.object(git_ops, "branch_exists_locally", return_value=True),
+        ):
+            # fetch, ls-remote, show-current, rev-parse; no pull
+            mock_cmd.side_effect = [None, "abc\trefs/heads/main", "main", "abc"]
+            git_ops.setup_branch()
+        assert mock_cmd.call_count == 4
 
     def test_local_branch_switch(self, git_ops):
         with (
             patch.object(git_ops, "run_command") as mock_cmd,
             patch.object(git_ops, "branch_exists_locally", return_value=True),
-            patch.object(git_ops, "branch_exists_remotely", return_value=False),
         ):
-            mock_cmd.side_effect = [
-                None,
-                "other-branch",
-                None,
-            ]  # fetch, show-current, checkout
+            # fetch, ls-remote, show-current, checkout
+            mock_cmd.side_effect = [None, "", "other-branch", None]
             git_ops.setup_branch()
+        assert mock_cmd.call_args.args[0] == ["git", "checkout", "main"]
 
     def test_remote_only(self, git_ops):
         with (
             patch.object(git_ops, "run_command") as mock_cmd,
             patch.object(git_ops, "branch_exists_locally", return_value=False),
-            patch.object(git_ops, "branch_exists_remotely", return_value=True),
         ):
+            # fetch, ls-remote, current, checkout -b, rev-parse, pull
             mock_cmd.side_effect = [
                 None,
+                "abc\trefs/heads/main",
                 "other",
                 None,
+                "",
                 None,
-            ]  # fetch, current, checkout -b, pull
+            ]
             git_ops.setup_branch()
+        assert mock_cmd.call_args_list[3].args[0] == [
+            "git",
+            "checkout",
+            "-b",
+            "main",
+            "origin/main",
+        ]
 
     def test_new_branch(self, git_ops):
         with (
             patch.object(git_ops, "run_command") as mock_cmd,
             patch.object(git_ops, "branch_exists_locally", return_value=False),
-            patch.object(git_ops, "branch_exists_remotely", return_value=False),
         ):
-            mock_cmd.side_effect = [None, "other", None]  # fetch, current, checkout -b
+            # fetch, ls-remote, current, checkout -b
+            mock_cmd.side_effect = [None, "abc\trefs/heads/main-old", "other", None]
             git_ops.setup_branch()
+        assert mock_cmd.call_args.args[0] == ["git", "checkout", "-b", "main"]
+
+    def test_one_ref_snapshot(self, git_ops):
+        with (
+            patch.object(git_ops, "run_command") as mock_cmd,
+            patch.object(git_ops, "branch_exists_locally", return_value=False),
+        ):
+            mock_cmd.side_effect = [None, "abc\trefs/heads/main", "other", None, "abc"]
+            git_ops.setup_branch()
+            assert git_ops.check_branch_existence("main") == (False, True)
+        ls_remote = [c for c in mock_cmd.call_args_list if "ls-remote" in c.args[0]]
+        assert len(ls_remote) == 1
 
 
 # ---------------------------------------------------------------------------
@@ -296,6 +344,12 @@ class TestPushWithRetry:
         with patch.object(git_ops, "_push_once"):
             git_ops._push_with_retry()
 
+    def test_success_updates_ref_snapshot(self, git_ops):
+        git_ops._remote_refs = {"refs/heads/main": "old"}
+        with patch.object(git_ops, "_push_once"):
+            git_ops._push_with_retry("new")
+        assert git_ops.remote_refs() == {"refs/heads/main": "new"}
+
     def test_retry_then_success(self, git_ops):
         with patch.object(git_ops, "_push_once") as mock_push, patch("time.sleep"):
             mock_push.side_effect = [ActionError("fail"), None]
@@ -317,3 +371,211 @@ class TestPushWithRetry:
             mock_run.return_value = MagicMock(returncode=1, stderr="rejected")
             with pytest.raises(ActionError, match="rejected"):
                 git_ops._push_once("https://example.com/repo")
+
+
+class TestCommitAndPushPlumbing:
+    def test_commits_given_files(self, config, logger):
+        config.commit_mode = "plumbing"
+        git_ops = GitOperations(config, logger)
+        with (
+            patch.object(git_ops, "commit_files", return_value="abc123") as mock_commit,
+            patch.object(git_ops, "_push_with_retry") as mock_push,
+            patch.object(git_ops, "run_command") as mock_cmd,
+        ):
+            assert git_ops.commit_and_push("values.yaml", files=["values.yaml"]) == (
+                "abc123"
+            )
+        mock_commit.assert_called_once_with(
+            ["values.yaml"], "Update image tag /tmp (values.yaml)"
+        )
+        mock_push.assert_called_once()
+        mock_cmd.assert_not_called()  # no git add / git commit
+
+    def test_unchanged_tree_not_pushed(self, config, logger):
+        config.commit_mode = "plumbing"
+        git_ops = GitOperations(config, logger)
+        with (
+            patch.object(git_ops, "commit_files", return_value=None),
+            patch.object(git_ops, "_push_with_retry") as mock_push,
+        ):
+            assert git_ops.commit_and_push("values.yaml", files=["values.yaml"]) is None
+        mock_push.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# commit_files (real repositories)
+# ---------------------------------------------------------------------------
+
+
+def _git(*args, cwd):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.rstrip("\n")
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """A repository with one commit, entered at its charts/api directory."""
+    _git("init", "-q", "-b", "main", cwd=tmp_path)
+    _git("config", "user.name", "bot", cwd=tmp_path)
+    _git("config", "user.email", "bot@ci.com", cwd=tmp_path)
+    api = tmp_path / "charts" / "api"
+    api.mkdir(parents=True)
+    (api / "dev.values.yaml").write_text("tag: v1\n")
+    (api / "prod.values.yaml").write_text("tag: v1\n")
+    (api / "deploy.sh").write_text("#!/bin/sh\n# tag: v1\n")
+    (api / "deploy.sh").chmod(0o755)
+    (tmp_path / "README.md").write_text("readme\n")
+    _git("add", ".", cwd=tmp_path)
+    _git("commit", "-q", "-m", "init", cwd=tmp_path)
+    monkeypatch.chdir(api)
+    return tmp_path
+
+
+class TestCommitFiles:
+    def test_commits_only_given_files(self, git_ops, repo):
+        head = _git("rev-parse", "HEAD", cwd=repo)
+        Path("dev.values.yaml").write_text("tag: v2\n")
+        Path("prod.values.yaml").write_text("tag: v3\n")  # changed, not given
+        Path("untracked.yaml").write_text("tag: v2\n")
+
+        sha = git_ops.commit_files(["dev.values.yaml"], "Update image tag")
+
+        assert sha == _git("rev-parse", "main", cwd=repo)
+        assert _git("rev-parse", f"{sha}^", cwd=repo) == head
+        assert _git("log", "-1", "--format=%s", cwd=repo) == "Update image tag"
+        assert _git("show", "HEAD:charts/api/dev.values.yaml", cwd=repo) == "tag: v2"
+        assert _git("show", "HEAD:charts/api/prod.values.yaml", cwd=repo) == "tag: v1"
+        assert _git("ls-tree", "-r", "--name-only", "HEAD", cwd=repo).split() == [
+            "README.md",
+            "charts/api/deploy.sh",
+            "charts/api/dev.values.yaml",
+            "charts/api/prod.values.yaml",
+        ]
+        # The real index follows the new commit for the committed file
+        assert _git("status", "--porcelain", cwd=repo).splitlines() == [
+            " M charts/api/prod.values.yaml",
+            "?? charts/api/untracked.yaml",
+        ]
+
+    def test_matches_git_commit_tree(self, git_ops, repo):
+        Path("dev.values.yaml").write_text("tag: v2\n")
+        Path("deploy.sh").write_text("#!/bin/sh\n# tag: v2\n")
+        sha = git_ops.commit_files(["dev.values.yaml", "deploy.sh"], "msg")
+
+        _git("reset", "-q", "--hard", "HEAD^", cwd=repo)
+        Path("dev.values.yaml").write_text("tag: v2\n")
+        Path("deploy.sh").write_text("#!/bin/sh\n# tag: v2\n")
+        _git("commit", "-q", "-am", "msg", cwd=repo)
+        assert _git("rev-parse", f"{sha}^{{tree}}", cwd=repo) == _git(
+            "rev-parse", "HEAD^{tree}", cwd=repo
+        )
+        assert "100755" in _git("ls-tree", sha, "charts/api/deploy.sh", cwd=repo)
+
+    def test_unchanged_files(self, git_ops, repo):
+        head = _git("rev-parse", "HEAD", cwd=repo)
+        assert git_ops.commit_files(["dev.values.yaml"], "msg") is None
+        assert git_ops.commit_files([], "msg") is None
+        assert _git("rev-parse", "HEAD", cwd=repo) == head
+
+    def test_helpers_shared_across_commits(self, git_ops, repo):
+        Path("dev.values.yaml").write_text("tag: v2\n")
+        first = git_ops.commit_files(["dev.values.yaml"], "first")
+        pid = git_ops.hasher._proc.pid
+        Path("dev.values.yaml").write_text("tag: v3\n")
+        second = git_ops.commit_files(["dev.values.yaml"], "second")
+        assert git_ops.hasher._proc.pid == pid
+        assert _git("rev-parse", f"{second}^", cwd=repo) == first
+        git_ops.close()
+        assert git_ops.hasher._proc is None
+
+    def test_file_outside_repository(self, git_ops, repo, tmp_path_factory):
+        outside = tmp_path_factory.mktemp("outside") / "values.yaml"
+        outside.write_text("tag: v2\n")
+        with pytest.raises(ActionError, match="outside the repository"):
+            git_ops.commit_files([str(outside)], "msg")
+
+
+class TestCommitFilesInProcess:
+    @pytest.fixture
+    def py_git_ops(self, config, logger):
+        config.commit_mode = "python"
+        return GitOperations(config, logger)
+
+    def test_same_tree_as_plumbing(self, git_ops, py_git_ops, repo):
+        head = _git("rev-parse", "HEAD", cwd=repo)
+        Path("dev.values.yaml").write_text("tag: v2\n")
+        Path("deploy.sh").write_text("#!/bin/sh\n# tag: v2\n")
+        files = ["dev.values.yaml", "deploy.sh"]
+        with (
+            patch("subprocess.run") as mock_run,
+            patch("subprocess.Popen") as mock_popen,
+        ):
+            mock_popen.side_effect = FileNotFoundError("git")  # index refresh only
+            sha = py_git_ops.commit_files(files, "Update image tag")
+        mock_run.assert_not_called()
+
+        assert _git("rev-parse", "main", cwd=repo) == sha
+        assert _git("rev-parse", f"{sha}^", cwd=repo) == head
+        assert _git("log", "-1", "--format=%s|%an|%ae", cwd=repo) == (
+            "Update image tag|bot|bot@ci.com"
+        )
+        _git("fsck", "--strict", cwd=repo)
+
+        _git("update-ref", "refs/heads/main", head, cwd=repo)
+        plumbing = git_ops.commit_files(files, "Update image tag")
+        assert _git("rev-parse", f"{plumbing}^{{tree}}", cwd=repo) == _git(
+            "rev-parse", f"{sha}^{{tree}}", cwd=repo
+        )
+
+    def test_refreshes_index(self, py_git_ops, repo):
+        Path("dev.values.yaml").write_text("tag: v2\n")
+        py_git_ops.commit_files(["dev.values.yaml"], "msg")
+        assert _git("status", "--porcelain", cwd=repo) == ""
+
+    def test_index_failure_is_a_warning(self, py_git_ops, repo, capsys):
+        Path("dev.values.yaml").write_text("tag: v2\n")
+        with patch("subprocess.Popen", side_effect=FileNotFoundError("git")):
+            assert py_git_ops.commit_files(["dev.values.yaml"], "msg")
+        assert "Could not update the index" in capsys.readouterr().out
+
+    def test_unchanged_files(self, py_git_ops, repo):
+        head = _git("rev-parse", "HEAD", cwd=repo)
+        assert py_git_ops.commit_files(["dev.values.yaml"], "msg") is None
+        assert _git("rev-parse", "HEAD", cwd=repo) == head
+
+    def test_initial_commit(self, py_git_ops, tmp_path, monkeypatch):
+        _git("init", "-q", "-b", "main", cwd=tmp_path)
+        monkeypatch.chdir(tmp_path)
+        Path("values.yaml").write_text("tag: v2\n")
+        sha = py_git_ops.commit_files(["values.yaml"], "msg")
+        assert _git("rev-parse", "HEAD", cwd=tmp_path) == sha
+        assert _git("show", "HEAD:values.yaml", cwd=tmp_path) == "tag: v2"
+
+    def test_sha256_repository_uses_plumbing(
+        self, py_git_ops, tmp_path, monkeypatch, capsys
+    ):
+        _git("init", "-q", "-b", "main", "--object-format=sha256", cwd=tmp_path)
+        _git("config", "user.name", "bot", cwd=tmp_path)
+        _git("config", "user.email", "bot@ci.com", cwd=tmp_path)
+        (tmp_path / "values.yaml").write_text("tag: v1\n")
+        _git("add", ".", cwd=tmp_path)
+        _git("commit", "-q", "-m", "init", cwd=tmp_path)
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "values.yaml").write_text("tag: v2\n")
+
+        sha = py_git_ops.commit_files(["values.yaml"], "msg")
+        assert len(sha) == 64
+        assert _git("rev-parse", "HEAD", cwd=tmp_path) == sha
+        assert _git("show", "HEAD:values.yaml", cwd=tmp_path) == "tag: v2"
+        _git("fsck", "--strict", cwd=tmp_path)
+        assert "committing with git plumbing instead" in capsys.readouterr().out
+
+    def test_not_a_repository(self, py_git_ops, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        Path("values.yaml").write_text("tag: v2\n")
+        with (
+            patch("src.git_operations.Repository.discover", return_value=None),
+            pytest.raises(ActionError, match="Not a git repository"),
+        ):
+            py_git_ops.commit_files(["values.yaml"], "msg")
@@ -0,0 +1,114 @@
+"""Tests for src/image_ref.py"""
+
+import pytest
+
+from src.image_ref import ImageScanner, is_digest, split_image_name
+
+DIGEST = "sha256:" + "a" * 64
+
+MANIFEST = (
+    b"spec:\n"
+    b"  containers:\n"
+    b"    - name: api\n"
+    b"      image: ghcr.io/acme/api:1.4.0  # app\n"
+    b'    - image: "nginx:1.25"\n'
+    b"    - image: docker.io/library/nginx\n"
+    b"      imagePullPolicy: Always\n"
+    b"    - image: quay.io/acme/api:0.9\n"
+    b"    - image: localhost:5000/acme/api@" + DIGEST.encode() + b"\n"
+)
+
+DOCKERFILE = (
+    b"FROM --platform=linux/amd64 golang:1.22 AS build\n"
+    b"RUN go build\n"
+    b"from gcr.io/distroless/static:nonroot\n"
+)
+
+
+def _values(images, content=MANIFEST):
+    return [(m.key, m.value, m.line) for m in ImageScanner(images).find(content)]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+class TestSplitImageName:
+    @pytest.mark.parametrize(
+        "name, expected",
+        [
+            ("nginx", ("", "nginx")),
+            ("library/nginx", ("", "nginx")),
+            ("docker.io/library/nginx", ("", "nginx")),
+            ("acme/api", ("", "acme/api")),
+            ("ghcr.io/acme/api", ("ghcr.io", "acme/api")),
+            ("localhost:5000/api", ("localhost:5000", "api")),
+            ("localhost/api", ("localhost", "api")),
+        ],
+    )
+    def test_split(self, name, expected):
+        assert split_image_name(name) == expected
+
+    def test_is_digest(self):
+        assert is_digest(DIGEST)
+        assert not is_digest("v1.0.0")
+        assert not is_digest("sha256:abc")
+
+
+# ---------------------------------------------------------------------------
+# ImageScanner
+# ---------------------------------------------------------------------------
+
+
+class TestImageScanner:
+    def test_repository_on_any_registry(self):
+        assert _values("acme/api") == [
+            ("acme/api", "1.4.0", 4),
+            ("acme/api", "0.9", 8),
+            ("acme/api", DIGEST, 9),
+        ]
+
+    def test_registry_must_match_when_given(self):
+        assert _values("ghcr.io/acme/api") == [("ghcr.io/acme/api", "1.4.0", 4)]
+
+    def test_docker_hub_aliases(self):
+        assert _values("nginx") == [("nginx", "1.25", 5), ("nginx", "", 6)]
+
+    def test_other_images_ignored(self):
+        assert _values("api") == []
+        assert _values("acme/web") == []
+
+    def test_dockerfile_from(self):
+        assert _values(["golang", "gcr.io/distroless/static"], DOCKERFILE) == [
+            ("golang", "1.22", 1),
+            ("gcr.io/distroless/static", "nonroot", 3),
+        ]
+
+    def test_render_rewrites_only_suffix(self):
+        scanner = ImageScanner(["ghcr.io/acme/api", "nginx"])
+        result = scanner.scan(MANIFEST, "1.5.0")
+        assert result.new_content == (
+            MANIFEST.replace(b"api:1.4.0  # app", b"api:1.5.0  # app")
+            .replace(b'"nginx:1.25"', b'"nginx:1.5.0"')
+            .replace(b"library/nginx\n", b"library/nginx:1.5.0\n")
+        )
+
+    def test_digest_replaces_tag(self):
+        scanner = ImageScanner("ghcr.io/acme/api")
+        result = scanner.scan(MANIFEST, DIGEST)
+        assert b"ghcr.io/acme/api@" + DIGEST.encode() + b"  # app" in result.new_content
+
+    def test_tag_replaces_digest(self):
+        scanner = ImageScanner("localhost:5000/acme/api")
+        result = scanner.scan(MANIFEST, "2.0")
+        assert b"image: localhost:5000/acme/api:2.0\n" in result.new_content
+
+    def test_unchanged_when_current(self):
+        scanner = ImageScanner("ghcr.io/acme/api")
+        assert scanner.scan(MANIFEST, "1.4.0").changed is False
+        assert scanner.scan_mapped(MANIFEST, "1.4.0").changed is False
+        assert scanner.scan_mapped(MANIFEST, "1.5.0").changed is True
+
+    def test_signature_differs_from_tag_keys(self):
+        assert ImageScanner("nginx").signature == ["@image", "nginx"]
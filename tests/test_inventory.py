@@ -0,0 +1,45 @@
+"""Tests for src/inventory.py"""
+
+import json
+
+import pytest
+
+from src.inventory import format_inventory, save_inventory
+from src.logger import ActionError, Logger
+
+RECORDS = [
+    {"file": "a.yaml", "key": "tag", "value": "v1", "line": 2},
+    {"file": "b.yaml", "key": "tag", "value": "v2", "line": 5},
+]
+
+
+class TestFormatInventory:
+    def test_json_array(self):
+        text = format_inventory(RECORDS)
+        assert json.loads(text) == RECORDS
+        assert " " not in text
+
+    def test_ndjson(self):
+        lines = format_inventory(RECORDS, ndjson=True).splitlines()
+        assert [json.loads(line) for line in lines] == RECORDS
+
+    def test_empty(self):
+        assert format_inventory([]) == "[]"
+        assert format_inventory([], ndjson=True) == ""
+
+
+class TestSaveInventory:
+    @pytest.mark.parametrize("name", ["tags.ndjson", "tags.jsonl"])
+    def test_ndjson_by_extension(self, tmp_path, name):
+        path = tmp_path / "nested" / name
+        save_inventory(RECORDS, str(path), Logger())
+        assert path.read_text() == format_inventory(RECORDS, ndjson=True)
+
+    def test_json_otherwise(self, tmp_path):
+        path = tmp_path / "tags.json"
+        save_inventory(RECORDS, str(path), Logger())
+        assert json.loads(path.read_text()) == RECORDS
+
+    def test_write_failure(self, tmp_path):
+        with pytest.raises(ActionError, match="Failed to write inventory"):
+            save_inventory(RECORDS, str(tmp_path), Logger())
@@ -0,0 +1,85 @@
+"""Tests for src/kustomize.py"""
+
+from src.config import TagTarget
+from src.kustomize import KustomizeScanner, is_kustomization
+
+DIGEST = "sha256:" + "b" * 64
+
+KUSTOMIZATION = (
+    b"apiVersion: kustomize.config.k8s.io/v1beta1\n"
+    b"kind: Kustomization\n"
+    b"resources:\n"
+    b"  - ../../base\n"
+    b"images:\n"
+    b"  - name: ghcr.io/acme/api\n"
+    b"    newTag: 1.4.0  # api\n"
+    b"  - newTag: '1.25'\n"
+    b"    name: nginx\n"
+    b"  - name: acme/worker\n"
+    b"    newName: registry.example.com/acme/worker\n"
+    b"    digest: sha256:" + b"a" * 64 + b"\n"
+    b"  - name: acme/db\n"
+    b"labels:\n"
+    b"  - name: newTag\n"
+)
+
+
+def _values(images, content=KUSTOMIZATION, **kwargs):
+    scanner = KustomizeScanner(images, **kwargs)
+    return [(m.key, m.value, m.line) for m in scanner.find(content)]
+
+
+class TestIsKustomization:
+    def test_names(self):
+        assert is_kustomization("overlays/prod/kustomization.yaml")
+        assert is_kustomization("kustomization.yml")
+        assert is_kustomization("base/Kustomization")
+        assert not is_kustomization("overlays/prod/values.yaml")
+
+
+class TestKustomizeScanner:
+    def test_new_tag_by_sibling_name(self):
+        assert _values(["ghcr.io/acme/api", "nginx"]) == [
+            ("ghcr.io/acme/api", "1.4.0", 7),
+            ("nginx", "1.25", 8),
+        ]
+
+    def test_name_matching_follows_image_rules(self):
+        assert _values("acme/api") == [("acme/api", "1.4.0", 7)]
+        assert _values("docker.io/library/nginx") == [
+            ("docker.io/library/nginx", "1.25", 8)
+        ]
+        assert _values("quay.io/acme/api") == []
+
+    def test_digest_field(self):
+        assert _values("acme/worker", digests=frozenset({"acme/worker"})) == [
+            ("acme/worker", "sha256:" + "a" * 64, 12)
+        ]
+
+    def test_entry_without_field_is_not_matched(self):
+        assert _values("acme/db") == []
+        assert _values("acme/worker") == []
+
+    def test_other_lists_ignored(self):
+        assert _values("newTag") == []
+
+    def test_render_keeps_comments(self):
+        scanner = KustomizeScanner(["ghcr.io/acme/api", "nginx"])
+        result = scanner.scan(KUSTOMIZATION, "2.0.0")
+        assert result.new_content == KUSTOMIZATION.replace(
+            b"newTag: 1.4.0  # api", b'newTag: "2.0.0"  # api'
+        ).replace(b"newTag: '1.25'", b'newTag: "2.0.0"')
+
+    def test_for_targets_picks_digest_field(self):
+        scanner = KustomizeScanner.for_targets(
+            [TagTarget("acme/worker", DIGEST), TagTarget("nginx", "1.27")]
+        )
+        assert scanner.digests == frozenset({"acme/worker"})
+        result = scanner.scan(KUSTOMIZATION, scanner.tag_map({}))
+        assert [m.key for m in result.matches] == ["nginx", "acme/worker"]
+        assert scanner.signature == [
+            "@kustomize",
+            "@digest=acme/worker",
+            "acme/worker",
+            "nginx",
+        ]
@@ -524,21 +524,17 @@ def test_empty_file():
         logger = Logger(debug=False)
         processor = FileProcessor(config, logger)
 
-        # Empty file means current_tag is empty string
-        # new_tag is v2.0.0, so they're different, will return True
-        # But it's dry_run so file won't actually change
+        # Empty file has no tag to rewrite, so dry run reports no change,
+        # just as a real run would write nothing
         changed = processor.update_file(file_path)
 
         # Read file to confirm it wasn't changed (dry run)
         with open(file_path, "r") as f:
             final_content = f.read()
 
-        # For empty file with no tag field, it should detect "change" in dry-run
-        # but file should remain empty
-        if changed and final_content == "":
-            print(
-                "   [O] PASS: Empty file handled correctly (dry-run detected potential change)"
-            )
+        # Dry run predicts the real run: no change, file remains empty
+        if not changed and final_content == "":
+            print("   [O] PASS: Empty file handled correctly (no change reported)")
             return True
         else:
             print("   [X] FAIL: Empty file handling issue")
@@ -575,17 +571,16 @@ image:
         logger = Logger(debug=False)
         processor = FileProcessor(config, logger)
 
-        # File without tag field will have empty current_tag
-        # This will be detected as change in dry-run mode
+        # File without tag field has nothing to rewrite, in dry run as well
         changed = processor.update_file(file_path)
 
         # Read file to confirm it wasn't changed (dry run)
         with open(file_path, "r") as f:
             final_content = f.read()
 
-        # Should detect potential change but not modify file in dry-run
-        if changed and "v2.0.0" not in final_content:
-            print("   [O] PASS: File without tag handled correctly (would add tag)")
+        # Should report no change and leave the file untouched
+        if not changed and "v2.0.0" not in final_content:
+            print("   [O] PASS: File without tag handled correctly (no change)")
             return True
         else:
             print("   [X] FAIL: Unexpected behavior")
@@ -250,3 +250,74 @@ class TestMain:
             with pytest.raises(SystemExit) as exc_info:
                 main()
             assert exc_info.value.code == 1
+
+    @patch("main.GitOperations")
+    def test_scan_mode_writes_inventory_without_git(self, mock_git_cls, tmp_path):
+        (tmp_path / "dev.values.yaml").write_text('image:\n  tag: "v1.0.0"\n')
+        (tmp_path / "prod.values.yaml").write_text("image:\n  tag: v0.9.0\n")
+        github_output = str(tmp_path / "github_output")
+
+        env = self._env(
+            str(tmp_path),
+            MODE="scan",
+            NEW_TAG="",
+            GITHUB_TOKEN="",
+            REPO="",
+            TARGET_VALUES_FILE="",
+            FILE_PATTERN="*.values.yaml",
+            GITHUB_OUTPUT=github_output,
+        )
+        with patch.dict(os.environ, env, clear=False):
+            main()
+
+        mock_git_cls.assert_not_called()
+        with open(github_output) as f:
+            content = f.read()
+        assert "inventory_count<<EOF\n2\n" in content
+        assert (
+            '[{"file":"dev.values.yaml","key":"tag","value":"v1.0.0","line":2},'
+            '{"file":"prod.values.yaml","key":"tag","value":"v0.9.0","line":2}]'
+        ) in content
+
+    @patch("main.GitOperations")
+    def test_scan_mode_inventory_file(self, mock_git_cls, tmp_path):
+        (tmp_path / "values.yaml").write_text('image:\n  tag: "v1.0.0"\n')
+        inventory = tmp_path / "out" / "tags.ndjson"
+
+        env = self._env(str(tmp_path), MODE="scan", INVENTORY_FILE=str(inventory))
+        with patch.dict(os.environ, env, clear=False):
+            main()
+
+        mock_git_cls.assert_not_called()
+        assert inventory.read_text() == (
+            '{"file":"values.yaml","key":"tag","value":"v1.0.0","line":2}\n'
+        )
+
+    @patch("main.GitOperations")
+    def test_promote_mode_commits_destinations(self, mock_git_cls, tmp_path):
+        (tmp_path / "dev.yaml").write_text("image:\n  tag: v1.2.0\n")
+        (tmp_path / "prod.yaml").write_text("image:\n  tag: v1.0.0\n")
+        github_output = str(tmp_path / "github_output")
+
+        mock_git = MagicMock()
+        mock_git.commit_and_push.return_value = "abc123def4567890"
+        mock_git_cls.return_value = mock_git
+
+        env = self._env(
+            str(tmp_path),
+            MODE="promote",
+            NEW_TAG="",
+            TARGET_VALUES_FILE="",
+            PROMOTIONS="dev.yaml -> prod.yaml",
+            DRY_RUN="false",
+            GITHUB_OUTPUT=github_output,
+        )
+        with patch.dict(os.environ, env, clear=False):
+            main()
+
+        mock_git.commit_and_push.assert_called_once_with(
+            "prod.yaml", files=["prod.yaml"]
+        )
+        assert (tmp_path / "prod.yaml").read_text() == 'image:\n  tag: "v1.2.0"\n'
+        with open(github_output) as f:
+            assert "new_tag_applied<<EOF\nv1.2.0\n" in f.read()
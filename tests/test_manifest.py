@@ -0,0 +1,103 @@
+"""Tests for src/manifest.py"""
+
+import json
+
+import pytest
+
+from src.manifest import ManifestError, load_manifest, parse_yaml_manifest
+
+# ---------------------------------------------------------------------------
+# parse_yaml_manifest
+# ---------------------------------------------------------------------------
+
+
+class TestParseYamlManifest:
+    def test_updates_key(self):
+        text = (
+            "# batch\n"
+            "updates:\n"
+            "  - file: api.values.yaml\n"
+            '    new_tag: "v1.0.0"\n'
+            "  - file_pattern: 'worker-*.yaml'  \n"
+            "    tag_string: tag, sidecarTag=v2  # two keys\n"
+        )
+        assert parse_yaml_manifest(text) == [
+            {"file": "api.values.yaml", "new_tag": "v1.0.0"},
+            {"file_pattern": "worker-*.yaml", "tag_string": "tag, sidecarTag=v2"},
+        ]
+
+    def test_top_level_list(self):
+        text = "- file: a.yaml\n  new_tag: v1\n-\n  file: b.yaml\n"
+        assert parse_yaml_manifest(text) == [
+            {"file": "a.yaml", "new_tag": "v1"},
+            {"file": "b.yaml"},
+        ]
+
+    def test_nested_structure_rejected(self):
+        with pytest.raises(ValueError, match="Unsupported manifest syntax"):
+            parse_yaml_manifest("updates:\n  - file:\n      - a.yaml\n")
+
+    def test_pair_outside_item_rejected(self):
+        with pytest.raises(ValueError, match="line 1"):
+            parse_yaml_manifest("file: a.yaml\n")
+
+    def test_unterminated_quote(self):
+        with pytest.raises(ValueError, match="Unterminated"):
+            parse_yaml_manifest('- new_tag: "v1\n')
+
+
+# ---------------------------------------------------------------------------
+# load_manifest
+# ---------------------------------------------------------------------------
+
+
+class TestLoadManifest:
+    def test_json_list(self, tmp_path):
+        path = tmp_path / "updates.json"
+        path.write_text(json.dumps([{"file": "a.yaml", "new_tag": "1.10"}]))
+        assert load_manifest(str(path)) == [{"file": "a.yaml", "new_tag": "1.10"}]
+
+    def test_json_updates_key(self, tmp_path):
+        path = tmp_path / "updates.json"
+        path.write_text(json.dumps({"updates": [{"file": "a.yaml"}]}))
+        assert load_manifest(str(path)) == [{"file": "a.yaml"}]
+
+    def test_yaml(self, tmp_path):
+        path = tmp_path / "updates.yml"
+        path.write_text("updates:\n  - file: a.yaml\n")
+        assert load_manifest(str(path)) == [{"file": "a.yaml"}]
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(ValueError, match="Failed to read manifest"):
+            load_manifest(str(tmp_path / "missing.json"))
+
+    def test_invalid_json(self, tmp_path):
+        path = tmp_path / "updates.json"
+        path.write_text("{")
+        with pytest.raises(ValueError, match="Invalid JSON"):
+            load_manifest(str(path))
+
+    def test_empty(self, tmp_path):
+        path = tmp_path / "updates.json"
+        path.write_text("[]")
+        with pytest.raises(ValueError, match="non-empty list"):
+            load_manifest(str(path))
+
+    def test_entry_not_mapping(self, tmp_path):
+        path = tmp_path / "updates.json"
+        path.write_text('["a.yaml"]')
+        with pytest.raises(ManifestError, match="entry 1 must be a mapping"):
+            load_manifest(str(path))
+
+    @pytest.mark.parametrize("value", ["1.10", "null", "true", "[]"])
+    def test_non_string_value(self, tmp_path, value):
+        path = tmp_path / "updates.json"
+        path.write_text(f'[{{"file": "a.yaml", "new_tag": {value}}}]')
+        with pytest.raises(ManifestError, match="entry 1 has a non-string value"):
+            load_manifest(str(path))
+
+    def test_unknown_keys(self, tmp_path):
+        path = tmp_path / "updates.json"
+        path.write_text('[{"file": "a.yaml", "tags": "v1"}]')
+        with pytest.raises(ValueError, match="unknown keys: tags"):
+            load_manifest(str(path))
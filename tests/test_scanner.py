@@ -0,0 +1,166 @@
+"""Tests for src/scanner.py"""
+
+import mmap
+import re
+
+from src.scanner import (
+    ScanResult,
+    TagScanner,
+    count_newlines,
+    parse_tag_value,
+    trie_pattern,
+)
+
+# ---------------------------------------------------------------------------
+# parse_tag_value
+# ---------------------------------------------------------------------------
+
+
+class TestCandidateLines:
+    def test_lines_with_key_bytes(self):
+        buf = b"a: 1\n  tag: v1\nx: tag: y\nfoo\ntag: v2"
+        assert TagScanner("tag").candidate_lines(buf) == [5, 15, 29]
+
+    def test_no_key(self):
+        assert TagScanner(["tag", "sidecarTag"]).candidate_lines(b"a: 1\n") == []
+
+    def test_one_candidate_per_line(self):
+        buf = b"tag: tag: tag:\n"
+        assert TagScanner("tag").candidate_lines(buf) == [0]
+
+    def test_prefilter_matches_full_scan(self):
+        buf = (
+            b"image:\n  tag: v1\n  imagetag: v0\n"
+            b"sidecar:\n  sidecarTag: v2\n  # tag: old\n  tag:v3"
+        )
+        scanner = TagScanner(["tag", "sidecarTag"])
+        expected = [m.start(2) for m in scanner.pattern.finditer(buf)]
+        assert [m.start for m in scanner.find(buf)] == expected
+
+
+class TestParseTagValue:
+    def test_quoted(self):
+        assert parse_tag_value(b' "v1.0.0"') == "v1.0.0"
+
+    def test_unquoted(self):
+        assert parse_tag_value(b" v1.0.0  ") == "v1.0.0"
+
+    def test_empty(self):
+        assert parse_tag_value(b"") == ""
+
+
+# ---------------------------------------------------------------------------
+# TagScanner
+# ---------------------------------------------------------------------------
+
+
+class TestTagScanner:
+    CONTENT = b'image:\n  tag: "v1.0.0"\nsidecar:\n  tag: v0.9\n'
+
+    def test_find_all_matches(self):
+        matches = TagScanner("tag").find(self.CONTENT)
+        assert [m.value for m in matches] == ["v1.0.0", "v0.9"]
+        assert [m.line for m in matches] == [2, 4]
+        assert self.CONTENT[matches[0].start : matches[0].end] == b' "v1.0.0"'
+
+    def test_key_must_be_exact(self):
+        assert TagScanner("tag").find(b"imageTag: v1\ntags: v2\n") == []
+
+    def test_key_is_escaped(self):
+        scanner = TagScanner("image.tag")
+        assert scanner.find(b"imageXtag: v1\n") == []
+        assert scanner.find(b"image.tag: v1\n")[0].value == "v1"
+
+    def test_scan_renders_all_occurrences(self):
+        result = TagScanner("tag").scan(self.CONTENT, "v2.0.0")
+        assert result.current_tag == "v1.0.0"
+        assert result.new_content == (
+            b'image:\n  tag: "v2.0.0"\nsidecar:\n  tag: "v2.0.0"\n'
+        )
+        assert result.changed is True
+
+    def test_scan_preserves_crlf(self):
+        result = TagScanner("tag").scan(b"tag: v1\r\nother: x\r\n", "v2")
+        assert result.new_content == b'tag: "v2"\r\nother: x\r\n'
+
+    def test_scan_identical(self):
+        content = b'tag: "v2.0.0"\n'
+        result = TagScanner("tag").scan(content, "v2.0.0")
+        assert result.changed is False
+
+    def test_scan_no_match(self):
+        result = TagScanner("tag").scan(b"nothing: here\n", "v2")
+        assert isinstance(result, ScanResult)
+        assert result.found is False
+        assert result.current_tag == ""
+        assert result.new_content == b"nothing: here\n"
+
+    def test_scan_mapped(self, tmp_path):
+        path = tmp_path / "big.yaml"
+        path.write_bytes(self.CONTENT)
+        with (
+            open(path, "rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+        ):
+            result = TagScanner("tag").scan_mapped(mm, "v2.0.0")
+        assert result.mapped is True
+        assert result.changed is True
+        assert result.content == b""
+        assert [m.line for m in result.matches] == [2, 4]
+
+
+class TestMultiKey:
+    CONTENT = b'image:\n  tag: "v1"\nsidecar:\n  sidecarTag: v2\nmigrationsTag: v3\n'
+
+    def test_find_all_keys_in_one_pass(self):
+        scanner = TagScanner(["tag", "sidecarTag", "migrationsTag"])
+        result = scanner.scan(self.CONTENT, "v9")
+        assert result.current_tags == {
+            "tag": "v1",
+            "sidecarTag": "v2",
+            "migrationsTag": "v3",
+        }
+
+    def test_render_subset_of_keys(self):
+        scanner = TagScanner(["tag", "sidecarTag", "migrationsTag"])
+        result = scanner.scan(self.CONTENT, {"tag": "v9", "migrationsTag": "v8"})
+        assert result.new_content == (
+            b'image:\n  tag: "v9"\nsidecar:\n  sidecarTag: v2\nmigrationsTag: "v8"\n'
+        )
+
+    def test_prefix_keys_do_not_shadow(self):
+        scanner = TagScanner(["tag", "tagOverride"])
+        matches = scanner.find(b"tagOverride: a\ntag: b\n")
+        assert [(m.key, m.value) for m in matches] == [
+            ("tagOverride", "a"),
+            ("tag", "b"),
+        ]
+
+
+class TestTriePattern:
+    KEYS = (b"tag", b"tagOverride", b"imageTag", b"image.tag", b"t", b"ta")
+
+    def test_matches_exactly_the_keys(self):
+        pattern = re.compile(b"(?:" + trie_pattern(list(self.KEYS)) + b")$")
+        for key in self.KEYS:
+            assert pattern.match(key)
+        for other in [b"", b"tago", b"imagetag", b"tagOverrid", b"imageXtag"]:
+            assert not pattern.match(other)
+
+    def test_large_key_set_uses_trie(self):
+        keys = [f"svc{i:03d}Tag" for i in range(50)] + ["tag", "tagOverride"]
+        scanner = TagScanner(keys)
+        assert b"(?:" in scanner.pattern.pattern
+        content = b"svc007Tag: a\nsvc07Tag: b\ntagOverride: c\ntag: d\n"
+        assert [(m.key, m.value) for m in scanner.find(content)] == [
+            ("svc007Tag", "a"),
+            ("tagOverride", "c"),
+            ("tag", "d"),
+        ]
+
+
+class TestCountNewlines:
+    def test_bytes_and_chunked_agree(self, monkeypatch):
+        data = b"a\n" * 50
+        monkeypatch.setattr("src.scanner.LINE_COUNT_CHUNK", 7)
+        assert count_newlines(data, 3, 90) == count_newlines(bytearray(data), 3, 90)
@@ -68,6 +68,29 @@ class TestCreateSummary:
         result = summary.create_summary(["unknown.yaml"], {})
         assert result["changes"][0]["old_tag"] == ""
 
+    def test_per_key_changes(self, config, logger):
+        config.tag_string = "tag,sidecarTag=v3.0.0"
+        s = ChangeSummary(config, logger)
+        by_key = {"dev1.yaml": {"tag": "v1.0.0", "sidecarTag": "v2.9.0"}}
+        result = s.create_summary(
+            ["dev1.yaml"], {"dev1.yaml": "v1.0.0"}, old_tags_by_key=by_key
+        )
+        assert result["changes_count"] == 1
+        assert result["changes"] == [
+            {
+                "file": "dev1.yaml",
+                "old_tag": "v1.0.0",
+                "new_tag": "v2.0.0",
+                "tag_string": "tag",
+            },
+            {
+                "file": "dev1.yaml",
+                "old_tag": "v2.9.0",
+                "new_tag": "v3.0.0",
+                "tag_string": "sidecarTag",
+            },
+        ]
+
 
 # ---------------------------------------------------------------------------
 # save_summary
@@ -209,6 +232,38 @@ class TestPrintSummary:
         out = capsys.readouterr().out
         assert "Commit" not in out
 
+    def test_per_key(self, config, logger, capsys):
+        config.tag_string = "tag,sidecarTag=v3.0.0"
+        s = ChangeSummary(config, logger)
+        by_key = {"f.yaml": {"tag": "v1", "sidecarTag": "v2"}}
+        s.print_summary(["f.yaml"], {"f.yaml": "v1"}, old_tags_by_key=by_key)
+        out = capsys.readouterr().out
+        assert "tag: v1 → v2.0.0" in out
+        assert "sidecarTag: v2 → v3.0.0" in out
+
+    def test_per_file_new_tags(self, summary, capsys):
+        summary.print_summary(
+            ["a.yaml"],
+            {"a.yaml": "v1"},
+            old_tags_by_key={"a.yaml": {"tag": "v1", "sidecarTag": "v0"}},
+            new_tags_by_key={"a.yaml": {"tag": "v9", "sidecarTag": "v8"}},
+        )
+        out = capsys.readouterr().out
+        assert "tag: v1 → v9" in out
+        assert "sidecarTag: v0 → v8" in out
+
+    def test_single_key_keeps_one_line(self, summary, capsys):
+        # As main.py calls it: per-key mappings are always passed
+        summary.print_summary(
+            ["a.yaml"],
+            {"a.yaml": "v1"},
+            old_tags_by_key={"a.yaml": {"tag": "v1"}},
+            new_tags_by_key={"a.yaml": {"tag": "v2.0.0"}},
+        )
+        out = capsys.readouterr().out
+        assert "     v1 → v2.0.0\n" in out
+        assert "tag:" not in out
+
     def test_empty_files(self, summary, capsys):
         summary.print_summary([], {})
         assert capsys.readouterr().out == ""
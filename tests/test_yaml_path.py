@@ -0,0 +1,230 @@
+"""Tests for src/yaml_path.py"""
+
+import pytest
+
+from src.scanner import TagScanner
+from src.yaml_path import (
+    DocumentSelector,
+    YamlPathScanner,
+    document_starts,
+    is_path_key,
+    parse_path,
+)
+
+VALUES = (
+    b"image:\n"
+    b'  tag: "root"\n'
+    b"api:\n"
+    b"  image:\n"
+    b"    repository: api\n"
+    b'    tag: "1.0"  # pinned\n'
+    b"  notes: |\n"
+    b"    image:\n"
+    b"      tag: not-a-key\n"
+    b"workers:\n"
+    b"  - name: a\n"
+    b"    image:\n"
+    b"      tag: w1\n"
+    b"  - name: b\n"
+    b"  -\n"
+    b"    image:\n"
+    b"      tag: w3\n"
+    b"jobs:\n"
+    b"- image:\n"
+    b"    tag: j1\n"
+    b"- tag: j2\n"
+)
+
+
+def _values(keys, content=VALUES):
+    """(key, value, line) of each match found for `keys`."""
+    return [(m.key, m.value, m.line) for m in TagScanner(keys).find(content)]
+
+
+# ---------------------------------------------------------------------------
+# parse_path / is_path_key
+# ---------------------------------------------------------------------------
+
+
+class TestParsePath:
+    def test_dotted(self):
+        assert parse_path("api.image.tag") == ("api", "image", "tag")
+
+    def test_list_items(self):
+        assert parse_path("workers[*].image.tag") == ("workers", None, "image", "tag")
+        assert parse_path("jobs[0][1].tag") == ("jobs", 0, 1, "tag")
+
+    @pytest.mark.parametrize("path", ["a..tag", "a.tag.", "a[x].tag", "a]b.tag"])
+    def test_malformed(self, path):
+        with pytest.raises(ValueError, match="Invalid tag path"):
+            parse_path(path)
+
+    def test_must_end_with_key(self):
+        with pytest.raises(ValueError, match="must end with a key"):
+            parse_path("workers[*]")
+
+    def test_is_path_key(self):
+        assert is_path_key("image.tag")
+        assert is_path_key("workers[0]")
+        assert not is_path_key("imageTag")
+
+
+# ---------------------------------------------------------------------------
+# YamlPathScanner
+# ---------------------------------------------------------------------------
+
+
+class TestYamlPathScanner:
+    def test_nested_mapping(self):
+        assert _values("api.image.tag") == [("api.image.tag", "1.0", 6)]
+
+    def test_top_level_path(self):
+        assert _values("image.tag") == [("image.tag", "root", 2)]
+
+    def test_any_list_item(self):
+        assert _values("workers[*].image.tag") == [
+            ("workers[*].image.tag", "w1", 13),
+            ("workers[*].image.tag", "w3", 17),
+        ]
+
+    def test_list_index(self):
+        assert _values("workers[2].image.tag") == [("workers[2].image.tag", "w3", 17)]
+        assert _values("workers[1].image.tag") == []
+
+    def test_compact_list_and_inline_item_key(self):
+        assert _values(["jobs[0].image.tag", "jobs[1].tag"]) == [
+            ("jobs[0].image.tag", "j1", 20),
+            ("jobs[1].tag", "j2", 21),
+        ]
+
+    def test_block_scalar_is_not_scanned(self):
+        assert _values("api.notes.image.tag") == []
+
+    def test_documents_reset_path(self):
+        content = b"api:\n  tag: a\n---\napi:\n  tag: b\n...\ntag: c\n"
+        assert [v for _, v, _ in _values("api.tag", content)] == ["a", "b"]
+
+    def test_quoted_keys(self):
+        content = b"\"api\":\n  'tag': v1\n"
+        assert _values("api.tag", content) == [("api.tag", "v1", 2)]
+
+    def test_crlf(self):
+        content = b"api:\r\n  image:\r\n    tag: v1\r\n"
+        assert _values("api.image.tag", content) == [("api.image.tag", "v1", 3)]
+
+    def test_no_leaf_needle_skips_scan(self):
+        assert YamlPathScanner(["api.image.tag"]).find(b"api:\n  image: {}\n") == []
+
+    def test_path_wins_over_bare_key_on_same_line(self):
+        keys = ["tag", "api.image.tag"]
+        found = _values(keys)
+        assert ("api.image.tag", "1.0", 6) in found
+        assert ("tag", "1.0", 6) not in found
+        assert ("tag", "root", 2) in found
+
+    def test_literal_dotted_key_still_matches(self):
+        assert _values("image.tag", b"image.tag: v1\n") == [("image.tag", "v1", 1)]
+
+
+class TestRender:
+    def test_rewrites_only_addressed_values(self):
+        scanner = TagScanner(["api.image.tag", "workers[*].image.tag"])
+        result = scanner.scan(VALUES, "v2")
+        assert result.new_content == (
+            VALUES.replace(b'    tag: "1.0"  # pinned', b'    tag: "v2"  # pinned')
+            .replace(b"tag: w1", b'tag: "v2"')
+            .replace(b"tag: w3", b'tag: "v2"')
+        )
+
+    def test_rescan_of_rendered_content_is_unchanged(self):
+        scanner = TagScanner("api.image.tag")
+        rendered = scanner.scan(VALUES, "v2").new_content
+        assert scanner.scan(rendered, "v2").changed is False
+
+    def test_mapped_scan_detects_change(self):
+        scanner = TagScanner("workers[0].image.tag")
+        assert scanner.scan_mapped(VALUES, "w1").changed is True  # quoting differs
+        rendered = scanner.scan(VALUES, "w1").new_content
+        assert scanner.scan_mapped(rendered, "w1").changed is False
+
+
+# ---------------------------------------------------------------------------
+# Documents
+# ---------------------------------------------------------------------------
+
+
+STREAM = (
+    b"apiVersion: apps/v1\n"
+    b"kind: Deployment\n"
+    b"metadata:\n"
+    b"  name: api\n"
+    b"spec:\n"
+    b"  tag: a1\n"
+    b"---\n"
+    b"kind: Deployment\n"
+    b"metadata:\n"
+    b'  name: "worker"\n'
+    b"  labels:\n"
+    b"    name: not-the-name\n"
+    b"spec:\n"
+    b"  tag: w1\n"
+    b"---\n"
+    b"# no kind\n"
+    b"tag: x1\n"
+    b"---\n"
+    b"kind: CronJob\n"
+    b"metadata:\n"
+    b"  name: api\n"
+    b"tag: c1\n"
+)
+
+
+def _selected(spec, keys="tag"):
+    scanner = TagScanner(keys, DocumentSelector(spec))
+    return [m.value for m in scanner.find(STREAM)]
+
+
+class TestDocuments:
+    def test_document_starts(self):
+        assert document_starts(b"a: 1\n") == [0]
+        assert document_starts(b"---\na: 1\n---\nb: 2\n") == [0, 0, 9]
+
+    def test_kind_and_name(self):
+        assert _selected("Deployment/api") == ["a1"]
+        assert _selected("Deployment/worker") == ["w1"]
+
+    def test_kind_only(self):
+        assert _selected("Deployment") == ["a1", "w1"]
+        assert _selected("Deployment/*") == ["a1", "w1"]
+
+    def test_name_only(self):
+        assert _selected("*/api") == ["a1", "c1"]
+
+    def test_several_selectors(self):
+        assert _selected("Deployment/worker, CronJob") == ["w1", "c1"]
+
+    def test_no_document_selected(self):
+        assert _selected("Service") == []
+
+    def test_nested_name_is_not_metadata_name(self):
+        assert _selected("*/not-the-name") == []
+
+    def test_path_keys(self):
+        assert _selected("*/api", "spec.tag") == ["a1"]
+
+    def test_render_only_selected(self):
+        scanner = TagScanner("tag", DocumentSelector("Deployment/worker"))
+        result = scanner.scan(STREAM, "v2")
+        assert result.new_content == STREAM.replace(b"tag: w1", b'tag: "v2"')
+
+    @pytest.mark.parametrize("spec", ["/api", "Deployment/", "a/b/c", " , "])
+    def test_invalid_selector(self, spec):
+        with pytest.raises(ValueError):
+            DocumentSelector(spec)
+
+    def test_signature_includes_selector(self):
+        assert TagScanner("tag").signature == ["tag"]
+        assert TagScanner("tag", DocumentSelector("Deployment")).signature == [
+            "tag",
+            "@documents=Deployment",
+        ]